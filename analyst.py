@@ -1,44 +1,206 @@
 import csv
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+from typing import Iterator, Optional, Tuple
+
+URL_PREFIX = "https://leetcode.com/problems/"
+
+# Header: magic, version, csv mtime (ns), csv size, max id, count, slug table size, title table size
+_HEADER = struct.Struct("<4sHxxQQIIII")
+# One record per id from 0 to max id: slug offset, title offset, slug length, title length
+_RECORD = struct.Struct("<IIHH")
+_MAGIC = b"LCIX"
+_VERSION = 1
+_MISSING = 0xFFFFFFFF
+# Slug length flag: the slug table holds the full URL, not a suffix of URL_PREFIX
+_ABSOLUTE_URL = 0x8000
+
+
+class ProblemIndex(Mapping):
+    """
+    Index ID -> URL nhị phân, memory-mapped, build từ CSV
+
+    File index gồm bảng record truy cập trực tiếp theo ID và hai bảng chuỗi
+    (slug, title). Chỉ được đọc khi tra cứu lần đầu và tự build lại khi CSV thay đổi.
+    """
+
+    def __init__(
+        self,
+        csv_file: str,
+        index_file: Optional[str] = None,
+        check_interval: float = 5.0,
+    ):
+        self.csv_file = csv_file
+        self.index_file = index_file or csv_file + ".idx"
+        self.check_interval = check_interval
+        self._mmap: Optional[mmap.mmap] = None
+        self._header: Tuple = ()
+        self._checked_at = 0.0
+
+    def _csv_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.csv_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ensure_loaded(self):
+        """Map the index on first use, rebuilding it if the CSV has changed"""
+        now = time.monotonic()
+        if self._mmap is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        csv_stat = self._csv_stat()
+        if self._mmap is not None and self._header[2:4] == csv_stat:
+            return
+
+        self.close()
+        if not self._load_index(csv_stat):
+            build_index(self.csv_file, self.index_file, csv_stat)
+            if not self._load_index(csv_stat):
+                raise ValueError(f"Invalid index file: {self.index_file}")
+
+    def _load_index(self, csv_stat: Tuple[int, int]) -> bool:
+        try:
+            with open(self.index_file, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        header = _HEADER.unpack_from(data) if len(data) >= _HEADER.size else ()
+        if header[:2] != (_MAGIC, _VERSION) or header[2:4] != csv_stat:
+            data.close()
+            return False
+
+        self._mmap = data
+        self._header = header
+        return True
+
+    def _record(self, problem_id: int) -> Optional[Tuple[int, int, int, int]]:
+        self._ensure_loaded()
+        max_id = self._header[4]
+        if not 0 <= problem_id <= max_id:
+            return None
+
+        record = _RECORD.unpack_from(
+            self._mmap, _HEADER.size + problem_id * _RECORD.size
+        )
+        return None if record[0] == _MISSING else record
+
+    def _string(self, offset: int, length: int, table_start: int) -> str:
+        start = table_start + offset
+        return self._mmap[start : start + length].decode("utf-8")
+
+    def _slug_table(self) -> int:
+        return _HEADER.size + (self._header[4] + 1) * _RECORD.size
+
+    def _title_table(self) -> int:
+        return self._slug_table() + self._header[6]
+
+    def __getitem__(self, problem_id) -> str:
+        record = self._record(int(problem_id))
+        if record is None:
+            raise KeyError(problem_id)
+
+        slug_offset, _, slug_length, _ = record
+        value = self._string(slug_offset, slug_length & ~_ABSOLUTE_URL, self._slug_table())
+        return value if slug_length & _ABSOLUTE_URL else URL_PREFIX + value
+
+    def title(self, problem_id) -> Optional[str]:
+        """Get problem title, or None if the ID is unknown"""
+        record = self._record(int(problem_id))
+        if record is None:
+            return None
+        _, title_offset, _, title_length = record
+        return self._string(title_offset, title_length, self._title_table())
+
+    def titles(self) -> Iterator[Tuple[int, str]]:
+        """Iterate over (id, title) pairs"""
+        for problem_id in self:
+            yield problem_id, self.title(problem_id)
+
+    def __iter__(self) -> Iterator[int]:
+        self._ensure_loaded()
+        for problem_id in range(self._header[4] + 1):
+            if self._record(problem_id) is not None:
+                yield problem_id
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return self._header[5]
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def build_index(csv_file: str, index_file: str, csv_stat: Tuple[int, int]):
+    """Compile the CSV into the binary index, written atomically"""
+    rows = {}
+    with open(csv_file, "r", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            rows[int(row["id"])] = (row["url"], row["title"])
+
+    max_id = max(rows, default=0)
+    records = [(_MISSING, _MISSING, 0, 0)] * (max_id + 1)
+    slugs, titles = bytearray(), bytearray()
+
+    for problem_id, (url, title) in rows.items():
+        if url.startswith(URL_PREFIX):
+            slug, flag = url[len(URL_PREFIX) :].encode("utf-8"), 0
+        else:
+            slug, flag = url.encode("utf-8"), _ABSOLUTE_URL
+        title_bytes = title.encode("utf-8")
+
+        records[problem_id] = (len(slugs), len(titles), len(slug) | flag, len(title_bytes))
+        slugs += slug
+        titles += title_bytes
+
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                _MAGIC, _VERSION, *csv_stat, max_id, len(rows), len(slugs), len(titles)
+            )
+        )
+        for record in records:
+            f.write(_RECORD.pack(*record))
+        f.write(slugs)
+        f.write(titles)
+    os.replace(tmp_file, index_file)
 
 
 def load_leetcode_data(csv_file):
     """
-    Load toàn bộ dữ liệu CSV vào dictionary để truy cập nhanh
+    Load index dữ liệu CSV để truy cập nhanh (lazy, chỉ đọc khi tra cứu lần đầu)
 
     Args:
         csv_file (str): Đường dẫn đến file CSV
 
     Returns:
-        dict: Dictionary với key là ID, value là URL
+        ProblemIndex: Mapping với key là ID, value là URL
     """
-    leetcode_data = {}
-
-    try:
-        with open(csv_file, "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-
-            for row in reader:
-                leetcode_data[int(row["id"])] = row["url"]
-
-        return leetcode_data
-
-    except Exception as e:
-        print(f"Lỗi khi load dữ liệu: {e}")
-        return {}
+    return ProblemIndex(csv_file)
 
 
 def get_url_from_data(leetcode_data, problem_id) -> str:
     """
-    Lấy URL từ dictionary đã load sẵn
+    Lấy URL từ index đã load sẵn
 
     Args:
-        leetcode_data (dict): Dictionary chứa dữ liệu ID -> URL
+        leetcode_data (Mapping): Index chứa dữ liệu ID -> URL
         problem_id (int): ID của problem
 
     Returns:
         str: URL của problem, hoặc None nếu không tìm thấy
     """
-    return leetcode_data.get(int(problem_id))
+    try:
+        return leetcode_data.get(int(problem_id))
+    except Exception as e:
+        print(f"Lỗi khi load dữ liệu: {e}")
+        return None
 
 
 # Ví dụ sử dụng
@@ -0,0 +1,100 @@
+"""
+Property check for renderer.chunk_sections
+
+    python -m benchmarks.chunk_check                  # exit 1 nếu có chunk vi phạm
+    python -m benchmarks.chunk_check --cases 20000 --seed 3
+
+Random sections (fenced blocks with and without a language, over-long lines,
+indented and missing closing fences, plain text) plus the rendered corpus are
+chunked at several limits. Every chunk must fit in the limit, have balanced
+code fences and not be an empty code block.
+"""
+
+import argparse
+import random
+from typing import List
+
+from benchmarks.corpus import load_corpus
+from crawl_api import LeetCodeAPICrawler, format_problem_data
+from renderer import FENCE, chunk_sections
+
+LIMITS = (60, 120, 200, 500, 2000)
+
+
+def chunk_problems(chunks: List[str], limit: int) -> List[str]:
+    """Contract violations of one chunking"""
+    problems = []
+    for index, chunk in enumerate(chunks):
+        if len(chunk) > limit:
+            problems.append(f"chunk {index} is {len(chunk)} chars, limit {limit}")
+        fences = [line for line in chunk.splitlines() if line.lstrip().startswith(FENCE)]
+        if len(fences) % 2:
+            problems.append(f"chunk {index} has unbalanced fences")
+        if not [line for line in chunk.splitlines() if not line.lstrip().startswith(FENCE)]:
+            problems.append(f"chunk {index} holds only fences: {chunk!r}")
+    return problems
+
+
+def random_line(rng: random.Random, limit: int) -> str:
+    roll = rng.random()
+    if roll < 0.1:
+        length = rng.randint(limit, limit * 3)
+    elif roll < 0.2:
+        length = rng.randint(limit // 2, limit)
+    else:
+        length = rng.randint(0, max(1, limit // 4))
+    return "".join(rng.choice("abcxyz =+-") for _ in range(length)).strip() or "x"
+
+
+def random_section(rng: random.Random, limit: int) -> str:
+    lines = []
+    for _ in range(rng.randint(1, 12)):
+        lines.append(random_line(rng, limit))
+        if rng.random() < 0.3:
+            lines.append(FENCE + rng.choice(["", "python", "cpp", "text"]))
+            lines.extend(random_line(rng, limit) for _ in range(rng.randint(1, 8)))
+            # Đôi khi fence đóng thụt lề như trong list
+            lines.append(rng.choice([FENCE, FENCE, "   " + FENCE]))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check chunk_sections against its contract")
+    parser.add_argument("--cases", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    failures = []
+    checked = 0
+
+    for case in range(args.cases):
+        limit = rng.choice(LIMITS)
+        sections = [random_section(rng, limit) for _ in range(rng.randint(1, 4))]
+        chunks = chunk_sections(sections, limit)
+        checked += len(chunks)
+        for problem in chunk_problems(chunks, limit):
+            failures.append(f"case {case} (limit {limit}): {problem}")
+
+    crawler = LeetCodeAPICrawler()
+    for question in load_corpus(size=args.corpus_size, seed=args.seed):
+        problem = format_problem_data(question, f"https://leetcode.com/problems/{question['titleSlug']}/")
+        sections = crawler.render_sections(problem, max_description=None)
+        for limit in LIMITS[2:]:
+            chunks = chunk_sections(sections, limit)
+            checked += len(chunks)
+            for failure in chunk_problems(chunks, limit):
+                failures.append(f"{question['titleSlug']} (limit {limit}): {failure}")
+
+    for failure in failures[:20]:
+        print(f"❌ {failure}")
+    if failures:
+        print(f"❌ {len(failures)} vi phạm trên {checked} chunk")
+        return 1
+    print(f"✅ {checked} chunk đều vừa giới hạn và cân fence")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
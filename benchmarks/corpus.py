@@ -0,0 +1,149 @@
+"""
+Problem HTML corpus for the parser benchmarks
+
+Real payloads come from a recording made with `fake_leetcode.py record`.
+Without one, a seeded generator builds payloads from fragments of real
+LeetCode markup: inline <code>/<em>/<sup>, example images, nested lists,
+both example layouts (<pre> and example-block) and long constraint lists.
+"""
+
+import random
+from typing import Dict, List, Optional
+
+WORDS = (
+    "array integer string node tree graph return element index sum length "
+    "subarray distinct minimum maximum number operations pair valid order "
+    "path edge query target value character window prefix matrix cell"
+).split()
+
+TOPICS = (
+    ("Array", "array"),
+    ("Hash Table", "hash-table"),
+    ("Dynamic Programming", "dynamic-programming"),
+    ("Tree", "tree"),
+    ("Graph", "graph"),
+    ("Math", "math"),
+    ("Two Pointers", "two-pointers"),
+    ("Binary Search", "binary-search"),
+)
+
+IMAGE_URL = "https://assets.leetcode.com/uploads/2021/{month:02d}/{day:02d}/{name}.jpg"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.12:
+            word = f"<code>{word}</code>"
+        elif roll < 0.16:
+            word = f"<em>{word}</em>"
+        elif roll < 0.19:
+            word = f"<code>10<sup>{rng.randint(2, 9)}</sup></code>"
+        elif roll < 0.21:
+            word = "&lt;="
+        parts.append(word)
+    return " ".join(parts).capitalize() + "."
+
+
+def _nested_list(rng: random.Random) -> str:
+    items = []
+    for _ in range(rng.randint(2, 4)):
+        inner = ""
+        if rng.random() < 0.6:
+            inner = "<ul>" + "".join(
+                f"\n\t\t<li>{_sentence(rng, rng.randint(4, 10))}</li>" for _ in range(rng.randint(2, 3))
+            ) + "\n\t</ul>"
+        items.append(f"\n\t<li>{_sentence(rng, rng.randint(5, 12))}{inner}</li>")
+    return "<ul>" + "".join(items) + "\n</ul>\n"
+
+
+def _array(rng: random.Random) -> str:
+    return "[" + ",".join(str(rng.randint(-10, 10)) for _ in range(rng.randint(1, 9))) + "]"
+
+
+def _example(rng: random.Random, number: int, slug: str) -> str:
+    image = ""
+    if rng.random() < 0.3:
+        url = IMAGE_URL.format(month=rng.randint(1, 12), day=rng.randint(1, 28), name=f"{slug}-{number}")
+        image = f'<img alt="" src="{url}" style="width: {rng.randint(200, 600)}px; height: {rng.randint(100, 400)}px;" />\n'
+
+    explanation = ""
+    if rng.random() < 0.7:
+        explanation = f"<strong>Explanation:</strong> {_sentence(rng, rng.randint(8, 30))}\n"
+
+    title = f'<p><strong class="example">Example {number}:</strong></p>\n\n'
+    if rng.random() < 0.75:
+        return (
+            f"{title}{image}<pre>\n<strong>Input:</strong> nums = {_array(rng)}, k = {rng.randint(1, 9)}\n"
+            f"<strong>Output:</strong> {rng.randint(0, 99)}\n{explanation}</pre>\n\n"
+        )
+    # Bố cục example-block mới của LeetCode, không có <pre>
+    return (
+        f'{title}<div class="example-block">\n{image}<p><strong>Input:</strong> '
+        f'<span class="example-io">s = &quot;{rng.choice(WORDS)}&quot;</span></p>\n\n'
+        f'<p><strong>Output:</strong> <span class="example-io">{rng.choice(("true", "false"))}</span></p>\n\n'
+        f"<p>{explanation}</p>\n</div>\n\n"
+    )
+
+
+def _constraints(rng: random.Random) -> str:
+    items = []
+    for _ in range(rng.randint(2, 12)):
+        low, high = rng.randint(0, 9), rng.randint(2, 9)
+        name = rng.choice(("nums.length", "n", "k", "s.length", "nums[i]", "queries[i][1]", "edges.length"))
+        if rng.random() < 0.5:
+            items.append(
+                f"<code>-10<sup>{high}</sup> &lt;= {name} &lt;= 10<sup>{high}</sup></code>"
+            )
+        elif rng.random() < 0.7:
+            items.append(f"<code>{low} &lt;= {name} &lt;= 2 * 10<sup>{high}</sup> + {low}</code>")
+        else:
+            items.append(f"<code>{name}</code> consists of only lowercase English letters.")
+    return (
+        "<p><strong>Constraints:</strong></p>\n\n<ul>\n"
+        + "".join(f"\t<li>{item}</li>\n" for item in items)
+        + "</ul>\n"
+    )
+
+
+def generate_question(rng: random.Random, problem_id: int) -> Dict:
+    slug = "-".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f"-{problem_id}"
+    parts = [f"<p>{_sentence(rng, rng.randint(10, 40))}</p>\n\n" for _ in range(rng.randint(1, 5))]
+    if rng.random() < 0.4:
+        parts.append(_nested_list(rng))
+    parts.append("<p>&nbsp;</p>\n")
+    parts.extend(_example(rng, number, slug) for number in range(1, rng.randint(2, 5)))
+    parts.append("<p>&nbsp;</p>\n")
+    parts.append(_constraints(rng))
+    if rng.random() < 0.3:
+        parts.append(
+            f"\n<p>&nbsp;</p>\n<p><strong>Follow up:</strong> {_sentence(rng, rng.randint(8, 20))}</p>\n"
+        )
+
+    return {
+        "questionId": str(problem_id),
+        "title": slug.replace("-", " ").title(),
+        "titleSlug": slug,
+        "difficulty": rng.choice(("Easy", "Medium", "Hard")),
+        "content": "".join(parts),
+        "exampleTestcases": "",
+        "topicTags": [{"name": name, "slug": tag} for name, tag in rng.sample(TOPICS, rng.randint(1, 3))],
+        "hints": [],
+    }
+
+
+def generate_corpus(size: int = 400, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [generate_question(rng, problem_id) for problem_id in range(1, size + 1)]
+
+
+def load_corpus(recordings: Optional[str] = None, size: int = 400, seed: int = 0) -> List[Dict]:
+    """Question payloads from a recording file, or the generated corpus"""
+    if recordings:
+        from fake_leetcode import Recordings
+
+        questions = [q for q in Recordings.load(recordings).questions.values() if q.get("content")]
+        return questions[:size]
+    return generate_corpus(size, seed)
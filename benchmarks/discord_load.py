@@ -0,0 +1,403 @@
+"""
+Burst-load harness for the slash command handlers and the daily task
+
+    python -m benchmarks.discord_load                                  # 300 /test_dsa trên 30 channel
+    python -m benchmarks.discord_load --interactions 500 --channels 10 --latency-ms 120
+    python -m benchmarks.discord_load --interactions 0 --daily-channels 200
+
+Runs the real handlers from main.py in-process. Channels, threads, messages
+and interactions are fakes whose API calls sleep for a simulated latency and
+wait out per-route and global rate-limit buckets the way discord.py does on
+429. Problems are crawled from fake_leetcode.py, so no network is needed. The
+bot's working files (problem store, bot_state.db, ...) go to a temp directory.
+
+Reports command throughput, time to the first interaction response,
+defer-to-followup latency, simulated 429s and event-loop stall time.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Deque, Dict, List, Optional
+
+import discord
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Discord cho 3 giây để trả lời một interaction (defer hoặc send_message)
+INTERACTION_DEADLINE = 3.0
+
+INTERACTION_ROUTES = ("interaction_response", "followup")
+
+
+class FakeDiscordAPI:
+    """
+    Simulated Discord REST API: latency plus rate-limit buckets
+
+    Each route (e.g. messages of one channel) allows `bucket_size` calls per
+    `bucket_window` seconds, and all routes share a global per-second limit.
+    A call over the limit sleeps until the bucket resets and is counted as a
+    429, which is what discord.py's HTTP client does.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 80.0,
+        jitter_ms: float = 40.0,
+        bucket_size: int = 5,
+        bucket_window: float = 5.0,
+        global_rate: int = 50,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bucket_size = bucket_size
+        self.bucket_window = bucket_window
+        self.global_rate = global_rate
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self.rate_limit_wait = 0.0
+        self._buckets: Dict[tuple, Deque[float]] = {}
+
+    async def _wait_bucket(self, key: tuple, size: int, window: float, kind: str):
+        """Reserve the next free slot of a sliding-window bucket, FIFO, and sleep until it"""
+        bucket = self._buckets.setdefault(key, deque())
+        now = asyncio.get_running_loop().time()
+        while bucket and now - bucket[0] >= window:
+            bucket.popleft()
+        slot = now if len(bucket) < size else max(now, bucket[-size] + window)
+        bucket.append(slot)
+        if slot > now:
+            self.rate_limited[kind] += 1
+            self.rate_limit_wait += slot - now
+            await asyncio.sleep(slot - now)
+
+    async def call(self, kind: str, route_id: Optional[int] = None):
+        self.calls[kind] += 1
+        if route_id is not None:
+            await self._wait_bucket((kind, route_id), self.bucket_size, self.bucket_window, kind)
+        # Endpoint của interaction không tính vào global rate limit
+        if kind not in INTERACTION_ROUTES:
+            await self._wait_bucket(("global",), self.global_rate, 1.0, "global")
+        jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+
+class FakeThread:
+    def __init__(self, api: FakeDiscordAPI, thread_id: int, name: str):
+        self.api = api
+        self.id = thread_id
+        self.name = name
+        self.messages: List[str] = []
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    async def send(self, content: str = None, **kwargs):
+        await self.api.call("thread_send", self.id)
+        self.messages.append(content)
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeTextChannel", message_id: int, content: str):
+        self.channel = channel
+        self.id = message_id
+        self.content = content
+
+    async def create_thread(self, name: str, **kwargs) -> FakeThread:
+        await self.channel.api.call("create_thread", self.channel.id)
+        return self.channel._new_thread(name)
+
+
+class FakeTextChannel(discord.TextChannel):
+    """A discord.TextChannel (so isinstance checks pass) whose API calls go to FakeDiscordAPI"""
+
+    def __init__(self, api: FakeDiscordAPI, channel_id: int):
+        # Không gọi discord.TextChannel.__init__, nó cần state và payload của gateway
+        self.api = api
+        self.id = channel_id
+        self.name = f"load-{channel_id}"
+        self.messages: List[str] = []
+        self.threads_created: List[FakeThread] = []
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    def _new_thread(self, name: str) -> FakeThread:
+        thread = FakeThread(self.api, self.id * 1000 + len(self.threads_created), name)
+        self.threads_created.append(thread)
+        return thread
+
+    async def send(self, content: str = None, **kwargs) -> FakeMessage:
+        await self.api.call("channel_send", self.id)
+        self.messages.append(content)
+        return FakeMessage(self, len(self.messages), content)
+
+    async def create_thread(self, *, name: str, **kwargs) -> FakeThread:
+        await self.api.call("create_thread", self.id)
+        return self._new_thread(name)
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        # Interaction callback không bị giới hạn theo route, chỉ có latency
+        await self.interaction.api.call("interaction_response")
+        self._done = True
+        self.interaction.responded_at = time.perf_counter()
+
+    async def defer(self, **kwargs):
+        await self._respond()
+        self.interaction.deferred_at = self.interaction.responded_at
+
+    async def send_message(self, content: str = None, **kwargs):
+        await self._respond()
+        self.interaction.replies.append(content)
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: str = None, **kwargs):
+        await self.interaction.api.call("followup", self.interaction.id)
+        if self.interaction.followup_at is None:
+            self.interaction.followup_at = time.perf_counter()
+        self.interaction.replies.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, api: FakeDiscordAPI, interaction_id: int, channel: FakeTextChannel):
+        self.api = api
+        self.id = interaction_id
+        self.channel = channel
+        self.guild = SimpleNamespace(id=channel.id)
+        self.user = SimpleNamespace(
+            id=1, guild_permissions=SimpleNamespace(manage_threads=True, administrator=True)
+        )
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.replies: List[str] = []
+        self.created_at = time.perf_counter()
+        self.responded_at: Optional[float] = None
+        self.deferred_at: Optional[float] = None
+        self.followup_at: Optional[float] = None
+
+
+class LoopStallMonitor:
+    """Sleep in short ticks and record how late each wake-up is"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lateness: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lateness.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def stalled(self, threshold: float = 0.01) -> float:
+        """Total time the loop was blocked for longer than `threshold` at once"""
+        return sum(late for late in self.lateness if late > threshold)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    values = sorted(values)
+
+    def at(q: float) -> float:
+        return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+    return {"p50": at(50), "p95": at(95), "p99": at(99), "max": values[-1]}
+
+
+def _format_ms(stats: Dict[str, float]) -> str:
+    return ", ".join(f"{key} {value * 1000:.0f}ms" for key, value in stats.items())
+
+
+def prepare_workdir(args: argparse.Namespace) -> str:
+    """Temp working directory with the CSV, and env pointing the bot at the fake server"""
+    workdir = tempfile.mkdtemp(prefix="discord_load_")
+    shutil.copy(os.path.join(REPO_DIR, "leetcode_data.csv"), workdir)
+    with open(os.path.join(workdir, "current_problem.txt"), "w") as f:
+        f.write("1")
+    os.chdir(workdir)
+
+    os.environ.setdefault("DISCORD_BOT_TOKEN", "load-test")
+    os.environ.setdefault("LEETCODE_RATE_LIMIT", "1000")
+    os.environ.setdefault("LEETCODE_RATE_BURST", "100")
+    os.environ.setdefault("LEETCODE_MAX_CONCURRENCY", "16")
+    # Không để channel thật trong .env lọt vào bài test
+    os.environ["CHANNEL_ID"] = ""
+    return workdir
+
+
+async def run_commands(main, api: FakeDiscordAPI, args: argparse.Namespace) -> Dict:
+    channels = [FakeTextChannel(api, 1000 + i) for i in range(args.channels)]
+    handler = main.test_thread.callback
+    interactions = [
+        FakeInteraction(api, i, channels[i % len(channels)]) for i in range(args.interactions)
+    ]
+
+    async def dispatch(interaction: FakeInteraction, delay: float):
+        await asyncio.sleep(delay)
+        interaction.created_at = time.perf_counter()
+        await handler(interaction)
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(dispatch(i, rng.uniform(0, args.ramp)) for i in interactions)
+    )
+    elapsed = time.perf_counter() - started
+
+    completed = [i for i in interactions if i.followup_at is not None]
+    first_response = [i.responded_at - i.created_at for i in interactions if i.responded_at]
+    return {
+        "elapsed": elapsed,
+        "completed": len(completed),
+        "throughput": len(completed) / elapsed if elapsed else 0.0,
+        "first_response": _percentiles(first_response),
+        "late": sum(1 for value in first_response if value > INTERACTION_DEADLINE),
+        "defer_to_followup": _percentiles([i.followup_at - i.deferred_at for i in completed]),
+        "threads": sum(len(c.threads_created) for c in channels),
+    }
+
+
+async def run_daily(main, api: FakeDiscordAPI, args: argparse.Namespace) -> Dict:
+    channels = {2000 + i: FakeTextChannel(api, 2000 + i) for i in range(args.daily_channels)}
+    main.daily_channel_ids = lambda: list(channels)
+    main.bot.get_channel = channels.get
+
+    started = time.perf_counter()
+    await main.publish_daily_challenge()
+    elapsed = time.perf_counter() - started
+    posted = sum(1 for channel in channels.values() if channel.threads_created)
+    return {
+        "elapsed": elapsed,
+        "posted": posted,
+        "threads": sum(len(channel.threads_created) for channel in channels.values()),
+    }
+
+
+async def run(args: argparse.Namespace):
+    from fake_leetcode import FakeLeetCodeServer, FaultProfile, Recordings
+
+    server = FakeLeetCodeServer(
+        Recordings.synthetic("leetcode_data.csv"), FaultProfile(latency_ms=args.leetcode_latency_ms)
+    )
+    os.environ["LEETCODE_GRAPHQL_URL"] = await server.start()
+
+    import main
+
+    logging.getLogger().setLevel(logging.WARNING)
+    api = FakeDiscordAPI(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        bucket_size=args.bucket_size,
+        bucket_window=args.bucket_window,
+        global_rate=args.global_rate,
+        seed=args.seed,
+    )
+    monitor = LoopStallMonitor()
+    monitor.start()
+    try:
+        if args.interactions:
+            result = await run_commands(main, api, args)
+            print(
+                f"⚡ /test_dsa: {result['completed']}/{args.interactions} xong trong {result['elapsed']:.2f}s"
+                f" ({result['throughput']:.1f} lệnh/s, {result['threads']} thread)"
+            )
+            print(f"   Phản hồi đầu tiên: {_format_ms(result['first_response'])}")
+            if result["late"]:
+                print(f"   ❌ {result['late']} interaction trả lời sau {INTERACTION_DEADLINE:.0f}s")
+            print(f"   Defer → followup: {_format_ms(result['defer_to_followup'])}")
+
+        if args.daily_channels:
+            result = await run_daily(main, api, args)
+            print(
+                f"📅 Daily: {result['posted']}/{args.daily_channels} channel trong {result['elapsed']:.2f}s"
+                f" ({result['threads']} thread)"
+            )
+    finally:
+        await monitor.stop()
+        await main.bot.leetcode.close()
+        main.bot.guild_config.close()
+        await server.stop()
+
+    calls = ", ".join(f"{kind} {count}" for kind, count in sorted(api.calls.items()))
+    print(f"📡 API calls: {sum(api.calls.values())} ({calls})")
+    print(
+        f"🚦 429 giả lập: {sum(api.rate_limited.values())} {dict(api.rate_limited)},"
+        f" tổng thời gian chờ cộng dồn {api.rate_limit_wait:.1f}s"
+    )
+    lateness = _percentiles(monitor.lateness)
+    print(
+        f"🧊 Event loop: chặn tổng {monitor.stalled() * 1000:.0f}ms (>10ms mỗi lần),"
+        f" trễ tick {_format_ms(lateness)}"
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Burst-load the bot's handlers against fake Discord")
+    parser.add_argument("--interactions", type=int, default=300, help="concurrent /test_dsa calls")
+    parser.add_argument("--channels", type=int, default=30, help="channels the interactions spread over")
+    parser.add_argument("--ramp", type=float, default=0.5, help="seconds over which interactions arrive")
+    parser.add_argument("--daily-channels", type=int, default=0, help="also run the daily post to N channels")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Discord API latency")
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--bucket-size", type=int, default=5, help="calls per route per window")
+    parser.add_argument("--bucket-window", type=float, default=5.0, help="seconds")
+    parser.add_argument("--global-rate", type=int, default=50, help="calls per second over all routes")
+    parser.add_argument("--leetcode-latency-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, REPO_DIR)
+    workdir = prepare_workdir(args)
+    try:
+        asyncio.run(run(args))
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
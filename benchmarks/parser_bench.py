@@ -0,0 +1,223 @@
+"""
+Throughput and memory benchmarks for the problem HTML parser
+
+    python -m benchmarks.parser_bench                   # so với baseline, exit 1 nếu chậm đi hoặc thiếu baseline
+    python -m benchmarks.parser_bench --save-baseline   # ghi lại baseline sau khi tối ưu
+    python -m benchmarks.parser_bench --recordings recordings.json.gz --no-compare
+
+Each round times one pass of a function over the whole corpus right next to
+a fixed reference workload (alternating which goes first), and the median
+of the per-round throughput ratios is what regressions are judged on, so
+machine load and single slow rounds cancel out. A separate pass under
+tracemalloc records the peak memory of each call and the blocks its result
+keeps alive.
+
+Results are compared with benchmarks/parser_baseline.json; a function more
+than `--threshold` slower (or hungrier) than its baseline fails the run. The
+baseline is committed; since throughput is stored as a ratio to the
+reference workload it carries over between machines. A missing baseline is
+an error: record one with `--save-baseline`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import load_corpus
+from crawl_api import LeetCodeAPICrawler, format_problem_data
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser_baseline.json")
+
+_REFERENCE_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def reference_workload(content: str):
+    """Fixed regex + string work that parser changes never touch, used to calibrate for machine speed"""
+    return _REFERENCE_TAG_RE.sub(" ", content).split()
+
+
+def bench_cases(corpus: List[Dict]) -> Dict[str, tuple]:
+    """name -> (function of one item, items)"""
+    crawler = LeetCodeAPICrawler()
+    contents = [question["content"] for question in corpus]
+    problems = [
+        format_problem_data(question, f"https://leetcode.com/problems/{question['titleSlug']}/")
+        for question in corpus
+    ]
+    return {
+        "_html_to_markdown": (crawler._html_to_markdown, contents),
+        "_extract_examples": (crawler._extract_examples, contents),
+        "_extract_constraints": (crawler._extract_constraints, contents),
+        "format_problem_data": (
+            lambda question: format_problem_data(question, "https://leetcode.com/problems/x/"),
+            corpus,
+        ),
+        "format_problem_for_discord": (crawler.format_problem_for_discord, problems),
+    }
+
+
+def time_case(func: Callable, items: List, rounds: int, repeat: int = 1) -> float:
+    """Best wall time of one pass over `items`"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                func(item)
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best
+
+
+def repeat_for(func: Callable, items: List, min_round: float = 0.05) -> int:
+    """Passes per round so that a round of a very fast function isn't lost in timer noise"""
+    single = time_case(func, items, 1)
+    return max(1, int(min_round / max(single, 1e-9)) + 1) if single < min_round else 1
+
+
+def memory_case(func: Callable, items: List) -> Dict[str, float]:
+    """Mean peak bytes per call and mean blocks still held by the result, under tracemalloc"""
+    peaks = blocks = 0
+    tracemalloc.start()
+    try:
+        for item in items:
+            tracemalloc.clear_traces()
+            result = func(item)
+            peaks += tracemalloc.get_traced_memory()[1]
+            blocks += len(tracemalloc.take_snapshot().traces)
+            del result
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peaks / len(items), "result_blocks": blocks / len(items)}
+
+
+def run(corpus: List[Dict], rounds: int) -> Dict[str, Dict[str, float]]:
+    # MB/s luôn tính theo dung lượng HTML gốc để các hàm so sánh được với nhau
+    html_bytes = sum(len(question["content"]) for question in corpus)
+    contents = [question["content"] for question in corpus]
+    results = {}
+    for name, (func, items) in bench_cases(corpus).items():
+        repeat = repeat_for(func, items)
+        reference_repeat = repeat_for(reference_workload, contents)
+        ratios, timings = [], []
+        for round_index in range(rounds):
+            # Mỗi round đo cặp hàm + workload tham chiếu sát nhau để cùng chịu tải của máy
+            if round_index % 2:
+                elapsed = time_case(func, items, 1, repeat)
+                reference = time_case(reference_workload, contents, 1, reference_repeat)
+            else:
+                reference = time_case(reference_workload, contents, 1, reference_repeat)
+                elapsed = time_case(func, items, 1, repeat)
+            ratios.append((len(items) / elapsed) / (len(contents) / reference))
+            timings.append(elapsed)
+        elapsed = statistics.median(timings)
+        results[name] = {
+            "per_sec": len(items) / elapsed,
+            "relative": statistics.median(ratios),
+            "us_per_call": elapsed / len(items) * 1e6,
+            "mb_per_sec": html_bytes / elapsed / 1e6,
+            **memory_case(func, items),
+        }
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Names of the functions that regressed beyond the threshold"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        # So sánh throughput đã chuẩn hoá theo workload tham chiếu, bớt nhiễu giữa các lần chạy
+        if current["relative"] < base["relative"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {current['relative']:.3f}x reference vs baseline {base['relative']:.3f}x"
+                f" ({current['per_sec']:.0f}/s vs {base['per_sec']:.0f}/s)"
+            )
+        if current["peak_bytes"] > base["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak {current['peak_bytes'] / 1024:.1f}KiB vs baseline {base['peak_bytes'] / 1024:.1f}KiB"
+            )
+    return regressions
+
+
+def print_results(results: Dict, baseline: Dict = None):
+    print(
+        f"{'function':<28}{'calls/s':>10}{'µs/call':>10}{'MB/s':>8}{'vs ref':>8}{'peak KiB':>10}{'blocks':>8}{'vs base':>9}"
+    )
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline["results"]:
+            delta = f"{r['relative'] / baseline['results'][name]['relative'] - 1:+.0%}"
+        print(
+            f"{name:<28}{r['per_sec']:>10.0f}{r['us_per_call']:>10.1f}{r['mb_per_sec']:>8.1f}{r['relative']:>8.3f}"
+            f"{r['peak_bytes'] / 1024:>10.1f}{r['result_blocks']:>8.0f}{delta:>9}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the problem HTML parser")
+    parser.add_argument("--recordings", default=None, help="recording from fake_leetcode.py record")
+    parser.add_argument("--size", type=int, default=400, help="corpus size")
+    parser.add_argument("--seed", type=int, default=0, help="generated corpus seed")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-compare", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.save_baseline and not args.no_compare and not os.path.exists(args.baseline):
+        print(f"❌ Không có baseline {args.baseline}, chạy với --save-baseline để ghi")
+        return 1
+
+    corpus = load_corpus(args.recordings, args.size, args.seed)
+    corpus_info = {
+        "source": os.path.basename(args.recordings) if args.recordings else f"generated:{args.seed}",
+        "size": len(corpus),
+        "bytes": sum(len(question["content"]) for question in corpus),
+    }
+    print(f"📚 Corpus {corpus_info['source']}: {corpus_info['size']} bài, {corpus_info['bytes'] / 1e6:.2f}MB HTML")
+
+    results = run(corpus, args.rounds)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"corpus": corpus_info, "python": platform.python_version(), "results": results},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        print_results(results)
+        print(f"✅ Đã lưu baseline vào {args.baseline}")
+        return 0
+
+    baseline = None
+    if not args.no_compare:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["corpus"] != corpus_info:
+            print(f"⚠️ Baseline được đo trên corpus khác ({baseline['corpus']}), bỏ qua so sánh")
+            baseline = None
+
+    print_results(results, baseline)
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"❌ {regression}")
+    if not regressions:
+        print(f"✅ Không có hàm nào chậm hơn baseline quá {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,14 @@
 import os
+from typing import Awaitable, Callable, List
+
 from dotenv import load_dotenv
 
 import discord
 from discord.ext import commands
 
+from guild_config import GuildConfigStore
 from leetcode_integration import LeetCodeIntegration
+from metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
@@ -34,8 +38,24 @@ class Bot(commands.Bot):
             "CHANNEL_ID": os.getenv("CHANNEL_ID"),
             "DAILY_TIME": os.getenv("DAILY_TIME"),
             "TIMEZONE_OFFSET": os.getenv("TIMEZONE_OFFSET"),
+            "PREFETCH_COUNT": os.getenv("PREFETCH_COUNT"),
+            "PUBLISH_PARALLELISM": os.getenv("PUBLISH_PARALLELISM"),
+            "PROFILE_DIR": os.getenv("PROFILE_DIR"),
         }
-        self.leetcode = LeetCodeIntegration()
+        self.leetcode = LeetCodeIntegration(
+            db_file=os.getenv("PROBLEM_STORE") or "problems.db",
+            cache_size=int(os.getenv("PROBLEM_CACHE_SIZE") or 256),
+            cache_bytes=int(os.getenv("PROBLEM_CACHE_MB") or 8) * 1024 * 1024,
+            daily_difficulty=os.getenv("DAILY_DIFFICULTY") or None,
+            daily_topics=tuple(
+                topic.strip()
+                for topic in (os.getenv("DAILY_TOPIC") or "").split(",")
+                if topic.strip()
+            ),
+        )
+        self.guild_config = GuildConfigStore()
+        # Dọn dẹp của main.py (scheduler, hàng đợi gửi) chạy trước khi đóng kết nối
+        self.shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
 
     async def setup_hook(self):
         """Setup when bot starts"""
@@ -46,5 +66,24 @@ class Bot(commands.Bot):
         except Exception as e:
             print(f"Lỗi khi sync commands: {e}")
 
+        # Endpoint Prometheus chỉ bật khi cấu hình METRICS_PORT
+        metrics_port = os.getenv("METRICS_PORT")
+        if metrics_port and metrics.enabled:
+            try:
+                await metrics.start_http_server(int(metrics_port))
+            except Exception as e:
+                print(f"Lỗi khi mở metrics endpoint: {e}")
+
+    async def close(self):
+        """Run the shutdown hooks and close HTTP sessions before shutting down the bot"""
+        for hook in self.shutdown_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                print(f"❌ Lỗi khi dọn dẹp {getattr(hook, '__name__', hook)}: {e}")
+        await self.leetcode.close()
+        self.guild_config.close()
+        await super().close()
+
 
 bot = Bot()
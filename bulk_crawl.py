@@ -0,0 +1,295 @@
+"""
+Crawl problems into the bot's problem store ahead of time
+
+    python bulk_crawl.py                      # mọi ID trong leetcode_data.csv
+    python bulk_crawl.py --start 1 --end 500 --concurrency 4
+    python bulk_crawl.py --restart            # bỏ checkpoint, crawl lại từ đầu
+    python bulk_crawl.py --refresh            # crawl lại cả các bài đã có trong store
+
+Completed ids are appended to a checkpoint file, so an interrupted run
+picks up where it stopped when started again. A refresh keeps its own
+checkpoint (`<checkpoint>.refresh`), removed once the refresh completes,
+so it re-crawls everything the previous runs stored and can resume too.
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from analyst import load_leetcode_data
+from bulk_ingest import BulkIngester, RawQuestion, fetch_raw_questions
+from crawl_api import BatchSizer, LeetCodeAPICrawler
+from leetcode_integration import open_problem_store
+
+DEFAULT_CHECKPOINT = "bulk_crawl.checkpoint"
+
+
+def load_checkpoint(path: str) -> Set[int]:
+    """Ids already crawled by previous runs"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip().isdigit()}
+
+
+def append_checkpoint(path: str, problem_ids: Iterable[int]):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(f"{problem_id}\n" for problem_id in problem_ids)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _batches(items: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class BulkCrawler:
+    """
+    Fetch batches on `concurrency` threads feeding one streaming ingest pipeline
+
+    Raw questions from every fetch thread go through a bounded queue into a
+    single `BulkIngester.ingest` call, so with `workers` > 1 several chunks are
+    parsed at once while fetching continues. Ids are checkpointed as soon as
+    their problems are stored.
+    """
+
+    def __init__(
+        self,
+        leetcode_data,
+        store,
+        concurrency: int = 2,
+        batch_size: int = 20,
+        workers: int = 1,
+        checkpoint: str = DEFAULT_CHECKPOINT,
+    ):
+        self.leetcode_data = leetcode_data
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint = checkpoint
+        self.ingester = BulkIngester(store, workers=workers)
+        # requests.Session không thread-safe: mỗi thread một crawler
+        self._local = threading.local()
+
+    def _crawler(self) -> LeetCodeAPICrawler:
+        crawler = getattr(self._local, "crawler", None)
+        if crawler is None:
+            crawler = self._local.crawler = LeetCodeAPICrawler()
+        return crawler
+
+    def _sizer(self) -> BatchSizer:
+        # Giữ kích thước batch đã thu nhỏ sau lỗi giữa các lần fetch của thread
+        sizer = getattr(self._local, "sizer", None)
+        if sizer is None:
+            sizer = self._local.sizer = BatchSizer(self.batch_size, maximum=self.batch_size)
+        return sizer
+
+    def _fetch(self, problem_ids: List[int]) -> List[RawQuestion]:
+        urls = [self.leetcode_data[problem_id] for problem_id in problem_ids]
+        return list(fetch_raw_questions(self._crawler(), urls, self.batch_size, self._sizer()))
+
+    def pending_ids(self, problem_ids: Iterable[int], skip_cached: bool = True) -> List[int]:
+        """Ids not yet in the checkpoint (nor fresh in the store, if skip_cached)"""
+        done = load_checkpoint(self.checkpoint)
+        pending = []
+        for problem_id in problem_ids:
+            if problem_id in done:
+                continue
+            if skip_cached:
+                slug = self._crawler()._extract_slug_from_url(self.leetcode_data[problem_id])
+                if self.store.get_by_slug(slug) is not None:
+                    continue
+            pending.append(problem_id)
+        return pending
+
+    def run(self, problem_ids: List[int]) -> int:
+        """Crawl `problem_ids`, return how many were stored"""
+        total = len(problem_ids)
+        stored = failed = 0
+        started = time.time()
+        ids_by_url = {self.leetcode_data[problem_id]: problem_id for problem_id in problem_ids}
+        batches = iter(_batches(problem_ids, self.batch_size))
+        batches_lock = threading.Lock()
+        stop = threading.Event()
+        # Hàng đợi có giới hạn: fetch nhanh hơn parse thì các thread fetch phải chờ
+        fetched: "queue.Queue[Optional[RawQuestion]]" = queue.Queue(
+            maxsize=self.concurrency * self.batch_size * 2
+        )
+
+        def put(item: Optional[RawQuestion]):
+            while not stop.is_set():
+                try:
+                    fetched.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch_worker():
+            try:
+                while not stop.is_set():
+                    with batches_lock:
+                        batch = next(batches, None)
+                    if batch is None:
+                        return
+                    try:
+                        raw = self._fetch(batch)
+                    except Exception as e:
+                        print(f"⚠️ Lỗi khi tải {len(batch)} bài từ id {batch[0]}: {e}", flush=True)
+                        raw = [(None, self.leetcode_data[problem_id]) for problem_id in batch]
+                    for item in raw:
+                        put(item)
+            finally:
+                put(None)
+
+        def fetched_items() -> Iterator[RawQuestion]:
+            remaining = len(threads)
+            while remaining:
+                item = fetched.get()
+                if item is None:
+                    remaining -= 1
+                else:
+                    yield item
+
+        # Mọi thread fetch đổ vào một pipeline ingest duy nhất, nên các process
+        # parse luôn có việc thay vì chờ từng batch một
+        threads = [
+            threading.Thread(target=fetch_worker, name=f"bulk-fetch-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        done_ids: List[int] = []
+        unreported = 0
+        try:
+            for url, problem in self.ingester.ingest(fetched_items()):
+                if problem is None:
+                    failed += 1
+                else:
+                    done_ids.append(ids_by_url[url])
+                unreported += 1
+                if unreported >= self.batch_size:
+                    append_checkpoint(self.checkpoint, done_ids)
+                    stored += len(done_ids)
+                    done_ids, unreported = [], 0
+                    self._report(stored + failed, total, failed, started)
+            append_checkpoint(self.checkpoint, done_ids)
+            stored += len(done_ids)
+            if unreported:
+                self._report(stored + failed, total, failed, started)
+        except KeyboardInterrupt:
+            stop.set()
+            # Bài đã ghi vào store thì vẫn đánh dấu xong
+            append_checkpoint(self.checkpoint, done_ids)
+            print(f"\n⏸️ Đã dừng. Chạy lại lệnh để tiếp tục từ checkpoint {self.checkpoint}")
+            raise
+        finally:
+            stop.set()
+            self.ingester.close()
+
+        return stored
+
+    @staticmethod
+    def _report(done: int, total: int, failed: int, started: float):
+        elapsed = time.time() - started
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        print(
+            f"📥 {done}/{total} ({done * 100 // max(total, 1)}%)"
+            f" - lỗi {failed} - {rate:.1f} bài/s - còn ~{eta:.0f}s",
+            flush=True,
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Crawl LeetCode problems into the bot's problem store"
+    )
+    parser.add_argument("--csv", default="leetcode_data.csv", help="id → URL index")
+    parser.add_argument(
+        "--store",
+        default=None,
+        help="problem store file (default: $PROBLEM_STORE or problems.db)",
+    )
+    parser.add_argument("--start", type=int, default=None, help="first id (inclusive)")
+    parser.add_argument("--end", type=int, default=None, help="last id (inclusive)")
+    parser.add_argument(
+        "--concurrency", type=int, default=2, help="batches fetched in parallel"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=20,
+        help="problems per batched GraphQL request (smaller after failed batches)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="parser processes (see bulk_ingest.py)"
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore and reset the checkpoint"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="also re-crawl problems already in the store or the checkpoint",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    args = parse_args(argv)
+
+    leetcode_data = load_leetcode_data(args.csv)
+    store = open_problem_store(args.store or os.getenv("PROBLEM_STORE") or "problems.db")
+
+    # Refresh dùng checkpoint riêng: checkpoint thường chứa mọi bài đã crawl
+    checkpoint = args.checkpoint + ".refresh" if args.refresh else args.checkpoint
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    problem_ids = [
+        problem_id
+        for problem_id in sorted(leetcode_data)
+        if (args.start is None or problem_id >= args.start)
+        and (args.end is None or problem_id <= args.end)
+    ]
+
+    crawler = BulkCrawler(
+        leetcode_data,
+        store,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=checkpoint,
+    )
+    pending = crawler.pending_ids(problem_ids, skip_cached=not args.refresh)
+    print(
+        f"🚀 {len(problem_ids)} bài trong phạm vi, {len(problem_ids) - len(pending)} đã có, còn {len(pending)} bài cần crawl"
+    )
+
+    try:
+        stored = crawler.run(pending)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        store.close()
+
+    print(f"✅ Đã lưu {stored}/{len(pending)} bài vào {store.__class__.__name__}")
+    if stored < len(pending):
+        return 1
+    if args.refresh and os.path.exists(checkpoint):
+        # Refresh xong: lần --refresh sau lại crawl lại toàn bộ
+        os.remove(checkpoint)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from crawl_api import BatchSizer, LeetCodeAPICrawler, format_problem_data
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# (raw GraphQL question payload or None, problem URL)
+RawQuestion = Tuple[Optional[Dict], str]
+
+
+def _parse_chunk(chunk: List[RawQuestion]) -> List[Optional[Dict]]:
+    """Worker entry point: parse a chunk of raw questions"""
+    problems = []
+    for question, url in chunk:
+        try:
+            problems.append(format_problem_data(question, url) if question else None)
+        except Exception as e:
+            # Một bài lỗi không được làm hỏng cả chunk
+            logger.error(f"Error parsing {url}: {e}")
+            problems.append(None)
+    return problems
+
+
+def _chunks(items: Iterable[RawQuestion], size: int) -> Iterator[List[RawQuestion]]:
+    chunk: List[RawQuestion] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fetch_raw_questions(
+    crawler: LeetCodeAPICrawler,
+    problem_urls: Iterable[str],
+    batch_size: int = 50,
+    sizer: Optional[BatchSizer] = None,
+) -> Iterator[RawQuestion]:
+    """
+    Yield (raw question, url) pairs, `batch_size` slugs per GraphQL request
+
+    A shared `sizer` keeps the request size (shrunk after failures) across calls.
+    """
+    sizer = sizer or BatchSizer(batch_size, maximum=batch_size)
+    for urls in _chunks(((None, url) for url in problem_urls), batch_size):
+        slugs = crawler._slugs_by_url([url for _, url in urls])
+        questions = crawler.fetch_questions(list(dict.fromkeys(slugs.values())), sizer=sizer)
+        for _, url in urls:
+            yield questions.get(slugs.get(url)), url
+
+
+class BulkIngester:
+    """
+    Parse raw GraphQL question payloads on a process pool and store them in order
+
+    Parsing is pure CPU-bound regex work, so it scales with worker processes
+    while the caller keeps fetching. At most `max_pending` chunks are in flight,
+    which bounds memory for catalog-sized inputs.
+    """
+
+    def __init__(
+        self,
+        store,
+        workers: Optional[int] = None,
+        chunksize: int = 16,
+        max_pending: Optional[int] = None,
+    ):
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.max_pending = max_pending or self.workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def parse(self, items: Iterable[RawQuestion]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """Yield (url, parsed problem or None) in input order"""
+        chunks = _chunks(items, self.chunksize)
+
+        # Một worker thì parse ngay trong process hiện tại, khỏi tốn chi phí pickle
+        if self.workers == 1:
+            for chunk in chunks:
+                for (_, url), problem in zip(chunk, _parse_chunk(chunk)):
+                    yield url, problem
+            return
+
+        pool = self._get_pool()
+        pending: Deque[Tuple[List[str], Future]] = deque()
+        for chunk in chunks:
+            pending.append(([url for _, url in chunk], pool.submit(_parse_chunk, chunk)))
+            if len(pending) >= self.max_pending:
+                yield from self._drain_one(pending)
+        while pending:
+            yield from self._drain_one(pending)
+
+    @staticmethod
+    def _drain_one(pending: Deque[Tuple[List[str], Future]]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        urls, future = pending.popleft()
+        yield from zip(urls, future.result())
+
+    def ingest(
+        self,
+        items: Iterable[RawQuestion],
+        unchanged: Optional[Callable[[Dict], bool]] = None,
+    ) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Parse and upsert every question, yield (url, problem or None if it failed) once stored
+
+        Results are streamed in input order and not kept, so memory stays bounded
+        however long `items` is. Problems for which `unchanged` returns True are
+        yielded but not written.
+        """
+        done: List[Tuple[str, Optional[Dict]]] = []
+        batch: List[Dict] = []
+        stored = total = 0
+
+        for url, problem in self.parse(items):
+            total += 1
+            done.append((url, problem))
+            if problem is not None:
+                stored += 1
+                if not (unchanged and unchanged(problem)):
+                    batch.append(problem)
+            if len(done) >= self.chunksize:
+                if batch:
+                    self.store.upsert_many(batch)
+                    batch = []
+                yield from done
+                done = []
+        if batch:
+            self.store.upsert_many(batch)
+        yield from done
+
+        logger.info(f"Ingested {stored}/{total} problems")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "BulkIngester":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
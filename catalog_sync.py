@@ -0,0 +1,305 @@
+"""
+Incremental catalog sync: only re-crawl problems whose listing changed
+
+    python catalog_sync.py              # chạy hằng đêm, ví dụ qua cron
+    python catalog_sync.py --dry-run    # chỉ in ra các bài sẽ được crawl lại
+
+Pulls the lightweight paginated questionList, hashes each entry and compares
+it with the hash stored by the previous sync. New or changed problems go
+through the full question query and are re-parsed into the problem store
+(skipping the write when they parse to the same content as before);
+unchanged ones are marked fresh in the store so they don't expire from the
+bot's cache. New ids are appended to leetcode_data.csv.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from analyst import URL_PREFIX, load_leetcode_data
+from bulk_ingest import BulkIngester
+from crawl_api import LeetCodeAPICrawler
+from leetcode_integration import open_problem_store
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def listing_hash(question: Dict) -> str:
+    """Hash of the listing fields a content change would show up in"""
+    fields = {
+        "id": question.get("frontendQuestionId"),
+        "title": question.get("title"),
+        "slug": question.get("titleSlug"),
+        "difficulty": question.get("difficulty"),
+        "paidOnly": bool(question.get("paidOnly")),
+        "topics": sorted(tag["slug"] for tag in question.get("topicTags") or ()),
+    }
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def content_hash(problem: Dict) -> str:
+    """Hash of a parsed problem, independent of the URL it was crawled from"""
+    fields = {key: value for key, value in problem.items() if key != "url"}
+    data = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def matches_listing(problem: Dict, question: Dict) -> bool:
+    """Whether a stored problem agrees with its listing entry (used to seed hashes)"""
+    topics = [tag["name"] for tag in question.get("topicTags") or ()]
+    return (
+        problem.get("title") == question.get("title")
+        and problem.get("difficulty") == question.get("difficulty")
+        and sorted(problem.get("topics") or ()) == sorted(topics)
+    )
+
+
+class SyncStateStore:
+    """Listing and content hashes from the last sync, per slug"""
+
+    def __init__(self, db_file: str = "bot_state.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS catalog_hashes (
+                slug TEXT PRIMARY KEY,
+                listing_hash TEXT NOT NULL,
+                content_hash TEXT,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+
+    def listing_hashes(self) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT slug, listing_hash FROM catalog_hashes"
+            ).fetchall()
+        return dict(rows)
+
+    def content_hashes(self) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT slug, content_hash FROM catalog_hashes WHERE content_hash IS NOT NULL"
+            ).fetchall()
+        return dict(rows)
+
+    def update(self, rows: Iterable[Tuple[str, str, Optional[str]]]):
+        """Save (slug, listing hash, content hash) rows in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO catalog_hashes VALUES (?, ?, ?, ?)",
+                [(slug, listing, content, now) for slug, listing, content in rows],
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def append_to_csv(csv_file: str, questions: List[Dict]):
+    """Append new problems to the id → slug CSV in its own format"""
+    if not questions:
+        return
+    needs_newline = False
+    if os.path.exists(csv_file) and os.path.getsize(csv_file) > 0:
+        with open(csv_file, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+
+    with open(csv_file, "a", encoding="utf-8", newline="") as f:
+        if needs_newline:
+            f.write("\n")
+        writer = csv.writer(f, lineterminator="\n")
+        for question in sorted(questions, key=lambda q: int(q["frontendQuestionId"])):
+            writer.writerow(
+                [
+                    question["frontendQuestionId"],
+                    question["title"],
+                    URL_PREFIX + question["titleSlug"],
+                ]
+            )
+
+
+class CatalogSync:
+    """Compare the live listing with the last sync and refetch only what changed"""
+
+    def __init__(
+        self,
+        crawler: LeetCodeAPICrawler,
+        store,
+        state: SyncStateStore,
+        csv_file: str = "leetcode_data.csv",
+        workers: int = 1,
+        batch_size: int = 10,
+    ):
+        self.crawler = crawler
+        self.store = store
+        self.state = state
+        self.csv_file = csv_file
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def plan(
+        self, questions: List[Dict]
+    ) -> Tuple[List[Dict], List[Tuple[str, str, Optional[str]]], List[str]]:
+        """
+        Split the listing into questions to refetch, hash rows that can be saved
+        as-is and slugs of stored problems confirmed unchanged
+
+        A problem without a recorded hash that is already in the store (e.g. from
+        bulk_crawl.py) only gets its hash recorded if it agrees with the listing.
+        A matching hash only counts if the problem is still in the store (it may
+        have been deleted or the store swapped), otherwise it is refetched.
+        """
+        known = self.state.listing_hashes()
+        stored_slugs = set(self.store.slugs())
+        changed, unchanged, fresh = [], [], []
+
+        for question in questions:
+            slug = question["titleSlug"]
+            new_hash = listing_hash(question)
+            if known.get(slug) == new_hash and (question.get("paidOnly") or slug in stored_slugs):
+                if not question.get("paidOnly"):
+                    fresh.append(slug)
+                continue
+            # Bài trả phí không lấy được nội dung, chỉ ghi lại hash
+            if question.get("paidOnly"):
+                unchanged.append((slug, new_hash, None))
+                continue
+            if slug not in known and slug in stored_slugs:
+                stored = self.store.get_by_slug(slug, allow_stale=True)
+                if stored is not None and matches_listing(stored, question):
+                    unchanged.append((slug, new_hash, content_hash(stored)))
+                    fresh.append(slug)
+                    continue
+            changed.append(question)
+        return changed, unchanged, fresh
+
+    def new_csv_rows(self, questions: List[Dict]) -> List[Dict]:
+        leetcode_data = load_leetcode_data(self.csv_file)
+        try:
+            return [
+                question
+                for question in questions
+                if str(question.get("frontendQuestionId", "")).isdigit()
+                and int(question["frontendQuestionId"]) not in leetcode_data
+            ]
+        finally:
+            leetcode_data.close()
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        started = time.time()
+        questions = list(self.crawler.iter_problem_list())
+        changed, unchanged, fresh = self.plan(questions)
+        new_rows = self.new_csv_rows(questions)
+
+        stats = {
+            "listed": len(questions),
+            "changed": len(changed),
+            "new_ids": len(new_rows),
+            "refetched": 0,
+            "rewritten": 0,
+            "touched": 0,
+        }
+        if dry_run:
+            for question in changed:
+                print(f"{question['frontendQuestionId']}. {question['title']}")
+            return stats
+
+        self.state.update(unchanged)
+
+        # Chỉ bài mới hoặc đã đổi mới phải query đầy đủ và parse lại
+        previous = self.state.content_hashes()
+        same_content = set()
+
+        def unchanged_content(problem: Dict) -> bool:
+            if previous.get(problem.get("slug")) != content_hash(problem):
+                return False
+            same_content.add(problem["slug"])
+            return True
+
+        slugs = [question["titleSlug"] for question in changed]
+        raw = self.crawler.fetch_questions(slugs, self.batch_size)
+        listing_hashes = {question["titleSlug"]: listing_hash(question) for question in changed}
+        rows = []
+        with BulkIngester(self.store, workers=self.workers) as ingester:
+            for url, problem in ingester.ingest(
+                ((raw.pop(slug, None), URL_PREFIX + slug + "/") for slug in slugs),
+                unchanged=unchanged_content,
+            ):
+                # Bài lỗi không được ghi hash, lần sync sau sẽ thử lại
+                if problem is not None:
+                    slug = url[len(URL_PREFIX) :].rstrip("/")
+                    rows.append((slug, listing_hashes[slug], content_hash(problem)))
+        self.state.update(rows)
+        stats["refetched"] = len(rows)
+        stats["rewritten"] = len(rows) - len(same_content)
+
+        # Bài không đổi: chỉ làm mới fetched_at để cache của bot không hết hạn
+        stats["touched"] = self.store.touch(fresh + sorted(same_content))
+
+        append_to_csv(self.csv_file, new_rows)
+
+        logger.info(
+            f"Catalog sync: {stats['listed']} listed, {stats['changed']} changed, "
+            f"{stats['refetched']} refetched ({stats['rewritten']} rewritten), "
+            f"{stats['touched']} marked fresh, {stats['new_ids']} new ids "
+            f"in {time.time() - started:.1f}s"
+        )
+        return stats
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Refetch only new or changed problems")
+    parser.add_argument("--csv", default="leetcode_data.csv")
+    parser.add_argument("--store", default=None, help="default: $PROBLEM_STORE or problems.db")
+    parser.add_argument("--state", default="bot_state.db", help="where sync hashes are kept")
+    parser.add_argument("--workers", type=int, default=1, help="parser processes")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = open_problem_store(args.store or os.getenv("PROBLEM_STORE") or "problems.db")
+    state = SyncStateStore(args.state)
+    try:
+        stats = CatalogSync(
+            LeetCodeAPICrawler(), store, state, args.csv, workers=args.workers
+        ).run(dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Lỗi khi đồng bộ catalog: {e}")
+        return 1
+    finally:
+        state.close()
+        store.close()
+
+    print(
+        f"✅ {stats['listed']} bài, {stats['changed']} bài mới/đã đổi, "
+        f"crawl lại {stats['refetched']} (ghi lại {stats['rewritten']}), làm mới {stats['touched']}, "
+        f"thêm {stats['new_ids']} ID vào {args.csv}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Entity HTML, &amp; phải làm cuối cùng để tránh conflict
+HTML_ENTITIES = (
+    ("&nbsp;", " "),
+    ("&lt;", "<"),
+    ("&gt;", ">"),
+    ("&le;", "≤"),
+    ("&ge;", "≥"),
+    ("&quot;", '"'),
+    ("&#39;", "'"),  # Single quote
+    ("&amp;", "&"),
+)
+
+ENTITY_MAP = dict(HTML_ENTITIES)
+
+# Compiled once at import, shared by every parse
+ENTITY_RE = re.compile("|".join(re.escape(entity) for entity, _ in HTML_ENTITIES))
+TAG_RE = re.compile(r"<[^>]+>")
+SUP_RE = re.compile(r"<sup>(.*?)</sup>", re.DOTALL)
+CODE_RE = re.compile(r"<code>(.*?)</code>", re.DOTALL)
+# Giữ "<" ngoài nhóm (?i:...) để regex engine vẫn dùng được literal prefix
+EXAMPLE_TITLE_RE = re.compile(r'<(?i:strong[^>]*class="example"[^>]*>(.*?)</strong>)')
+FOLLOW_UP_TITLE_RE = re.compile(r"<(?i:strong>Follow up:</strong>)")
+IMG_RE = re.compile(r'<img [^>]*src="([^"]+)"[^>]*>')
+LI_RE = re.compile(r"<li>(.*?)</li>", re.DOTALL)
+PRE_RE = re.compile(r"<pre>(.*?)</pre>", re.DOTALL)
+STRONG_RE = re.compile(r"<strong>(.*?)</strong>", re.DOTALL)
+EM_RE = re.compile(r"<em>(.*?)</em>", re.DOTALL)
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Section anchors, found in a single scan over the content
+ANCHOR_RE = re.compile(
+    r'<(?i:(strong[^>]*class="example")|(strong>Constraints:)|(strong>Follow up:))'
+)
+EXAMPLE_RE = re.compile(
+    r'<(?i:strong[^>]*class="example"[^>]*>Example)\s*(\d+):<(?i:/strong>)(.*?)(?=<(?i:strong[^>]*class="example"|strong>Constraints:)|$)',
+    re.DOTALL,
+)
+CONSTRAINTS_RE = re.compile(
+    r'<(?i:strong>Constraints:</strong>)(.*?)(?=<(?i:strong>Follow up:|strong[^>]*class="example")|$)',
+    re.DOTALL,
+)
+FOLLOW_UP_RE = re.compile(r"<(?i:strong>Follow up:</strong>)\s*(.*?)(?:<(?i:/p>)|$)", re.DOTALL)
+
+# Input/Output/Explanation trong <pre> (không rỗng) và ngoài <pre> (có thể rỗng)
+PRE_FIELD_RES = tuple(
+    re.compile(rf"<strong>{name}:</strong>\s*(.+?)(?=<strong>|$)", re.DOTALL)
+    for name in ("Input", "Output", "Explanation")
+)
+INLINE_FIELD_RES = tuple(
+    re.compile(rf"<strong>{name}:</strong>\s*(.*?)(?=<strong>|$)", re.DOTALL)
+    for name in ("Input", "Output", "Explanation")
+)
+
+
+def _decode_entities(text: str) -> str:
+    # Một lần quét thay cho 8 lần thay thế; kết quả giống hệt vì &amp; không được giải mã lại
+    if "&" not in text:
+        return text
+    return ENTITY_RE.sub(_entity, text)
+
+
+# Replacement callables are cheaper than expanding r"\1" templates on every match
+def _entity(match) -> str:
+    return ENTITY_MAP[match.group()]
+
+
+def _sup(match) -> str:
+    return "^" + match.group(1)
+
+
+def _code(match) -> str:
+    return "`" + match.group(1) + "`"
+
+
+def _example_title(match) -> str:
+    return "\n### " + match.group(1) + "\n"
+
+
+def _image(match) -> str:
+    return "\n![image](" + match.group(1) + ")\n"
+
+
+def _list_item(match) -> str:
+    return "- " + match.group(1)
+
+
+def _strong(match) -> str:
+    return "**" + match.group(1) + "**"
+
+
+def _em(match) -> str:
+    return "*" + match.group(1) + "*"
+
+
+def _render_pre(match) -> str:
+    return f"\n```\n{match.group(1).strip()}\n```\n"
+
+
+def clean_text(text: str) -> str:
+    """Clean text by removing HTML tags and converting entities"""
+    if not text:
+        return text
+    return _decode_entities(TAG_RE.sub("", text)).strip()
+
+
+def html_to_markdown(html_content: str) -> str:
+    """Convert HTML to markdown, tối ưu cho Discord"""
+    if not html_content:
+        return ""
+
+    # Entity phải xử lý trước các thao tác khác
+    markdown = _decode_entities(html_content)
+
+    # Bỏ qua các bước không có thẻ tương ứng trong nội dung
+    if "<sup>" in markdown:
+        markdown = SUP_RE.sub(_sup, markdown)
+    markdown = EXAMPLE_TITLE_RE.sub(_example_title, markdown)
+    markdown = FOLLOW_UP_TITLE_RE.sub(r"\n**Follow up:**", markdown)
+    if "<img " in markdown:
+        markdown = IMG_RE.sub(_image, markdown)
+    markdown = markdown.replace("<ul>", "").replace("</ul>", "")
+    if "<li>" in markdown:
+        markdown = LI_RE.sub(_list_item, markdown)
+    if "<pre>" in markdown:
+        markdown = PRE_RE.sub(_render_pre, markdown)
+    if "<code>" in markdown:
+        markdown = CODE_RE.sub(_code, markdown)
+    if "<strong>" in markdown:
+        markdown = STRONG_RE.sub(_strong, markdown)
+    if "<em>" in markdown:
+        markdown = EM_RE.sub(_em, markdown)
+
+    # Xóa các thẻ còn lại (<p>, <div>, <span>, ...) và dòng trống liên tiếp
+    markdown = TAG_RE.sub("", markdown)
+    if "\n\n\n" in markdown:
+        markdown = BLANK_LINES_RE.sub("\n\n", markdown)
+    return markdown.strip()
+
+
+def _scan_anchors(content: str) -> Tuple[List[int], List[int], List[int]]:
+    """Find the start of every example, constraints and follow up heading"""
+    examples, constraints, follow_ups = [], [], []
+    for match in ANCHOR_RE.finditer(content):
+        if match.group(1):
+            examples.append(match.start())
+        elif match.group(2):
+            constraints.append(match.start())
+        else:
+            follow_ups.append(match.start())
+    return examples, constraints, follow_ups
+
+
+def _first_match(pattern, content: str, positions: List[int]):
+    for pos in positions:
+        match = pattern.match(content, pos)
+        if match:
+            return match
+    return None
+
+
+def _example_matches(content: str, positions: List[int]) -> List:
+    matches = []
+    for pos in positions:
+        match = EXAMPLE_RE.match(content, pos)
+        if match:
+            matches.append(match)
+    return matches
+
+
+def _description(content: str, first_example) -> str:
+    if first_example:
+        # Get content before the first example
+        content = content[: first_example.start()].strip()
+    return html_to_markdown(content)
+
+
+def _example(num: str, example_content: str) -> Dict:
+    # Tìm ảnh trong example rồi xóa thẻ img
+    img_match = IMG_RE.search(example_content)
+    img_url = img_match.group(1) if img_match else None
+    if img_match:
+        example_content = IMG_RE.sub("", example_content)
+
+    values = [None, None, None]
+
+    # Tách input/output/explanation từ <pre> block
+    pre_match = PRE_RE.search(example_content)
+    if pre_match:
+        pre_content = pre_match.group(1)
+        for i, pattern in enumerate(PRE_FIELD_RES):
+            match = pattern.search(pre_content)
+            if match:
+                values[i] = clean_text(match.group(1))
+
+    # Nếu không tách được từ <pre>, thử tách trực tiếp
+    if not any(values):
+        for i, pattern in enumerate(INLINE_FIELD_RES):
+            match = pattern.search(example_content)
+            values[i] = clean_text(match.group(1)) if match else None
+
+    # Nếu vẫn không tách được, để raw
+    raw = None if any(values) else html_to_markdown(example_content.strip())
+
+    return {
+        "title": f"Example {num}",
+        "input": values[0],
+        "output": values[1],
+        "explanation": values[2],
+        "image": img_url,
+        "raw": raw,
+    }
+
+
+def _constraints(match) -> List[str]:
+    if not match:
+        return []
+
+    constraints_text = match.group(1)
+
+    # Tách từng constraint từ <li> tags, xử lý <sup> và <code> trước khi xóa HTML
+    constraints = []
+    for item in LI_RE.findall(constraints_text):
+        item = clean_text(CODE_RE.sub(_code, SUP_RE.sub(_sup, item)))
+        if item:
+            constraints.append(item)
+
+    # Nếu không có <li>, thử tách theo dòng
+    if not constraints:
+        text = clean_text(CODE_RE.sub(_code, SUP_RE.sub(_sup, constraints_text)))
+        constraints = [
+            line.strip()
+            for line in text.split("\n")
+            if line.strip() and not line.strip().startswith("&")
+        ]
+
+    return constraints
+
+
+def _follow_up(match) -> Optional[str]:
+    if not match:
+        return None
+    follow_up_text = match.group(1).strip()
+    return clean_text(follow_up_text) if follow_up_text else None
+
+
+def extract_description(content: str) -> str:
+    """Extract only the description part (before examples)"""
+    examples, _, _ = _scan_anchors(content)
+    return _description(content, _first_match(EXAMPLE_RE, content, examples))
+
+
+def extract_examples(content: str) -> List[Dict]:
+    """Extract examples from content, tách input/output/explanation/ảnh"""
+    examples, _, _ = _scan_anchors(content)
+    return [_example(*m.groups()) for m in _example_matches(content, examples)]
+
+
+def extract_constraints(content: str) -> List[str]:
+    """Extract constraints from content, chuyển <code>...</code> thành `...` và xử lý <sup>"""
+    _, constraints, _ = _scan_anchors(content)
+    return _constraints(_first_match(CONSTRAINTS_RE, content, constraints))
+
+
+def extract_follow_up(content: str) -> Optional[str]:
+    """Extract Follow up section from content"""
+    _, _, follow_ups = _scan_anchors(content)
+    return _follow_up(_first_match(FOLLOW_UP_RE, content, follow_ups))
+
+
+def parse_content(content: str) -> Dict:
+    """Parse problem HTML into every section at once, sharing one anchor scan"""
+    content = content or ""
+    examples, constraints, follow_ups = _scan_anchors(content)
+    example_matches = _example_matches(content, examples)
+
+    return {
+        "description": _description(
+            content, example_matches[0] if example_matches else None
+        ),
+        "examples": [_example(*m.groups()) for m in example_matches],
+        "constraints": _constraints(_first_match(CONSTRAINTS_RE, content, constraints)),
+        "follow_up": _follow_up(_first_match(FOLLOW_UP_RE, content, follow_ups)),
+        "markdown": html_to_markdown(content),
+    }
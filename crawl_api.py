@@ -1,20 +1,133 @@
+import asyncio
 import logging
-import re
+import os
 import time
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+import aiohttp
 import requests
 
+import content_parser
+from metrics import metrics
+from rate_limiter import (
+    RETRY_STATUSES,
+    RateLimiter,
+    RetryPolicy,
+    parse_retry_after,
+    shared_rate_limiter,
+)
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_GRAPHQL_URL = "https://leetcode.com/graphql"
+
+
+class CatalogFetchError(Exception):
+    """Raised when a page of the problem list could not be fetched"""
+
+
+QUESTION_FIELDS = """
+            questionId, title, titleSlug, difficulty, content,
+            exampleTestcases, topicTags { name, slug }, hints
+"""
+
+
+class BatchSizer:
+    """Adaptive batch size: double until a batch fails, then grow slowly below that size"""
+
+    def __init__(self, initial: int = 10, minimum: int = 1, maximum: int = 50):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = max(minimum, min(initial, maximum))
+        # Smallest batch size seen failing, we stay below it afterwards
+        self._ceiling = maximum + 1
+
+    def success(self):
+        if self.size * 2 < self._ceiling:
+            self.size = min(self.maximum, self.size * 2)
+        else:
+            self.size = min(self.maximum, self.size + 1, self._ceiling - 1)
+
+    def failure(self) -> bool:
+        """Shrink the batch, return False if it is already at the minimum"""
+        self._ceiling = min(self._ceiling, self.size)
+        if self.size <= self.minimum:
+            return False
+        self.size = max(self.minimum, self.size // 2)
+        return True
+
+
+def format_problem_data(question: Dict, original_url: str) -> Dict:
+    """
+    Format a GraphQL question payload into the standard problem dict
+
+    Pure function of its arguments, so it can run in worker processes.
+    """
+    # Một lần parse cho tất cả các phần của nội dung
+    with metrics.timer("parse"):
+        sections = content_parser.parse_content(question.get("content", ""))
+
+    return {
+        "id": question.get("questionId"),
+        "slug": question.get("titleSlug"),
+        "title": question.get("title"),
+        "difficulty": question.get("difficulty"),
+        "description": sections["description"],
+        "examples": sections["examples"],
+        "constraints": sections["constraints"],
+        "follow_up": sections["follow_up"],
+        "topics": [tag["name"] for tag in question.get("topicTags", [])],
+        "hints": question.get("hints", []),
+        "time_complexity": "O(n)",
+        "space_complexity": "O(1)",
+        "url": original_url,
+        "markdown": sections["markdown"],
+    }
+
 
 class LeetCodeAPICrawler:
-    def __init__(self):
+    PROBLEM_QUERY = (
+        """
+    query questionData($titleSlug: String!) {
+        question(titleSlug: $titleSlug) {"""
+        + QUESTION_FIELDS
+        + """        }
+    }
+    """
+    )
+
+    PROBLEM_LIST_QUERY = """
+    query problemsetQuestionList($limit: Int, $skip: Int) {
+        problemsetQuestionList: questionList(
+            categorySlug: "", limit: $limit, skip: $skip, filters: {}
+        ) {
+            total: totalNum
+            questions: data {
+                frontendQuestionId: questionFrontendId, paidOnly: isPaidOnly,
+                title, titleSlug, difficulty, topicTags { name, slug }
+            }
+        }
+    }
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        graphql_url: Optional[str] = None,
+    ):
         self.session = requests.Session()
-        self.graphql_url = "https://leetcode.com/graphql"
+        # LEETCODE_GRAPHQL_URL trỏ crawler sang server giả (fake_leetcode.py) khi test/benchmark
+        self.graphql_url = (
+            graphql_url or os.getenv("LEETCODE_GRAPHQL_URL") or DEFAULT_GRAPHQL_URL
+        )
+
+        # All crawler instances share one rate limiter unless told otherwise
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
 
         # Optimized headers
         self.session.headers.update(
@@ -29,6 +142,7 @@ class LeetCodeAPICrawler:
 
         # Cache for problem list
         self._problem_list_cache = None
+        self._cache_limit = 0
         self._cache_timestamp = 0
         self._cache_duration = 300  # 5 minutes
 
@@ -43,16 +157,54 @@ class LeetCodeAPICrawler:
                 return path_parts[i + 1]
         return None
 
+    @metrics.timed("graphql_request")
     def _make_graphql_request(self, query: str, variables: Dict) -> Optional[Dict]:
-        """Make GraphQL request with error handling"""
-        try:
-            payload = {"query": query, "variables": variables}
-            response = self.session.post(self.graphql_url, json=payload, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"GraphQL request failed: {str(e)}")
-            return None
+        """Make rate-limited GraphQL request, retrying throttling and transient errors"""
+        payload = {"query": query, "variables": variables}
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            retry_after = None
+            try:
+                with metrics.timer("rate_limit_wait"):
+                    self.rate_limiter.acquire()
+                with self.rate_limiter.slot(), metrics.timer("graphql_http"):
+                    response = self.session.post(
+                        self.graphql_url, json=payload, timeout=30
+                    )
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            except Exception as e:
+                metrics.inc("graphql_errors_total", reason="other")
+                logger.error(f"GraphQL request failed: {str(e)}")
+                return None
+
+            if attempt == self.retry_policy.max_retries:
+                break
+            delay = self._backoff(attempt, error, retry_after)
+            time.sleep(delay)
+
+        metrics.inc("graphql_failures_total")
+        logger.error(f"GraphQL request failed: {error}")
+        return None
+
+    def _backoff(self, attempt: int, error: str, retry_after: Optional[float]) -> float:
+        """Compute the retry delay, pausing every crawler when the server throttles us"""
+        metrics.inc(
+            "graphql_errors_total",
+            reason=error.replace(" ", "_").lower() if error.startswith("HTTP") else "network",
+        )
+        delay = self.retry_policy.delay(attempt, retry_after)
+        if retry_after is not None:
+            self.rate_limiter.pause(delay)
+        logger.warning(
+            f"GraphQL request failed ({error}), retry {attempt + 1}/{self.retry_policy.max_retries} in {delay:.1f}s"
+        )
+        return delay
 
     def get_problem_content(self, problem_url: str) -> Optional[Dict]:
         """Get problem content using GraphQL API"""
@@ -63,346 +215,232 @@ class LeetCodeAPICrawler:
 
         logger.info(f"Fetching problem data for slug: {slug}")
 
-        query = """
-        query questionData($titleSlug: String!) {
-            question(titleSlug: $titleSlug) {
-                questionId, title, titleSlug, difficulty, content,
-                exampleTestcases, topicTags { name, slug }, hints
-            }
-        }
-        """
+        data = self._make_graphql_request(self.PROBLEM_QUERY, {"titleSlug": slug})
+        return self._parse_problem_response(data, slug, problem_url)
 
-        data = self._make_graphql_request(query, {"titleSlug": slug})
+    def _parse_problem_response(
+        self, data: Optional[Dict], slug: str, problem_url: str
+    ) -> Optional[Dict]:
+        """Validate a questionData response and format it"""
         if not data or "data" not in data or not data["data"]["question"]:
             logger.error(f"No data found for slug: {slug}")
             return None
         return self._format_problem_data(data["data"]["question"], problem_url)
 
+    def _build_batch_query(self, count: int) -> str:
+        """Build one questionData query fetching `count` slugs through field aliases"""
+        params = ", ".join(f"$s{i}: String!" for i in range(count))
+        fields = "".join(
+            f"        q{i}: question(titleSlug: $s{i}) {{{QUESTION_FIELDS}        }}\n"
+            for i in range(count)
+        )
+        return f"query batchQuestionData({params}) {{\n{fields}}}"
+
+    def _parse_batch_response(
+        self, data: Optional[Dict], slugs: List[str]
+    ) -> Optional[Dict[str, Optional[Dict]]]:
+        """Map aliased questions back to slugs, None if the whole batch failed"""
+        if not data or not data.get("data"):
+            return None
+
+        # Partial failures: GraphQL errors reference the failing alias in `path`
+        for error in data.get("errors") or []:
+            logger.error(f"GraphQL batch error: {error.get('message')} at {error.get('path')}")
+
+        results = {}
+        for i, slug in enumerate(slugs):
+            question = data["data"].get(f"q{i}")
+            if not question:
+                logger.error(f"No data found for slug: {slug}")
+            results[slug] = question
+        return results
+
+    def fetch_questions(
+        self,
+        slugs: List[str],
+        batch_size: int = 10,
+        max_batch_size: int = 50,
+        sizer: Optional[BatchSizer] = None,
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch raw question payloads for many slugs, several per HTTP request
+
+        Pass a `sizer` to keep the adapted batch size across calls; `batch_size`
+        and `max_batch_size` are then ignored.
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        sizer = sizer or BatchSizer(batch_size, maximum=max_batch_size)
+        start = 0
+
+        while start < len(slugs):
+            chunk = slugs[start : start + sizer.size]
+            variables = {f"s{i}": slug for i, slug in enumerate(chunk)}
+            data = self._make_graphql_request(self._build_batch_query(len(chunk)), variables)
+
+            batch = self._parse_batch_response(data, chunk)
+            if batch is None:
+                if sizer.failure():
+                    logger.warning(f"Batch of {len(chunk)} failed, retrying with {sizer.size}")
+                    continue
+                batch = {slug: None for slug in chunk}
+            else:
+                sizer.success()
+
+            results.update(batch)
+            start += len(chunk)
+
+        return results
+
+    def get_problems_content(
+        self, problem_urls: List[str], batch_size: int = 10
+    ) -> Dict[str, Optional[Dict]]:
+        """Get many problems using batched GraphQL requests, keyed by URL"""
+        slugs = self._slugs_by_url(problem_urls)
+        questions = self.fetch_questions(list(dict.fromkeys(slugs.values())), batch_size)
+        return self._format_batch(slugs, questions)
+
+    def _slugs_by_url(self, problem_urls: List[str]) -> Dict[str, str]:
+        slugs = {}
+        for url in problem_urls:
+            slug = self._extract_slug_from_url(url)
+            if slug:
+                slugs[url] = slug
+            else:
+                logger.error(f"Could not extract slug from URL: {url}")
+        return slugs
+
+    def _format_batch(
+        self, slugs: Dict[str, str], questions: Dict[str, Optional[Dict]]
+    ) -> Dict[str, Optional[Dict]]:
+        problems = {}
+        for url, slug in slugs.items():
+            question = questions.get(slug)
+            problems[url] = self._format_problem_data(question, url) if question else None
+        return problems
+
     def _extract_constraints(self, content: str) -> List[str]:
         """Extract constraints from content, chuyển <code>...</code> thành `...` và xử lý <sup>"""
-        # Updated pattern to stop at Follow up section as well
-        pattern = r"<strong>Constraints:</strong>(.*?)(?=<strong>Follow up:|<strong[^>]*class=\"example\"|$)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        if not match:
-            return []
-            
-        constraints_text = match.group(1)
-        
-        # Tách từng constraint từ <li> tags
-        constraints = []
-        li_matches = re.findall(r"<li>(.*?)</li>", constraints_text, re.DOTALL)
-        
-        for item in li_matches:
-            # Xử lý <sup> và <code> tags trước khi xóa HTML
-            clean_item = re.sub(r"<sup>(.*?)</sup>", r"^\1", item, flags=re.DOTALL)
-            clean_item = re.sub(r"<code>(.*?)</code>", r"`\1`", clean_item, flags=re.DOTALL)
-            
-            # Xóa các HTML tags còn lại và xử lý entities
-            clean_item = self._clean_text(clean_item)
-            
-            if clean_item:
-                constraints.append(clean_item)
-        
-        # Nếu không có <li>, thử tách theo dòng
-        if not constraints:
-            # Xử lý <sup> và <code> tags
-            clean_text = re.sub(r"<sup>(.*?)</sup>", r"^\1", constraints_text, flags=re.DOTALL)
-            clean_text = re.sub(r"<code>(.*?)</code>", r"`\1`", clean_text, flags=re.DOTALL)
-            clean_text = self._clean_text(clean_text)
-            
-            constraints = [
-                line.strip() for line in clean_text.split("\n") 
-                if line.strip() and not line.strip().startswith("&")
-            ]
-        
-        return constraints
+        return content_parser.extract_constraints(content)
 
     def _extract_follow_up(self, content: str) -> Optional[str]:
         """Extract Follow up section from content"""
-        # More specific pattern to capture everything after Follow up until end of content
-        pattern = r"<strong>Follow up:</strong>\s*(.*?)(?:</p>|$)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        if not match:
-            return None
-            
-        follow_up_text = match.group(1).strip()
-        return self._clean_text(follow_up_text) if follow_up_text else None
+        return content_parser.extract_follow_up(content)
 
     def _html_to_markdown(self, html_content: str) -> str:
         """Convert HTML to markdown, tối ưu cho Discord"""
-        if not html_content:
-            return ""
-
-        markdown = html_content
-
-        # 1. Xử lý entity HTML (cần làm trước các thao tác khác)
-        html_entities = [
-            (r"&nbsp;", " "),
-            (r"&lt;", "<"),
-            (r"&gt;", ">"),
-            (r"&le;", "≤"),
-            (r"&ge;", "≥"),
-            (r"&quot;", '"'),
-            (r"&#39;", "'"),  # Single quote
-            (r"&amp;", "&"),  # Phải làm cuối cùng để tránh conflict
-        ]
-        for pattern, repl in html_entities:
-            markdown = re.sub(pattern, repl, markdown)
-
-        # 2. Chuyển <sup>...</sup> thành ^...
-        markdown = re.sub(r"<sup>(.*?)</sup>", r"^\1", markdown, flags=re.DOTALL)
-
-        # 3. Chuyển <strong class="example">Example X:</strong> thành ### Example X
-        markdown = re.sub(
-            r'<strong[^>]*class="example"[^>]*>(.*?)</strong>',
-            r"\n### \1\n",
-            markdown,
-            flags=re.IGNORECASE,
-        )
-
-        # 4. Chuyển <strong>Follow up:</strong> thành **Follow up:**
-        markdown = re.sub(
-            r'<strong>Follow up:</strong>',
-            r"\n**Follow up:**",
-            markdown,
-            flags=re.IGNORECASE,
-        )
-
-        # 5. Chuyển <img ... src="..."> thành ![image](url)
-        markdown = re.sub(
-            r'<img [^>]*src="([^"]+)"[^>]*>', r"\n![image](\1)\n", markdown
-        )
-
-        # 6. Chuyển <ul>...</ul> và <li>...</li> thành list markdown
-        markdown = re.sub(r"<ul>", "", markdown)
-        markdown = re.sub(r"</ul>", "", markdown)
-        markdown = re.sub(r"<li>(.*?)</li>", r"- \1", markdown, flags=re.DOTALL)
-
-        # 7. Chuyển <pre>...</pre> thành code block
-        markdown = re.sub(
-            r"<pre>(.*?)</pre>",
-            lambda m: f"\n```\n{m.group(1).strip()}\n```\n",
-            markdown,
-            flags=re.DOTALL,
-        )
-
-        # 8. Chuyển <code>...</code> thành inline code
-        markdown = re.sub(r"<code>(.*?)</code>", r"`\1`", markdown, flags=re.DOTALL)
-
-        # 9. Chuyển <strong>...</strong> thành **...** (trừ example đã xử lý ở trên)
-        markdown = re.sub(
-            r"<strong>(.*?)</strong>", r"**\1**", markdown, flags=re.DOTALL
-        )
-
-        # 10. Chuyển <em>...</em> thành *...*
-        markdown = re.sub(r"<em>(.*?)</em>", r"*\1*", markdown, flags=re.DOTALL)
-
-        # 11. Xóa các thẻ còn lại (<p>, <div>, <span>, ...)
-        markdown = re.sub(r"<[^>]+>", "", markdown)
-
-        # 12. Làm sạch nhiều dòng trống liên tiếp
-        markdown = re.sub(r"\n{3,}", "\n\n", markdown)
-        markdown = markdown.strip()
-
-        return markdown
+        return content_parser.html_to_markdown(html_content)
 
     def _extract_description(self, content: str) -> str:
         """Extract only the description part (before examples)"""
-        # Find the first example to know where description ends
-        example_pattern = r'<strong[^>]*class="example"[^>]*>Example\s*\d+:</strong>'
-        match = re.search(example_pattern, content, re.IGNORECASE)
-        
-        if match:
-            # Get content before the first example
-            description_content = content[:match.start()].strip()
-        else:
-            # If no examples found, use the whole content
-            description_content = content
-        
-        # Convert to markdown
-        return self._html_to_markdown(description_content)
+        return content_parser.extract_description(content)
 
     def _format_problem_data(self, question: Dict, original_url: str) -> Dict:
         """Format API response into standard format"""
-        content = question.get("content", "")
-
-        return {
-            "id": question.get("questionId"),
-            "slug": question.get("titleSlug"),
-            "title": question.get("title"),
-            "difficulty": question.get("difficulty"),
-            "description": self._extract_description(content),
-            "examples": self._extract_examples(content),
-            "constraints": self._extract_constraints(content),
-            "follow_up": self._extract_follow_up(content),
-            "topics": [tag["name"] for tag in question.get("topicTags", [])],
-            "hints": question.get("hints", []),
-            "time_complexity": "O(n)",
-            "space_complexity": "O(1)",
-            "url": original_url,
-            "markdown": self._html_to_markdown(content),
-        }
+        return format_problem_data(question, original_url)
 
     def _clean_text(self, text: str) -> str:
         """Clean text by removing HTML tags and converting entities"""
-        if not text:
-            return text
-            
-        # Xóa HTML tags
-        clean_text = re.sub(r"<[^>]+>", "", text)
-        
-        # Xử lý HTML entities
-        html_entities = [
-            (r"&nbsp;", " "),
-            (r"&lt;", "<"),
-            (r"&gt;", ">"),
-            (r"&le;", "≤"),
-            (r"&ge;", "≥"),
-            (r"&quot;", '"'),
-            (r"&#39;", "'"),  # Single quote
-            (r"&amp;", "&"),
-        ]
-        for pattern, repl in html_entities:
-            clean_text = re.sub(pattern, repl, clean_text)
-            
-        return clean_text.strip()
+        return content_parser.clean_text(text)
 
     def _extract_examples(self, content: str) -> List[Dict]:
         """Extract examples from content, tách input/output/explanation/ảnh"""
-        examples = []
-        
-        # Updated pattern to match <strong class="example">Example X:</strong>
-        pattern = r'<strong[^>]*class="example"[^>]*>Example\s*(\d+):</strong>(.*?)(?=<strong[^>]*class="example"|<strong>Constraints:|$)'
-        
-        for num, example_content in re.findall(pattern, content, re.DOTALL | re.IGNORECASE):
-            # Tìm ảnh trong example
-            img_match = re.search(r'<img [^>]*src="([^"]+)"[^>]*>', example_content)
-            img_url = img_match.group(1) if img_match else None
-            
-            # Xóa thẻ img khỏi example_content
-            example_content = re.sub(r'<img [^>]*src="([^"]+)"[^>]*>', "", example_content)
-            
-            # Tách input/output/explanation từ <pre> blocks
-            input_val = None
-            output_val = None
-            explanation_val = None
-            
-            # Tìm content trong <pre> tag
-            pre_match = re.search(r'<pre>(.*?)</pre>', example_content, re.DOTALL)
-            if pre_match:
-                pre_content = pre_match.group(1)
-                
-                # Tách Input
-                input_match = re.search(r'<strong>Input:</strong>\s*(.+?)(?=<strong>|$)', pre_content, re.DOTALL)
-                if input_match:
-                    input_val = self._clean_text(input_match.group(1))
-                
-                # Tách Output
-                output_match = re.search(r'<strong>Output:</strong>\s*(.+?)(?=<strong>|$)', pre_content, re.DOTALL)
-                if output_match:
-                    output_val = self._clean_text(output_match.group(1))
-                
-                # Tách Explanation
-                explanation_match = re.search(r'<strong>Explanation:</strong>\s*(.+?)(?=<strong>|$)', pre_content, re.DOTALL)
-                if explanation_match:
-                    explanation_val = self._clean_text(explanation_match.group(1))
-            
-            # Nếu không tách được từ <pre>, thử tách trực tiếp
-            if not (input_val or output_val or explanation_val):
-                input_match = re.search(r'<strong>Input:</strong>\s*(.*?)(?=<strong>|$)', example_content, re.DOTALL)
-                output_match = re.search(r'<strong>Output:</strong>\s*(.*?)(?=<strong>|$)', example_content, re.DOTALL)
-                explanation_match = re.search(r'<strong>Explanation:</strong>\s*(.*?)(?=<strong>|$)', example_content, re.DOTALL)
-                
-                input_val = self._clean_text(input_match.group(1)) if input_match else None
-                output_val = self._clean_text(output_match.group(1)) if output_match else None
-                explanation_val = self._clean_text(explanation_match.group(1)) if explanation_match else None
-            
-            # Nếu vẫn không tách được, để raw
-            if not (input_val or output_val or explanation_val):
-                raw = self._html_to_markdown(example_content.strip())
-            else:
-                raw = None
-            
-            examples.append({
-                "title": f"Example {num}",
-                "input": input_val,
-                "output": output_val,
-                "explanation": explanation_val,
-                "image": img_url,
-                "raw": raw,
-            })
-        
-        return examples
+        return content_parser.extract_examples(content)
 
     def format_problem_for_discord(self, problem: Dict) -> str:
         """Format problem for Discord display (markdown đẹp, không code block cho example, ảnh preview được)"""
+        return "".join(self.render_sections(problem))
+
+    def render_sections(
+        self, problem: Dict, max_description: Optional[int] = 1000
+    ) -> List[str]:
+        """Render the problem as a list of sections (header, description, each example, ...)"""
         difficulty_emoji = {"Easy": "🟢", "Medium": "🟡", "Hard": "🔴"}
         diff_emoji = difficulty_emoji.get(problem.get("difficulty", "Unknown"), "⚪")
-        embed = f"## {diff_emoji} {problem['title']}\n\n"
-        embed += f"**Difficulty:** {problem.get('difficulty', 'Unknown')}\n"
-        embed += f"**Topics:** {', '.join(problem.get('topics', []))}\n"
-        embed += f"**URL:** {problem.get('url', 'N/A')}\n\n"
-        
+        sections = [
+            f"## {diff_emoji} {problem['title']}\n\n"
+            f"**Difficulty:** {problem.get('difficulty', 'Unknown')}\n"
+            f"**Topics:** {', '.join(problem.get('topics', []))}\n"
+            f"**URL:** {problem.get('url', 'N/A')}\n\n"
+        ]
+
         # Add description (truncated if too long)
         description = problem.get("description", "")
-        if len(description) > 1000:
-            description = description[:1000] + "..."
-        embed += f"**Description:**\n{description}\n\n"
-        
+        if max_description is not None and len(description) > max_description:
+            description = description[:max_description] + "..."
+        sections.append(f"**Description:**\n{description}\n\n")
+
         # Add examples (markdown đẹp, không code block)
-        examples = problem.get("examples", [])
-        if examples:
-            for ex in examples:
-                embed += f"### {ex['title']}\n\n"
-                if ex.get("image"):
-                    embed += f"![image]({ex['image']})\n\n"
-                if ex.get("input"):
-                    embed += f"**Input:** {ex['input']}  \n"
-                if ex.get("output"):
-                    embed += f"**Output:** {ex['output']}  \n"
-                if ex.get("explanation"):
-                    embed += f"**Explanation:** {ex['explanation']}  \n"
-                if ex.get("raw"):
-                    embed += ex["raw"] + "\n"
-                embed += "\n"
-        
+        for ex in problem.get("examples", []):
+            parts = [f"### {ex['title']}\n\n"]
+            if ex.get("image"):
+                parts.append(f"![image]({ex['image']})\n\n")
+            if ex.get("input"):
+                parts.append(f"**Input:** {ex['input']}  \n")
+            if ex.get("output"):
+                parts.append(f"**Output:** {ex['output']}  \n")
+            if ex.get("explanation"):
+                parts.append(f"**Explanation:** {ex['explanation']}  \n")
+            if ex.get("raw"):
+                parts.append(ex["raw"] + "\n")
+            parts.append("\n")
+            sections.append("".join(parts))
+
         # Add constraints (chỉ một section, markdown list)
         constraints = problem.get("constraints", [])
         if constraints:
-            embed += "**Constraints:**\n"
-            for constraint in constraints:
-                embed += f"- {constraint}\n"
-            embed += "\n"
-        
+            lines = "".join(f"- {constraint}\n" for constraint in constraints)
+            sections.append(f"**Constraints:**\n{lines}\n")
+
         # Add follow up section if exists
         follow_up = problem.get("follow_up")
         if follow_up:
-            embed += f"**Follow up:** {follow_up}\n"
-        
-        return embed
+            sections.append(f"**Follow up:** {follow_up}\n")
+
+        return sections
 
     def get_problem_list(self, limit: int = 50) -> List[Dict]:
         """Get problem list with caching"""
         current_time = time.time()
 
         # Return cached data if still valid
+        cached = self._get_cached_problem_list(limit, current_time)
+        if cached is not None:
+            return cached
+
+        data = self._make_graphql_request(
+            self.PROBLEM_LIST_QUERY, {"limit": limit, "skip": 0}
+        )
+        return self._parse_problem_list_response(data, limit, current_time)
+
+    def iter_problem_list(self, page_size: int = 100) -> Iterator[Dict]:
+        """Stream the full problem list page by page"""
+        skip = 0
+        while True:
+            data = self._make_graphql_request(
+                self.PROBLEM_LIST_QUERY, {"limit": page_size, "skip": skip}
+            )
+            total, questions = self._parse_problem_page(data, skip)
+            yield from questions
+
+            skip += len(questions)
+            if not questions or skip >= total:
+                return
+
+    def _get_cached_problem_list(self, limit: int, current_time: float):
+        """Return cached problem list slice if still valid, otherwise None"""
+        # A cache fetched with a smaller limit can't answer a larger request
         if (
             self._problem_list_cache
+            and limit <= self._cache_limit
             and current_time - self._cache_timestamp < self._cache_duration
         ):
             return self._problem_list_cache[:limit]
+        return None
 
-        query = """
-        query problemsetQuestionList($limit: Int, $skip: Int) {
-            problemsetQuestionList: questionList(limit: $limit, skip: $skip) {
-                questions: data {
-                    title, titleSlug, difficulty, topicTags { name }
-                }
-            }
-        }
-        """
-
-        data = self._make_graphql_request(query, {"limit": limit, "skip": 0})
+    def _parse_problem_list_response(
+        self, data: Optional[Dict], limit: int, current_time: float
+    ) -> List[Dict]:
+        """Extract questions from a questionList response and cache them"""
         if not data or "data" not in data:
             return []
 
@@ -410,6 +448,255 @@ class LeetCodeAPICrawler:
 
         # Cache the results
         self._problem_list_cache = questions
+        self._cache_limit = limit
         self._cache_timestamp = current_time
 
         return questions
+
+    def _parse_problem_page(self, data: Optional[Dict], skip: int) -> Tuple[int, List[Dict]]:
+        """Extract (total, questions) from one questionList page"""
+        if not data or not data.get("data"):
+            raise CatalogFetchError(f"Could not fetch problem list page at skip={skip}")
+
+        page = data["data"]["problemsetQuestionList"]
+        return page.get("total") or 0, page.get("questions") or []
+
+
+class AsyncLeetCodeAPICrawler(LeetCodeAPICrawler):
+    """Asyncio version of the crawler, sharing one pooled aiohttp session"""
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        graphql_url: Optional[str] = None,
+    ):
+        super().__init__(rate_limiter, retry_policy, graphql_url)
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # slug -> pending crawl, shared by every concurrent caller of that slug
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the HTTP session lazily, it must be bound to a running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                headers=dict(self.session.headers),
+                connector=connector,
+                timeout=self._timeout,
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @metrics.timed("graphql_request")
+    async def _make_graphql_request(self, query: str, variables: Dict) -> Optional[Dict]:
+        """Make rate-limited GraphQL request, retrying throttling and transient errors"""
+        payload = {"query": query, "variables": variables}
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            retry_after = None
+            try:
+                with metrics.timer("rate_limit_wait"):
+                    await self.rate_limiter.acquire_async()
+                async with self.rate_limiter.async_slot():
+                    session = self._get_session()
+                    with metrics.timer("graphql_http"):
+                        response = await session.post(self.graphql_url, json=payload)
+                    async with response:
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            return await response.json()
+                        error = f"HTTP {response.status}"
+                        retry_after = parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            except Exception as e:
+                metrics.inc("graphql_errors_total", reason="other")
+                logger.error(f"GraphQL request failed: {str(e)}")
+                return None
+
+            if attempt == self.retry_policy.max_retries:
+                break
+            delay = self._backoff(attempt, error, retry_after)
+            await asyncio.sleep(delay)
+
+        metrics.inc("graphql_failures_total")
+        logger.error(f"GraphQL request failed: {error}")
+        return None
+
+    async def get_problem_content(self, problem_url: str) -> Optional[Dict]:
+        """
+        Get problem content using GraphQL API
+
+        Concurrent calls for the same slug share a single request and parse.
+        """
+        slug = self._extract_slug_from_url(problem_url)
+        if not slug:
+            logger.error(f"Could not extract slug from URL: {problem_url}")
+            return None
+
+        task = self._in_flight.get(slug)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_problem(slug, problem_url))
+            self._in_flight[slug] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(slug, None))
+        else:
+            metrics.inc("singleflight_joins_total")
+            logger.info(f"Joining in-flight crawl for slug: {slug}")
+
+        # Shield: một caller bị huỷ không được huỷ crawl của những caller khác
+        return await asyncio.shield(task)
+
+    async def _fetch_problem(self, slug: str, problem_url: str) -> Optional[Dict]:
+        logger.info(f"Fetching problem data for slug: {slug}")
+
+        data = await self._make_graphql_request(
+            self.PROBLEM_QUERY, {"titleSlug": slug}
+        )
+        return self._parse_problem_response(data, slug, problem_url)
+
+    async def fetch_questions(
+        self,
+        slugs: List[str],
+        batch_size: int = 10,
+        max_batch_size: int = 50,
+        sizer: Optional[BatchSizer] = None,
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch raw question payloads for many slugs, several per HTTP request
+
+        Pass a `sizer` to keep the adapted batch size across calls; `batch_size`
+        and `max_batch_size` are then ignored.
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        sizer = sizer or BatchSizer(batch_size, maximum=max_batch_size)
+        start = 0
+
+        while start < len(slugs):
+            chunk = slugs[start : start + sizer.size]
+            variables = {f"s{i}": slug for i, slug in enumerate(chunk)}
+            data = await self._make_graphql_request(
+                self._build_batch_query(len(chunk)), variables
+            )
+
+            batch = self._parse_batch_response(data, chunk)
+            if batch is None:
+                if sizer.failure():
+                    logger.warning(f"Batch of {len(chunk)} failed, retrying with {sizer.size}")
+                    continue
+                batch = {slug: None for slug in chunk}
+            else:
+                sizer.success()
+
+            results.update(batch)
+            start += len(chunk)
+
+        return results
+
+    async def get_problems_content(
+        self, problem_urls: List[str], batch_size: int = 10
+    ) -> Dict[str, Optional[Dict]]:
+        """Get many problems using batched GraphQL requests, keyed by URL"""
+        slugs = self._slugs_by_url(problem_urls)
+        questions = await self.fetch_questions(
+            list(dict.fromkeys(slugs.values())), batch_size
+        )
+        return self._format_batch(slugs, questions)
+
+    async def get_problem_list(self, limit: int = 50) -> List[Dict]:
+        """Get problem list with caching"""
+        current_time = time.time()
+
+        cached = self._get_cached_problem_list(limit, current_time)
+        if cached is not None:
+            return cached
+
+        data = await self._make_graphql_request(
+            self.PROBLEM_LIST_QUERY, {"limit": limit, "skip": 0}
+        )
+        return self._parse_problem_list_response(data, limit, current_time)
+
+    async def iter_problem_list(self, page_size: int = 100) -> AsyncIterator[Dict]:
+        """Stream the full problem list page by page, only one page is held in memory"""
+        skip = 0
+        while True:
+            data = await self._make_graphql_request(
+                self.PROBLEM_LIST_QUERY, {"limit": page_size, "skip": skip}
+            )
+            total, questions = self._parse_problem_page(data, skip)
+            for question in questions:
+                yield question
+
+            skip += len(questions)
+            if not questions or skip >= total:
+                return
+
+
+class CatalogCache:
+    """Full problem catalog kept in memory, served stale while it refreshes in the background"""
+
+    def __init__(
+        self, crawler: AsyncLeetCodeAPICrawler, ttl: float = 3600, page_size: int = 100
+    ):
+        self.crawler = crawler
+        self.ttl = ttl
+        self.page_size = page_size
+        self._questions: Optional[List[Dict]] = None
+        self._timestamp = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def is_stale(self) -> bool:
+        return time.time() - self._timestamp >= self.ttl
+
+    async def get(self) -> List[Dict]:
+        """Return the catalog immediately, refreshing it in the background when stale"""
+        if self._questions is None:
+            # Nothing to serve yet, wait for the first fetch
+            await self._start_refresh()
+            return self._questions or []
+
+        if self.is_stale():
+            self._start_refresh()
+        return self._questions
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, callers share the same task"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def close(self):
+        """Cancel a background refresh that is still running"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+
+    async def refresh(self) -> bool:
+        """Fetch the full catalog, keeping the old one if any page fails"""
+        try:
+            questions = [
+                question
+                async for question in self.crawler.iter_problem_list(self.page_size)
+            ]
+        except CatalogFetchError as e:
+            logger.error(f"Catalog refresh failed: {e}")
+            return False
+
+        self._questions = questions
+        self._timestamp = time.time()
+        logger.info(f"Catalog refreshed: {len(questions)} problems")
+        return True
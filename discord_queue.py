@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Iterable, List, Optional
+
+import discord
+
+from metrics import metrics
+from rate_limiter import RateLimiter, parse_retry_after
+from renderer import DISCORD_MESSAGE_LIMIT
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("call", "stage", "futures", "coalesce_key", "target", "content")
+
+    def __init__(
+        self,
+        call: Callable[[], Awaitable],
+        stage: str,
+        coalesce_key: Optional[Hashable] = None,
+        target=None,
+        content: Optional[str] = None,
+    ):
+        self.call = call
+        self.stage = stage
+        self.futures: List[asyncio.Future] = [asyncio.get_running_loop().create_future()]
+        self.coalesce_key = coalesce_key
+        # target/content chỉ có ở message text thuần, loại duy nhất gộp được với nhau
+        self.target = target
+        self.content = content
+
+
+class OutboundQueue:
+    """
+    Single path for outbound thread creation and message sends
+
+    Calls are queued per route (the messages of one channel or thread, the
+    threads of one channel) and each route is drained in order by one worker,
+    so the messages of a thread always arrive in order. Every route has its own
+    token bucket, under a global one, so bursts across many channels don't run
+    into Discord's limits; a 429 that still comes back pauses the route for
+    Retry-After and the call is retried.
+
+    Redundant calls are coalesced: plain text messages queued back to back for
+    the same target are merged while they fit in one message, and calls
+    submitted with the `coalesce_key` of one still queued or running share its
+    result, e.g. two posts of the same thread only create it once.
+
+    Callers get a future right away; workers only exist while a route has work.
+    """
+
+    def __init__(
+        self,
+        route_rate: float = 1.0,
+        route_burst: int = 5,
+        global_rate: float = 40.0,
+        global_burst: int = 10,
+        max_retries: int = 3,
+        message_limit: int = DISCORD_MESSAGE_LIMIT,
+    ):
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.max_retries = max_retries
+        self.message_limit = message_limit
+        # Discord cho 50 request/s toàn cục; rate + burst giữ dưới mức đó trong mọi cửa sổ 1s
+        self._global = RateLimiter(
+            rate=global_rate, burst=global_burst, max_concurrency=int(global_rate)
+        )
+        self._lanes: Dict[Hashable, Deque[_Job]] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        # coalesce key -> job đang chờ hoặc đang chạy
+        self._coalescing: Dict[Hashable, _Job] = {}
+        # route -> (limiter, last used), dọn dần các route không dùng nữa
+        self._limiters: Dict[Hashable, tuple] = {}
+
+    # ---- public API ----
+
+    def send(self, target: discord.abc.Messageable, content: str, **kwargs) -> asyncio.Future:
+        """Queue a message to a channel or thread, resolves to the sent message"""
+        mergeable = not kwargs
+        return self.submit(
+            ("messages", target.id),
+            lambda: target.send(content, **kwargs),
+            stage="discord_send",
+            target=target if mergeable else None,
+            content=content if mergeable else None,
+        )
+
+    def create_thread(
+        self,
+        channel: discord.TextChannel,
+        name: str,
+        messages: Iterable[str] = (),
+        **kwargs,
+    ) -> asyncio.Future:
+        """
+        Queue the creation of a public thread in `channel`, then its `messages`
+
+        Resolves to (thread, futures of the messages) once the thread exists. A
+        thread of the same name in `channel` still queued or being created is
+        shared, messages included, instead of being created twice; the message
+        futures are then shared too, so await them through `asyncio.shield`.
+        """
+        kwargs.setdefault("type", discord.ChannelType.public_thread)
+        messages = list(messages)
+
+        async def create():
+            thread = await channel.create_thread(name=name, **kwargs)
+            # Xếp hàng message ngay khi có thread, worker của channel không chờ chúng gửi xong
+            return thread, [self.send(thread, message) for message in messages]
+
+        return self.submit(
+            ("threads", channel.id),
+            create,
+            stage="discord_create_thread",
+            coalesce_key=("thread", channel.id, name),
+        )
+
+    def submit(
+        self,
+        route: Hashable,
+        call: Callable[[], Awaitable],
+        stage: str = "discord_call",
+        coalesce_key: Optional[Hashable] = None,
+        target=None,
+        content: Optional[str] = None,
+    ) -> asyncio.Future:
+        """Queue any API call on `route`, calls sharing a pending `coalesce_key` run once"""
+        job = self._coalescing.get(coalesce_key) if coalesce_key is not None else None
+        if job is not None:
+            metrics.inc("discord_coalesced_total", route=route[0])
+            future = asyncio.get_running_loop().create_future()
+            job.futures.append(future)
+            return future
+
+        job = _Job(call, stage, coalesce_key, target, content)
+        if coalesce_key is not None:
+            self._coalescing[coalesce_key] = job
+        lane = self._lanes.setdefault(route, deque())
+        lane.append(job)
+        if route not in self._workers:
+            self._workers[route] = asyncio.ensure_future(self._drain(route))
+        return job.futures[0]
+
+    async def close(self):
+        """Stop every worker, cancelling the calls still queued"""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    # ---- workers ----
+
+    def _limiter(self, route: Hashable) -> RateLimiter:
+        now = time.monotonic()
+        entry = self._limiters.get(route)
+        if entry is None:
+            # Bucket đã hồi đầy sau burst/rate giây, bỏ các route nghỉ lâu hơn thế
+            idle = self.route_burst / self.route_rate
+            for key, (_, used) in list(self._limiters.items()):
+                if now - used > idle and key not in self._workers:
+                    del self._limiters[key]
+            limiter = RateLimiter(self.route_rate, self.route_burst, max_concurrency=1)
+        else:
+            limiter = entry[0]
+        self._limiters[route] = (limiter, now)
+        return limiter
+
+    def _merge_following(self, lane: Deque[_Job], job: _Job) -> _Job:
+        """Fold the plain messages queued right after `job` into it while they fit"""
+        if job.content is None:
+            return job
+        parts = [job.content]
+        length = len(job.content)
+        while lane:
+            following = lane[0]
+            if following.content is None or following.target is not job.target:
+                break
+            if length + 1 + len(following.content) > self.message_limit:
+                break
+            lane.popleft()
+            parts.append(following.content)
+            length += 1 + len(following.content)
+            job.futures.extend(following.futures)
+            metrics.inc("discord_coalesced_total", route="messages")
+
+        if len(parts) > 1:
+            merged, target = "\n".join(parts), job.target
+            job.call = lambda: target.send(merged)
+        return job
+
+    async def _drain(self, route: Hashable):
+        lane = self._lanes[route]
+        job = None
+        try:
+            while lane:
+                job = self._merge_following(lane, lane.popleft())
+                await self._run(route, job)
+        finally:
+            # Worker bị huỷ (bot tắt): huỷ luôn các lệnh còn chờ thay vì để caller treo
+            while lane:
+                self._cancel(lane.popleft())
+            if job is not None:
+                self._cancel(job)
+            del self._workers[route]
+            del self._lanes[route]
+
+    async def _run(self, route: Hashable, job: _Job):
+        limiter = self._limiter(route)
+        for attempt in range(self.max_retries + 1):
+            await self._global.acquire_async()
+            await limiter.acquire_async()
+            try:
+                metrics.inc("discord_api_calls_total", route=route[0])
+                with metrics.timer(job.stage):
+                    result = await job.call()
+            except (discord.RateLimited, discord.HTTPException) as e:
+                retry_after = self._retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    self._finish(job, error=e)
+                    return
+                metrics.inc("discord_rate_limited_total", route=route[0])
+                logger.warning(
+                    f"Discord 429 on {route}, retry {attempt + 1}/{self.max_retries} in {retry_after:.1f}s"
+                )
+                limiter.pause(retry_after)
+                if self._is_global(e):
+                    self._global.pause(retry_after)
+                continue
+            except Exception as e:
+                self._finish(job, error=e)
+                return
+            self._finish(job, result=result)
+            return
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds to wait if `error` is a rate limit, None for any other error"""
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        if getattr(error, "status", None) != 429:
+            return None
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        return retry_after if retry_after is not None else 1.0
+
+    @staticmethod
+    def _is_global(error: Exception) -> bool:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        return headers.get("X-RateLimit-Scope") == "global" or headers.get("X-RateLimit-Global") == "true"
+
+    def _cancel(self, job: _Job):
+        self._release(job)
+        for future in job.futures:
+            future.cancel()
+
+    def _release(self, job: _Job):
+        if job.coalesce_key is not None and self._coalescing.get(job.coalesce_key) is job:
+            del self._coalescing[job.coalesce_key]
+
+    def _finish(self, job: _Job, result=None, error: Optional[Exception] = None):
+        self._release(job)
+        for future in job.futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,435 @@
+"""
+Local fake of LeetCode's GraphQL endpoint, for crawler tests and benchmarks
+
+    python fake_leetcode.py serve --port 8765 --latency-ms 80 --throttle-rate 0.05
+    LEETCODE_GRAPHQL_URL=http://127.0.0.1:8765/graphql python bulk_crawl.py --end 200
+
+    python fake_leetcode.py bench --problems 500 --concurrency 8 --error-rate 0.02
+    python fake_leetcode.py record --out recordings.json.gz --limit 300   # cần mạng
+
+Serves questionData (single and aliased batch queries) and questionList
+from recorded responses. Without a recording file, every problem in
+leetcode_data.csv is served with the sample question from test.py. Latency,
+5xx errors and 429s are injected from a seeded RNG, so runs are repeatable.
+"""
+
+import argparse
+import asyncio
+import copy
+import csv
+import gzip
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from crawl_api import AsyncLeetCodeAPICrawler, LeetCodeAPICrawler
+from metrics import Histogram
+from rate_limiter import RateLimiter, RetryPolicy
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+class Recordings:
+    """Recorded questionData payloads by slug, plus the questionList entries in order"""
+
+    def __init__(self, questions: Dict[str, Dict], listing: List[Dict]):
+        self.questions = questions
+        self.listing = listing
+
+    @classmethod
+    def load(cls, path: str) -> "Recordings":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["questions"], data["listing"])
+
+    def save(self, path: str):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            json.dump({"questions": self.questions, "listing": self.listing}, f)
+
+    @classmethod
+    def synthetic(cls, csv_file: str = "leetcode_data.csv") -> "Recordings":
+        """Every problem of the CSV, all sharing the sample question content from test.py"""
+        from test import test_data
+
+        template = test_data["data"]["question"]
+        questions, listing = {}, []
+        with open(csv_file, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                slug = row["url"].rstrip("/").rsplit("/", 1)[-1]
+                difficulty = DIFFICULTIES[int(row["id"]) % 3]
+                question = copy.deepcopy(template)
+                question.update(
+                    questionId=row["id"], title=row["title"], titleSlug=slug, difficulty=difficulty
+                )
+                questions[slug] = question
+                listing.append(
+                    {
+                        "frontendQuestionId": row["id"],
+                        "paidOnly": False,
+                        "title": row["title"],
+                        "titleSlug": slug,
+                        "difficulty": difficulty,
+                        "topicTags": question["topicTags"],
+                    }
+                )
+        return cls(questions, listing)
+
+    @classmethod
+    def record(cls, crawler: LeetCodeAPICrawler, limit: Optional[int] = None) -> "Recordings":
+        """Capture the real listing and question payloads (needs network)"""
+        listing = []
+        for question in crawler.iter_problem_list():
+            listing.append(question)
+            if limit is not None and len(listing) >= limit:
+                break
+        slugs = [q["titleSlug"] for q in listing if not q.get("paidOnly")]
+        fetched = crawler.fetch_questions(slugs)
+        questions = {slug: question for slug, question in fetched.items() if question}
+        return cls(questions, listing)
+
+
+class FaultProfile:
+    """What the fake server does to each request before answering it"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_rps: Optional[float] = None,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+        # Token bucket phía server: vượt max_rps thì trả 429 như LeetCode thật
+        self._tokens = max_rps or 0.0
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def over_rate(self) -> bool:
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.max_rps, self._tokens + (now - self._updated) * self.max_rps)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def fault(self) -> Optional[int]:
+        """Status code to fail this request with, or None to answer it"""
+        if self.over_rate():
+            return 429
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+
+class FakeLeetCodeServer:
+    """aiohttp app answering the crawler's GraphQL queries from recordings"""
+
+    def __init__(self, recordings: Recordings, faults: Optional[FaultProfile] = None):
+        self.recordings = recordings
+        self.faults = faults or FaultProfile()
+        self.stats: Counter = Counter()
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- handlers ----
+
+    def _question_data(self, variables: Dict) -> Dict:
+        slug = variables.get("titleSlug")
+        return {"data": {"question": self.recordings.questions.get(slug)}}
+
+    def _batch_question_data(self, variables: Dict) -> Dict:
+        data, errors = {}, []
+        for name, slug in variables.items():
+            alias = "q" + name[1:]
+            data[alias] = self.recordings.questions.get(slug)
+            if data[alias] is None:
+                errors.append({"message": "That question does not exist!", "path": [alias]})
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return response
+
+    def _question_list(self, variables: Dict) -> Dict:
+        skip = int(variables.get("skip") or 0)
+        limit = int(variables.get("limit") or 50)
+        listing = self.recordings.listing
+        return {
+            "data": {
+                "problemsetQuestionList": {
+                    "total": len(listing),
+                    "questions": listing[skip : skip + limit],
+                }
+            }
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        query = body.get("query", "")
+        variables = body.get("variables") or {}
+        operation = re.search(r"query\s+(\w+)", query)
+        operation = operation.group(1) if operation else "unknown"
+        self.stats["requests"] += 1
+        self.stats[f"op:{operation}"] += 1
+
+        delay = self.faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        status = self.faults.fault()
+        if status is not None:
+            self.stats[f"status:{status}"] += 1
+            headers = {"Retry-After": f"{self.faults.retry_after:g}"} if status == 429 else None
+            return web.Response(status=status, headers=headers, text="injected")
+
+        if operation == "batchQuestionData":
+            response = self._batch_question_data(variables)
+        elif "questionList" in query:
+            response = self._question_list(variables)
+        elif operation == "questionData":
+            response = self._question_data(variables)
+        else:
+            self.stats["status:400"] += 1
+            return web.json_response({"errors": [{"message": "unknown query"}]}, status=400)
+        self.stats["status:200"] += 1
+        return web.json_response(response)
+
+    # ---- lifecycle ----
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving on the running loop, return the GraphQL URL (port 0 picks a free port)"""
+        app = web.Application()
+        app.router.add_post("/graphql", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}/graphql"
+        logger.info(f"Fake LeetCode GraphQL on {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a background thread, for sync callers such as LeetCodeAPICrawler"""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.url
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+
+def _load_recordings(path: Optional[str], csv_file: str) -> Recordings:
+    if path:
+        return Recordings.load(path)
+    return Recordings.synthetic(csv_file)
+
+
+def _faults_from_args(args: argparse.Namespace) -> FaultProfile:
+    return FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+async def run_bench(args: argparse.Namespace) -> Dict:
+    """Crawl `args.problems` problems through the fake server and measure it"""
+    server = FakeLeetCodeServer(_load_recordings(args.recordings, args.csv), _faults_from_args(args))
+    url = await server.start()
+    crawler = AsyncLeetCodeAPICrawler(
+        pool_size=args.concurrency,
+        rate_limiter=RateLimiter(
+            rate=args.client_rate, burst=args.concurrency, max_concurrency=args.concurrency
+        ),
+        retry_policy=RetryPolicy(max_retries=args.max_retries, base_delay=args.retry_base_delay),
+        graphql_url=url,
+    )
+
+    slugs = [entry["titleSlug"] for entry in server.recordings.listing][: args.problems]
+    latency = Histogram()
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def crawl_one(slug: str) -> bool:
+        async with gate:
+            started = time.perf_counter()
+            problem = await crawler.get_problem_content(f"https://leetcode.com/problems/{slug}/")
+            latency.observe(time.perf_counter() - started)
+            return problem is not None
+
+    async def crawl_batch(chunk: List[str]) -> int:
+        async with gate:
+            started = time.perf_counter()
+            questions = await crawler.fetch_questions(chunk, args.batch_size, args.batch_size)
+            latency.observe(time.perf_counter() - started)
+            return sum(1 for question in questions.values() if question)
+
+    if args.batch_size > 1:
+        chunks = [slugs[i : i + args.batch_size] for i in range(0, len(slugs), args.batch_size)]
+        jobs = [crawl_batch(chunk) for chunk in chunks]
+    else:
+        jobs = [crawl_one(slug) for slug in slugs]
+
+    started = time.perf_counter()
+    try:
+        ok = sum(await asyncio.gather(*jobs))
+    finally:
+        elapsed = time.perf_counter() - started
+        await crawler.close()
+        await server.stop()
+
+    requests_made = server.stats["requests"]
+    return {
+        "problems": len(slugs),
+        "ok": ok,
+        "elapsed": elapsed,
+        "throughput": ok / elapsed if elapsed else 0.0,
+        "requests": requests_made,
+        "retries": requests_made - len(jobs),
+        "status": {key[7:]: value for key, value in server.stats.items() if key.startswith("status:")},
+        "p50": latency.percentile(50),
+        "p95": latency.percentile(95),
+        "p99": latency.percentile(99),
+        "max": latency.max,
+    }
+
+
+def print_bench(result: Dict, batch_size: int):
+    unit = f"batch of {batch_size}" if batch_size > 1 else "problem"
+    print(
+        f"📊 {result['ok']}/{result['problems']} bài trong {result['elapsed']:.2f}s"
+        f" ({result['throughput']:.1f} bài/s)"
+    )
+    print(
+        f"🔁 {result['requests']} request, {result['retries']} retry, status {dict(sorted(result['status'].items()))}"
+    )
+    print(
+        f"⏱️ Latency mỗi {unit}: p50 {result['p50'] * 1000:.0f}ms, p95 {result['p95'] * 1000:.0f}ms,"
+        f" p99 {result['p99'] * 1000:.0f}ms, max {result['max'] * 1000:.0f}ms"
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake LeetCode GraphQL server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the fake server")
+    bench = commands.add_parser("bench", help="measure the async crawler against the fake server")
+    record = commands.add_parser("record", help="record real responses into a file")
+
+    for sub in (serve, bench):
+        sub.add_argument("--recordings", default=None, help="file written by `record` (default: synthetic from --csv)")
+        sub.add_argument("--csv", default="leetcode_data.csv")
+        sub.add_argument("--latency-ms", type=float, default=0.0)
+        sub.add_argument("--jitter-ms", type=float, default=0.0)
+        sub.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+        sub.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered with HTTP 429")
+        sub.add_argument("--max-rps", type=float, default=None, help="answer 429 above this request rate")
+        sub.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429s")
+        sub.add_argument("--seed", type=int, default=0)
+
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    bench.add_argument("--problems", type=int, default=200)
+    bench.add_argument("--concurrency", type=int, default=8)
+    bench.add_argument("--batch-size", type=int, default=1, help=">1 uses batched questionData queries")
+    bench.add_argument("--client-rate", type=float, default=1000.0, help="client-side requests/s")
+    bench.add_argument("--max-retries", type=int, default=4)
+    bench.add_argument("--retry-base-delay", type=float, default=0.1)
+
+    record.add_argument("--out", required=True, help=".json or .json.gz")
+    record.add_argument("--limit", type=int, default=None, help="first N problems of the listing")
+    return parser.parse_args(argv)
+
+
+async def serve_forever(args: argparse.Namespace):
+    server = FakeLeetCodeServer(_load_recordings(args.recordings, args.csv), _faults_from_args(args))
+    url = await server.start(args.host, args.port)
+    print(f"🧪 LEETCODE_GRAPHQL_URL={url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.command == "record":
+        recordings = Recordings.record(LeetCodeAPICrawler(), args.limit)
+        recordings.save(args.out)
+        print(f"✅ Đã ghi {len(recordings.questions)}/{len(recordings.listing)} bài vào {args.out}")
+        return 0
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve_forever(args))
+        else:
+            print_bench(asyncio.run(run_bench(args)), args.batch_size)
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
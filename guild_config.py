@@ -0,0 +1,84 @@
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class GuildConfigStore:
+    """Per-guild bot settings (daily channel, time and timezone) persisted in SQLite"""
+
+    def __init__(self, db_file: str = "bot_state.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS guild_channels (
+                guild_id INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL
+            )
+            """
+        )
+        # Giờ đăng riêng của từng server, NULL là dùng DAILY_TIME/TIMEZONE_OFFSET
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(guild_channels)")}
+        for column in ("daily_time", "timezone"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE guild_channels ADD COLUMN {column} TEXT")
+
+    def set_channel(
+        self,
+        guild_id: int,
+        channel_id: int,
+        daily_time: Optional[str] = None,
+        timezone: Optional[str] = None,
+    ):
+        """Set the channel receiving the daily problem for a guild, time/timezone kept unless given"""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO guild_channels (guild_id, channel_id, daily_time, timezone)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    channel_id = excluded.channel_id,
+                    daily_time = COALESCE(excluded.daily_time, daily_time),
+                    timezone = COALESCE(excluded.timezone, timezone)
+                """,
+                (guild_id, channel_id, daily_time, timezone),
+            )
+
+    def remove_channel(self, guild_id: int) -> bool:
+        """Stop daily posts for a guild, return False if it had none"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM guild_channels WHERE guild_id = ?", (guild_id,)
+            )
+        return cursor.rowcount > 0
+
+    def get_channel(self, guild_id: int) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id FROM guild_channels WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def all_channels(self) -> Dict[int, int]:
+        """Map guild id -> daily channel id for every configured guild"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT guild_id, channel_id FROM guild_channels"
+            ).fetchall()
+        return dict(rows)
+
+    def all_schedules(self) -> Dict[int, Tuple[int, Optional[str], Optional[str]]]:
+        """Map guild id -> (channel id, daily time, timezone) for every configured guild"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT guild_id, channel_id, daily_time, timezone FROM guild_channels"
+            ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,10 +2,17 @@ import json
 import logging
 import os
 import random
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from crawl_api import LeetCodeAPICrawler
+from crawl_api import AsyncLeetCodeAPICrawler, CatalogCache, LeetCodeAPICrawler
+from metrics import metrics
+from problem_cache import ProblemCache, ProblemRecord
+from problem_store import ProblemStore
+from record_log import ProblemLogStore
+from renderer import DISCORD_MESSAGE_LIMIT, TEMPLATE_VERSION, chunk_sections
+from selection import PostedHistory, ProblemSelector
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -13,82 +20,116 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def open_problem_store(db_file: str):
+    """Open the problem store, a .log file uses the compressed record log, anything else SQLite"""
+    if db_file.endswith(".log"):
+        return ProblemLogStore(db_file)
+    return ProblemStore(db_file)
+
+
 class LeetCodeIntegration:
-    def __init__(self, data_file: str = "problems.json"):
+    def __init__(
+        self,
+        data_file: str = "problems.json",
+        db_file: str = "problems.db",
+        cache_size: int = 256,
+        cache_bytes: int = 8 * 1024 * 1024,
+        state_file: str = "bot_state.db",
+        daily_difficulty: Optional[str] = None,
+        daily_topics: Tuple[str, ...] = (),
+    ):
         self.data_file = data_file
         self.crawler = LeetCodeAPICrawler()
-        self.problems = self._load_problems()
+        self.async_crawler = AsyncLeetCodeAPICrawler()
+        self.catalog = CatalogCache(self.async_crawler)
+        self.store = open_problem_store(db_file)
+        # Recently used problems as compact records, backed by the store
+        self.problems = ProblemCache(cache_size, cache_bytes)
+        metrics.register_gauge("problem_cache", self.problems.stats)
+        # (problem id, template version, chunk limit) -> rendered chunks, LRU
+        # giới hạn như ProblemCache; bài cũ hơn vẫn còn trong store
+        self._rendered: "OrderedDict[Tuple[str, int, int], List[str]]" = OrderedDict()
+        self._rendered_size = cache_size
+        self._migrate_json_problems()
 
-    def _load_problems(self) -> Dict:
-        """Load problems from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Handle migration from list format to dict format
-                if isinstance(data, list):
-                    logger.info(
-                        f"Migrating {len(data)} problems from list format to dict format"
-                    )
-                    problems_dict = {}
-                    for i, problem in enumerate(data):
-                        # Generate ID if not present
-                        problem_id = str(problem.get("id", i + 1))
-                        problems_dict[problem_id] = problem
-
-                    # Save in new format
-                    with open(self.data_file, "w", encoding="utf-8") as f:
-                        json.dump(problems_dict, f, indent=2, ensure_ascii=False)
-
-                    logger.info(
-                        f"Migration completed. Saved {len(problems_dict)} problems in dict format"
-                    )
-                    return problems_dict
-                elif isinstance(data, dict):
-                    return data
-                else:
-                    logger.error(
-                        f"Unexpected data type in {self.data_file}: {type(data)}"
-                    )
-                    return {}
+        # Bộ lọc bài hàng ngày, chỉ dùng khi selector đã được load từ catalog
+        self.daily_difficulty = daily_difficulty
+        self.daily_topics = tuple(daily_topics)
+        self.posted = PostedHistory(state_file)
+        self.selector: Optional[ProblemSelector] = None
 
-            except Exception as e:
-                logger.error(f"Error loading problems: {e}")
-        return {}
+    def _migrate_json_problems(self):
+        """Import the legacy problems.json into the store (only when store is empty)"""
+        if not os.path.exists(self.data_file) or len(self.store) > 0:
+            return
 
-    def _save_problems(self):
-        """Save problems to JSON file"""
         try:
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(self.problems, f, indent=2, ensure_ascii=False)
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            # Handle migration from list format to dict format
+            if isinstance(data, list):
+                data = {
+                    str(problem.get("id", i + 1)): problem
+                    for i, problem in enumerate(data)
+                }
+            elif not isinstance(data, dict):
+                logger.error(f"Unexpected data type in {self.data_file}: {type(data)}")
+                return
+
+            for problem_id, problem in data.items():
+                problem.setdefault("id", problem_id)
+                self.store.upsert(problem)
+
+            logger.info(
+                f"Migration completed. Imported {len(data)} problems from {self.data_file}"
+            )
         except Exception as e:
-            logger.error(f"Error saving problems: {e}")
+            logger.error(f"Error loading problems: {e}")
 
-    def add_problem_by_url(self, url: str) -> Optional[Dict]:
-        """Add problem by crawling URL"""
+    def _save_problem(self, problem: Dict):
+        """Persist a single problem, costs one row write"""
         try:
-            logger.info(f"Starting to add problem from URL: {url}")
-            problem_data = self.crawler.get_problem_content(url)
-            logger.info(f"Got problem_data: {problem_data is not None}")
+            self.store.upsert(problem)
+        except Exception as e:
+            logger.error(f"Error saving problem: {e}")
 
-            if not problem_data:
-                logger.error("No problem data returned from crawler")
-                return None
+    def get_problem(self, problem_id) -> Optional[ProblemRecord]:
+        """Get a problem by id from memory or the persistent store"""
+        problem = self.problems.get(problem_id)
+        if problem is None:
+            problem = self.store.get(problem_id)
+            if problem is not None:
+                problem = self.problems.put(problem)
+        return problem
 
-            logger.info(f"Problem title: {problem_data.get('title', 'No title')}")
-            logger.info(f"Problem ID: {problem_data.get('id', 'No ID')}")
+    def _get_cached_problem(self, url: str) -> Optional[ProblemRecord]:
+        """Look up a problem URL in the store before going to the network"""
+        slug = self.crawler._extract_slug_from_url(url)
+        if not slug:
+            return None
 
-            problem_id = str(problem_data["id"])
-            logger.info(f"Using problem_id: {problem_id}")
+        problem = self.problems.get_by_slug(slug)
+        if problem is not None:
+            return problem
 
-            self.problems[problem_id] = problem_data
-            logger.info(f"Added to problems dict, total problems: {len(self.problems)}")
+        problem = self.store.get_by_slug(slug)
+        if problem is not None:
+            logger.info(f"Cache hit for slug: {slug}")
+            problem = self.problems.put(problem)
+        metrics.inc("problem_store_total", result="miss" if problem is None else "hit")
+        return problem
 
-            # self._save_problems()
-            # logger.info("Saved problems to file")
+    def add_problem_by_url(self, url: str) -> Optional[ProblemRecord]:
+        """Add problem by crawling URL"""
+        try:
+            cached = self._get_cached_problem(url)
+            if cached is not None:
+                return cached
 
-            return problem_data
+            logger.info(f"Starting to add problem from URL: {url}")
+            problem_data = self.crawler.get_problem_content(url)
+            return self._register_problem(problem_data)
         except Exception as e:
             logger.error(f"Error adding problem: {e}")
             import traceback
@@ -96,6 +137,87 @@ class LeetCodeIntegration:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
 
+    async def add_problem_by_url_async(self, url: str) -> Optional[ProblemRecord]:
+        """Add problem by crawling URL without blocking the event loop"""
+        try:
+            cached = self._get_cached_problem(url)
+            if cached is not None:
+                return cached
+
+            logger.info(f"Starting to add problem from URL: {url}")
+            problem_data = await self.async_crawler.get_problem_content(url)
+            return self._register_problem(problem_data)
+        except Exception as e:
+            logger.error(f"Error adding problem: {e}")
+            import traceback
+
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return None
+
+    def _register_problem(self, problem_data: Optional[Dict]) -> Optional[ProblemRecord]:
+        """Persist a freshly crawled problem and keep it in the problem cache"""
+        logger.info(f"Got problem_data: {problem_data is not None}")
+
+        if not problem_data:
+            logger.error("No problem data returned from crawler")
+            return None
+
+        logger.info(f"Problem title: {problem_data.get('title', 'No title')}")
+        logger.info(f"Problem ID: {problem_data.get('id', 'No ID')}")
+
+        problem_id = str(problem_data["id"])
+        logger.info(f"Using problem_id: {problem_id}")
+
+        self._save_problem(problem_data)
+        self._forget_rendered(problem_id)
+
+        record = self.problems.put(problem_data)
+        logger.info(f"Added to problem cache, cached problems: {len(self.problems)}")
+        return record
+
+    def _forget_rendered(self, problem_id: str):
+        for key in [key for key in self._rendered if key[0] == problem_id]:
+            del self._rendered[key]
+
+    async def close(self):
+        """Release network resources held by the async crawler"""
+        await self.catalog.close()
+        await self.async_crawler.close()
+        self.store.close()
+        self.posted.close()
+
+    async def load_selector(self) -> Optional[ProblemSelector]:
+        """(Re)build the topic/difficulty indexes from the problem catalog"""
+        questions = await self.catalog.get()
+        if not questions:
+            logger.error("Problem catalog is empty, selector not loaded")
+            return self.selector
+
+        self.selector = ProblemSelector.build(questions, self.posted.ids())
+        logger.info(f"Problem selector loaded: {len(self.selector)} problems")
+        return self.selector
+
+    @property
+    def has_daily_filter(self) -> bool:
+        return bool(self.daily_difficulty or self.daily_topics)
+
+    def _filtered_after(self, problem_id: int, count: int) -> List[int]:
+        return self.selector.next_after(
+            problem_id,
+            count,
+            difficulty=self.daily_difficulty,
+            topics=self.daily_topics,
+        )
+
+    def mark_posted(self, problem_id: int):
+        """Record a problem as posted so filtered picks skip it"""
+        try:
+            self.posted.add(problem_id)
+        except Exception as e:
+            logger.error(f"Error saving posted problem: {e}")
+        if self.selector is not None:
+            self.selector.mark_posted(problem_id)
+
     def get_current_problem(self) -> Optional[int]:
         """Get current problem ID from file, increment it, and save back to file"""
         try:
@@ -123,12 +245,93 @@ class LeetCodeIntegration:
             logger.error(f"Error reading/writing current_problem.txt: {e}")
             return None
 
-    def format_problem_for_discord(self, problem: Dict) -> str:
-        content = self.crawler.format_problem_for_discord(problem)
-        if len(content) > 1950:
-            content = content[:1950] + "..."
-        return content
+    def peek_upcoming_problems(self, count: int) -> List[int]:
+        """Get the next `count` problem IDs without moving the cursor"""
+        try:
+            with open("current_problem.txt", "r") as f:
+                current_id = int(f.read().strip())
+        except Exception as e:
+            logger.error(f"Error reading current_problem.txt: {e}")
+            return []
 
-    def get_daily_challenge(self) -> Optional[int]:
-        """Get a random problem for daily challenge"""
-        return self.get_current_problem()
+        if self.has_daily_filter and self.selector is not None:
+            return self._filtered_after(current_id, count)
+        return [current_id + offset for offset in range(1, count + 1)]
+
+    def render_problem(
+        self, problem: Dict, limit: int = DISCORD_MESSAGE_LIMIT
+    ) -> List[str]:
+        """Render a problem into Discord-sized messages, cached per template version"""
+        key = (str(problem["id"]), TEMPLATE_VERSION, limit)
+        chunks = self._rendered.get(key)
+        if chunks is not None:
+            metrics.inc("render_cache_total", result="hit")
+            self._rendered.move_to_end(key)
+            return chunks
+
+        chunks = self.store.get_rendered(*key)
+        if chunks is None:
+            metrics.inc("render_cache_total", result="miss")
+            with metrics.timer("render"):
+                chunks = chunk_sections(
+                    self.crawler.render_sections(problem, max_description=None), limit
+                )
+            try:
+                self.store.put_rendered(*key, chunks)
+            except Exception as e:
+                logger.error(f"Error saving rendered problem: {e}")
+        else:
+            metrics.inc("render_cache_total", result="hit")
+        self._rendered[key] = chunks
+        while len(self._rendered) > self._rendered_size:
+            self._rendered.popitem(last=False)
+        return chunks
+
+    def get_daily_challenge(self, day: Optional[str] = None) -> Optional[int]:
+        """
+        Get the next daily problem, honouring the difficulty/topic filter if set
+
+        With `day` (ISO date) the pick is remembered, so later runs for the same
+        day (other timezones, catch-up after a restart) get the same problem
+        instead of moving the cursor again.
+        """
+        if day is None:
+            return self._next_daily_problem()
+
+        try:
+            picked = self.posted.pick_for(day)
+        except Exception as e:
+            logger.error(f"Error reading daily pick: {e}")
+            picked = None
+        if picked is not None:
+            return picked
+
+        problem_id = self._next_daily_problem()
+        if problem_id is not None:
+            try:
+                self.posted.set_pick(day, problem_id)
+            except Exception as e:
+                logger.error(f"Error saving daily pick: {e}")
+        return problem_id
+
+    def _next_daily_problem(self) -> Optional[int]:
+        if not self.has_daily_filter:
+            return self.get_current_problem()
+        if self.selector is None:
+            logger.warning("Daily filter set but selector not loaded, using next id")
+            return self.get_current_problem()
+
+        upcoming = self.peek_upcoming_problems(1)
+        if not upcoming:
+            logger.error(
+                f"No unposted problem matches difficulty={self.daily_difficulty} topics={self.daily_topics}"
+            )
+            return None
+
+        try:
+            with open("current_problem.txt", "w") as f:
+                f.write(str(upcoming[0]))
+        except Exception as e:
+            logger.error(f"Error writing current_problem.txt: {e}")
+            return None
+        return upcoming[0]
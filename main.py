@@ -1,28 +1,80 @@
+import asyncio
 import random
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 import discord
+from discord import app_commands
 from discord.ext import tasks
 
 from analyst import get_url_from_data, load_leetcode_data
 from bot_config import DISCORD_BOT_TOKEN, bot
+from discord_queue import OutboundQueue
+from metrics import metrics
+from prefetch import DailyPrefetcher
+from profiling import MODES, ProfilerSwitch
+from publisher import DailyPublisher
+from renderer import DISCORD_MESSAGE_LIMIT
+from scheduler import DailyScheduler, Due, ScheduleStore, parse_time, parse_timezone
+from selection import DIFFICULTIES
+from title_search import TitleSearchIndex
 
 leetcode_data = load_leetcode_data("leetcode_data.csv")
+title_index: Optional[TitleSearchIndex] = None
 
+# Chừa chỗ cho header và lời chúc của format_daily_challenge
+BODY_CHUNK_LIMIT = DISCORD_MESSAGE_LIMIT - 100
 
-def format_daily_challenge(problem: Dict) -> str:
-    """Format daily challenge content"""
-    today = datetime.now()
+# Mọi lệnh tạo thread và gửi message đều đi qua hàng đợi này
+outbound = OutboundQueue()
 
-    content = f"""*📌 # LeetCode Daily Challenge ({today.strftime('%d/%m/%Y')})*
+publisher = DailyPublisher(
+    bot, max_parallel=int(bot.config.get("PUBLISH_PARALLELISM") or 5)
+)
 
-{bot.leetcode.format_problem_for_discord(problem)}
+prefetcher = DailyPrefetcher(
+    bot.leetcode,
+    lambda problem_id: problem_url(problem_id),
+    count=int(bot.config.get("PREFETCH_COUNT") or 3),
+    chunk_limit=BODY_CHUNK_LIMIT,
+)
 
-**GOOD LUCK CODING! 🚀**
+profiler = ProfilerSwitch(bot.config.get("PROFILE_DIR") or "profiles")
 
-"""
-    return content
+# Giờ đăng mặc định, server nào chưa chọn giờ riêng thì dùng
+default_daily_time = parse_time(bot.config.get("DAILY_TIME"))
+default_timezone = parse_timezone(bot.config.get("TIMEZONE_OFFSET"))
+
+
+def local_today() -> date:
+    """Today in TIMEZONE_OFFSET, for posts that don't come from a schedule"""
+    return datetime.now(default_timezone).date()
+
+
+def get_title_index() -> TitleSearchIndex:
+    """Build the title search index on first use"""
+    global title_index
+    if title_index is None:
+        title_index = TitleSearchIndex.build(leetcode_data.titles())
+    return title_index
+
+
+def format_daily_challenge(
+    problem: Dict, chunks: Optional[List[str]] = None, day: Optional[date] = None
+) -> List[str]:
+    """Format daily challenge content as a list of Discord messages, dated `day` (today by default)"""
+    day = day or local_today()
+    if chunks is None:
+        chunks = bot.leetcode.render_problem(problem, BODY_CHUNK_LIMIT)
+
+    # Header vào message đầu, lời chúc vào message cuối
+    messages = list(chunks) or [""]
+    messages[0] = (
+        f"*📌 # LeetCode Daily Challenge ({day.strftime('%d/%m/%Y')})*\n\n"
+        + messages[0]
+    )
+    messages[-1] += "\n\n**GOOD LUCK CODING! 🚀**"
+    return messages
 
 
 async def check_permission(interaction) -> bool:
@@ -40,73 +92,162 @@ async def on_ready():
     print(f"🤖 {bot.user} đã kết nối thành công!")
     print(f"🌐 Đang phục vụ {len(bot.guilds)} server(s)")
 
-    if not daily_dsa_task.is_running():
-        daily_dsa_task.start()
+    # Build index tìm kiếm trước để autocomplete không phải chờ
+    print(f"🔎 Đã index {len(get_title_index())} tiêu đề bài toán")
 
+    # Load catalog cho selector ở nền, không chặn on_ready
+    if bot.leetcode.selector is None:
+        asyncio.create_task(load_selector())
 
-@tasks.loop(hours=24)
-async def daily_dsa_task():
-    """Daily task to create DSA thread"""
-    if not bot.config.get("CHANNEL_ID"):
-        print("❌ Chưa cấu hình CHANNEL_ID")
-        return
+    # Lịch chạy được đăng bù ngay nếu lỡ giờ trong lúc bot tắt
+    scheduler.sync(daily_schedules())
+    scheduler.start()
+    print(f"⏰ Đã lên lịch bài hàng ngày cho {len(scheduler)} channel")
+
+    if not prefetch_task.is_running():
+        prefetch_task.start()
 
+
+async def load_selector():
     try:
-        channel = bot.get_channel(bot.config["CHANNEL_ID"])
-        if not channel or not isinstance(channel, discord.TextChannel):
-            print(f"❌ Không tìm thấy text channel với ID: {bot.config['CHANNEL_ID']}")
-            return
+        selector = await bot.leetcode.load_selector()
+        if selector is not None:
+            print(f"🎯 Đã index {len(selector)} bài toán theo độ khó và chủ đề")
+    except Exception as e:
+        print(f"❌ Lỗi khi load danh sách bài toán: {e}")
+
+
+def problem_url(problem_id) -> Optional[str]:
+    """URL from the local CSV, falling back to the catalog slug"""
+    url = get_url_from_data(leetcode_data, problem_id)
+    if url is None and bot.leetcode.selector is not None:
+        slug = bot.leetcode.selector.slug(problem_id)
+        if slug:
+            url = f"https://leetcode.com/problems/{slug}/"
+    return url
+
+
+def daily_channel_ids() -> List[int]:
+    """Channels receiving the daily problem: every configured guild plus CHANNEL_ID"""
+    channel_ids = list(bot.guild_config.all_channels().values())
+    if bot.config.get("CHANNEL_ID"):
+        channel_ids.append(int(bot.config["CHANNEL_ID"]))
+    return channel_ids
+
+
+def daily_schedules() -> Dict[str, tuple]:
+    """Schedule key -> (time, timezone, channel id) for every channel receiving the daily problem"""
+    schedules = {}
+    for guild_id, (channel_id, daily_time, timezone) in bot.guild_config.all_schedules().items():
+        try:
+            at = parse_time(daily_time) if daily_time else default_daily_time
+            tz = parse_timezone(timezone) if timezone else default_timezone
+        except ValueError as e:
+            print(f"⚠️ Giờ đăng của server {guild_id} không hợp lệ ({e}), dùng giờ mặc định")
+            at, tz = default_daily_time, default_timezone
+        schedules[f"guild:{guild_id}"] = (at, tz, channel_id)
+    if bot.config.get("CHANNEL_ID"):
+        channel_id = int(bot.config["CHANNEL_ID"])
+        schedules[f"channel:{channel_id}"] = (default_daily_time, default_timezone, channel_id)
+    return schedules
+
+
+async def run_scheduled_posts(due: List[Due]):
+    """Post the daily problem to the channels whose time has come, one problem per local day"""
+    by_day: Dict[str, List[int]] = {}
+    for job in due:
+        by_day.setdefault(job.day, []).append(job.payload)
+    for day, channel_ids in sorted(by_day.items()):
+        await profiler.run_daily(
+            lambda channel_ids=channel_ids, day=day: publish_daily_challenge(channel_ids, day)
+        )
+
+
+scheduler = DailyScheduler(run_scheduled_posts, ScheduleStore())
+
+
+async def stop_scheduler():
+    await scheduler.stop()
+    scheduler.store.close()
 
-        problem_id = bot.leetcode.get_daily_challenge()
+
+# Dừng lịch trước rồi mới dừng hàng đợi mà các bài đăng dùng
+bot.shutdown_hooks += [stop_scheduler, outbound.close]
+
+
+async def publish_daily_challenge(
+    channel_ids: Optional[List[int]] = None, day: Optional[str] = None
+):
+    """Post the daily problem of `day` (ISO date) to the channels, every daily channel by default"""
+    if channel_ids is None:
+        channel_ids = daily_channel_ids()
+    if not channel_ids:
+        print("❌ Chưa cấu hình CHANNEL_ID hoặc /set_daily_channel cho server nào")
+        return
+
+    try:
+        problem_id = bot.leetcode.get_daily_challenge(day)
         if not problem_id:
             print("❌ Lỗi khi lấy bài toán hàng ngày")
             return
 
-        problem = await crawl_problem(problem_id)
+        # Bài đã được prefetch thì chỉ cần tra cứu local, không thì crawl trực tiếp
+        prefetched = prefetcher.get(problem_id)
+        if prefetched:
+            problem, chunks = prefetched
+        else:
+            print(f"⚠️ Bài {problem_id} chưa được prefetch, crawl trực tiếp...")
+            problem = await crawl_problem(problem_id)
+            chunks = None
         if not problem:
             print("❌ Lỗi khi crawl bài toán từ LeetCode!")
             return
 
-        today = datetime.now()
-        thread_name = f"🧪 **LeetCode - {today.strftime('%d/%m')} - {problem['title']} - {problem['difficulty']}**"
-
-        thread = await channel.create_thread(
-            name=thread_name, reason="Daily DSA Challenge"
+        # Ngày trên tiêu đề là ngày của lịch chạy, khớp với bài đã chọn cho ngày đó
+        label = date.fromisoformat(day) if day else None
+        # Crawl và render một lần, gửi tới tất cả các channel
+        content = format_daily_challenge(problem, chunks, label)
+        results = await publisher.publish(
+            channel_ids,
+            lambda channel: post_problem_thread(
+                channel, problem, reason="Daily DSA Challenge", content=content, day=label
+            ),
         )
 
-        msg = await channel.send(f"{thread_name}")
-
-        thread = await msg.create_thread(
-            name=thread_name, auto_archive_duration=60, reason="Test DSA Challenge"
+        failed = [channel_id for channel_id, error in results.items() if error]
+        if len(failed) < len(results):
+            bot.leetcode.mark_posted(problem_id)
+        print(
+            f"✅ Đã tạo thread {problem['title']} cho {len(results) - len(failed)}/{len(results)} channel"
         )
-
-        content = format_daily_challenge(problem)
-        await thread.send(content)
-
-        print(f"✅ Đã tạo thread: {thread_name}")
+        if failed:
+            print(f"❌ Lỗi khi tạo thread ở các channel: {failed}")
 
     except Exception as e:
         print(f"❌ Lỗi khi tạo thread: {e}")
 
 
-@daily_dsa_task.before_loop
-async def before_daily_task():
-    """Wait until specified time to run task"""
-    await bot.wait_until_ready()
+@tasks.loop(hours=1)
+async def prefetch_task():
+    """Crawl upcoming daily problems hours before they are posted"""
+    # Bộ lọc hàng ngày cần selector để biết các bài sắp tới
+    if bot.leetcode.has_daily_filter:
+        await load_selector()
 
-    now = datetime.now()
-    target_time = datetime.strptime(
-        bot.config.get("DAILY_TIME", "07:00"), "%H:%M"
-    ).time()
-    next_run = datetime.combine(now.date(), target_time)
+    try:
+        ready = await prefetcher.prefetch()
+        print(f"📥 Đã prefetch {ready}/{prefetcher.count} bài sắp tới")
+    except Exception as e:
+        print(f"❌ Lỗi khi prefetch bài toán: {e}")
 
-    if next_run <= now:
-        next_run += timedelta(days=1)
 
-    await discord.utils.sleep_until(next_run)
+@prefetch_task.before_loop
+async def before_prefetch_task():
+    await bot.wait_until_ready()
 
 
 @bot.tree.command(name="test_dsa", description="Tạo thread DSA test ngay lập tức")
+@profiler.command("test_dsa")
 async def test_thread(interaction: discord.Interaction):
     """Test creating a DSA thread immediately"""
     has_permission = await check_permission(interaction)
@@ -122,25 +263,20 @@ async def test_thread(interaction: discord.Interaction):
     try:
         await interaction.response.defer()
 
-        problem_id = random.randint(1, 100)
-        problem = await crawl_problem(problem_id)
+        # Ưu tiên bài miễn phí chưa đăng, chưa load selector thì random như cũ
+        problem_id = None
+        if bot.leetcode.selector is not None:
+            problem_id = bot.leetcode.selector.pick_random()
+        problem = await crawl_problem(problem_id or random.randint(1, 100))
 
         if not problem:
             await interaction.followup.send("❌ Lỗi khi crawl bài toán từ LeetCode!")
             return
 
-        today = datetime.now()
-        thread_name = f"🧪 **LeetCode - {today.strftime('%d/%m')} - {problem['title']} - {problem['difficulty']}**"
-
-        # Gửi message vào channel trước để tạo thread public
-        msg = await interaction.channel.send(f"{thread_name}")
-        thread = await msg.create_thread(
-            name=thread_name, auto_archive_duration=60, reason="Test DSA Challenge"
+        thread = await post_problem_thread(
+            interaction.channel, problem, reason="Test DSA Challenge"
         )
 
-        content = format_daily_challenge(problem)
-        await thread.send(content)
-
         await interaction.followup.send(
             f"✅ Đã tạo thread: {thread.mention}",
             ephemeral=True,  # hoặc False nếu muốn mọi người đều thấy
@@ -150,11 +286,315 @@ async def test_thread(interaction: discord.Interaction):
         print(f"❌ Lỗi khi tạo thread test: {str(e)}")
 
 
+@bot.tree.command(name="problem", description="Tạo thread cho một bài toán theo tên hoặc ID")
+@app_commands.describe(query="Tên hoặc ID bài toán")
+@profiler.command("problem")
+async def problem_thread(interaction: discord.Interaction, query: str):
+    """Create a thread for a problem picked by title search"""
+    has_permission = await check_permission(interaction)
+    if has_permission == False:
+        return
+
+    if not isinstance(interaction.channel, discord.TextChannel):
+        await interaction.response.send_message(
+            "❌ Lệnh này chỉ có thể sử dụng trong text channel!", ephemeral=True
+        )
+        return
+
+    # Autocomplete trả về ID, nếu người dùng tự gõ thì lấy kết quả tìm kiếm tốt nhất
+    results = get_title_index().search(query, limit=1)
+    if not results:
+        await interaction.response.send_message(
+            f"❌ Không tìm thấy bài toán nào khớp với: {query}", ephemeral=True
+        )
+        return
+
+    try:
+        await interaction.response.defer()
+
+        problem = await crawl_problem(results[0][0])
+        if not problem:
+            await interaction.followup.send("❌ Lỗi khi crawl bài toán từ LeetCode!")
+            return
+
+        thread = await post_problem_thread(
+            interaction.channel, problem, reason="DSA Challenge"
+        )
+        await interaction.followup.send(
+            f"✅ Đã tạo thread: {thread.mention}", ephemeral=True
+        )
+
+    except Exception as e:
+        print(f"❌ Lỗi khi tạo thread: {str(e)}")
+
+
+@problem_thread.autocomplete("query")
+async def problem_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> List[app_commands.Choice[str]]:
+    """Suggest problems while the user types, must answer within Discord's 3s window"""
+    return [
+        app_commands.Choice(name=f"{problem_id}. {title}"[:100], value=str(problem_id))
+        for problem_id, title in get_title_index().search(current, limit=25)
+    ]
+
+
+@bot.tree.command(
+    name="random_problem", description="Tạo thread cho một bài ngẫu nhiên theo độ khó/chủ đề"
+)
+@app_commands.describe(
+    difficulty="Độ khó", topic="Chủ đề, ví dụ Dynamic Programming", include_posted="Cho phép chọn cả bài đã đăng"
+)
+@app_commands.choices(
+    difficulty=[app_commands.Choice(name=d, value=d) for d in DIFFICULTIES]
+)
+@profiler.command("random_problem")
+async def random_problem(
+    interaction: discord.Interaction,
+    difficulty: Optional[app_commands.Choice[str]] = None,
+    topic: Optional[str] = None,
+    include_posted: bool = False,
+):
+    """Create a thread for a random problem matching the filters"""
+    has_permission = await check_permission(interaction)
+    if has_permission == False:
+        return
+
+    if not isinstance(interaction.channel, discord.TextChannel):
+        await interaction.response.send_message(
+            "❌ Lệnh này chỉ có thể sử dụng trong text channel!", ephemeral=True
+        )
+        return
+
+    selector = bot.leetcode.selector
+    if selector is None:
+        await interaction.response.send_message(
+            "⏳ Danh sách bài toán đang được tải, thử lại sau ít phút", ephemeral=True
+        )
+        return
+
+    problem_id = selector.pick_random(
+        difficulty=difficulty.value if difficulty else None,
+        topics=(topic,) if topic else (),
+        exclude_posted=not include_posted,
+    )
+    if problem_id is None:
+        await interaction.response.send_message(
+            "❌ Không có bài toán nào khớp với bộ lọc này", ephemeral=True
+        )
+        return
+
+    try:
+        await interaction.response.defer()
+
+        problem = await crawl_problem(problem_id)
+        if not problem:
+            await interaction.followup.send("❌ Lỗi khi crawl bài toán từ LeetCode!")
+            return
+
+        thread = await post_problem_thread(
+            interaction.channel, problem, reason="DSA Challenge"
+        )
+        await interaction.followup.send(
+            f"✅ Đã tạo thread: {thread.mention}", ephemeral=True
+        )
+
+    except Exception as e:
+        print(f"❌ Lỗi khi tạo thread: {str(e)}")
+
+
+@random_problem.autocomplete("topic")
+async def topic_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> List[app_commands.Choice[str]]:
+    selector = bot.leetcode.selector
+    if selector is None:
+        return []
+    current = current.lower()
+    return [
+        app_commands.Choice(name=topic, value=topic)
+        for topic in selector.topics()
+        if current in topic.lower()
+    ][:25]
+
+
+def format_stats(snapshot: Dict) -> str:
+    """Render a metrics snapshot as a compact Discord message"""
+    lines = [f"**📊 Bot stats** (uptime {snapshot['uptime'] / 3600:.1f}h)", "```"]
+    lines.append(f"{'stage':<22}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for stage, values in sorted(snapshot["stages"].items()):
+        lines.append(
+            f"{stage:<22}{values['count']:>6}"
+            + "".join(f"{values[q] * 1000:>7.1f}ms" for q in ("p50", "p95", "p99"))
+        )
+
+    # Tỉ lệ hit của các cache
+    counters = snapshot["counters"]
+    for name in ("render_cache_total", "problem_store_total"):
+        hits = counters.get((name, (("result", "hit"),)), 0)
+        misses = counters.get((name, (("result", "miss"),)), 0)
+        if hits + misses:
+            lines.append(f"{name[:-6] + ' hit rate':<22}{hits / (hits + misses):>6.0%}")
+    cache = snapshot["gauges"].get("problem_cache")
+    if cache:
+        lines.append(
+            f"{'problem_cache hit rate':<22}{cache['hit_rate']:>6.0%}"
+            f"  ({cache['entries']} entries, {cache['evictions']} evicted)"
+        )
+
+    for (name, labels), value in sorted(counters.items()):
+        if name.startswith("graphql_") or name == "singleflight_joins_total":
+            label = ",".join(value for _, value in labels)
+            lines.append(f"{name + (f'[{label}]' if label else ''):<40}{value:>8g}")
+    lines.append("```")
+    return "\n".join(lines)[:DISCORD_MESSAGE_LIMIT]
+
+
+@bot.tree.command(name="stats", description="Xem thời gian xử lý và tỉ lệ cache của bot")
+async def stats(interaction: discord.Interaction):
+    """Show per-stage latency percentiles, cache hit ratios and upstream errors"""
+    if not metrics.enabled:
+        await interaction.response.send_message(
+            "ℹ️ Metrics đang tắt (METRICS_ENABLED=0)", ephemeral=True
+        )
+        return
+    await interaction.response.send_message(
+        format_stats(metrics.snapshot()), ephemeral=True
+    )
+
+
+@bot.tree.command(
+    name="profile", description="Profile các lần chạy lệnh tiếp theo hoặc lần đăng bài hàng ngày"
+)
+@app_commands.describe(
+    runs="Số lần chạy lệnh tiếp theo cần profile (0 để tắt)",
+    daily="Profile cả lần đăng bài hàng ngày tiếp theo",
+    mode="cprofile (đầy đủ, chậm hơn) hoặc sampling (nhẹ, lấy mẫu stack)",
+)
+@app_commands.choices(mode=[app_commands.Choice(name=m, value=m) for m in MODES])
+@app_commands.default_permissions(administrator=True)
+async def profile(
+    interaction: discord.Interaction,
+    runs: app_commands.Range[int, 0, 20] = 1,
+    daily: bool = False,
+    mode: Optional[app_commands.Choice[str]] = None,
+):
+    """Arm the profiler for the next command runs and/or the next daily run"""
+    permissions = getattr(interaction.user, "guild_permissions", None)
+    if not interaction.guild or permissions is None or not permissions.administrator:
+        await interaction.response.send_message(
+            "❌ Chỉ admin của server mới dùng được lệnh này!", ephemeral=True
+        )
+        return
+
+    if runs == 0 and not daily:
+        profiler.disarm()
+        await interaction.response.send_message("✅ Đã tắt profiler", ephemeral=True)
+        return
+
+    profiler.arm(runs, daily, mode.value if mode else "cprofile", interaction.user)
+    target = [f"{runs} lần chạy lệnh tiếp theo"] if runs else []
+    if daily:
+        target.append("lần đăng bài hàng ngày tiếp theo (gửi qua DM)")
+    await interaction.response.send_message(
+        f"🔬 Sẽ profile ({profiler.mode}) {' và '.join(target)}", ephemeral=True
+    )
+
+
+@bot.tree.command(
+    name="set_daily_channel", description="Chọn channel nhận bài toán hàng ngày của server"
+)
+@app_commands.describe(
+    channel="Text channel nhận bài (mặc định: channel hiện tại)",
+    time="Giờ đăng HH:MM (mặc định: DAILY_TIME)",
+    timezone="Múi giờ, ví dụ +7 hoặc Asia/Ho_Chi_Minh (mặc định: TIMEZONE_OFFSET)",
+)
+async def set_daily_channel(
+    interaction: discord.Interaction,
+    channel: Optional[discord.TextChannel] = None,
+    time: Optional[str] = None,
+    timezone: Optional[str] = None,
+):
+    """Configure the daily problem channel for this guild"""
+    has_permission = await check_permission(interaction)
+    if has_permission == False:
+        return
+
+    channel = channel or interaction.channel
+    if not isinstance(channel, discord.TextChannel):
+        await interaction.response.send_message(
+            "❌ Lệnh này chỉ có thể sử dụng trong text channel!", ephemeral=True
+        )
+        return
+
+    try:
+        if time:
+            time = parse_time(time).strftime("%H:%M")
+        if timezone:
+            parse_timezone(timezone)
+    except ValueError:
+        await interaction.response.send_message(
+            "❌ Giờ phải có dạng HH:MM và múi giờ dạng +7 hoặc Asia/Ho_Chi_Minh!", ephemeral=True
+        )
+        return
+
+    bot.guild_config.set_channel(interaction.guild.id, channel.id, time, timezone)
+    schedules = daily_schedules()
+    scheduler.sync(schedules)
+    at, tz, _ = schedules[f"guild:{interaction.guild.id}"]
+    await interaction.response.send_message(
+        f"✅ Bài toán hàng ngày sẽ được gửi vào {channel.mention} lúc {at:%H:%M} ({tz})",
+        ephemeral=True,
+    )
+
+
+@bot.tree.command(
+    name="unset_daily_channel", description="Tắt bài toán hàng ngày cho server này"
+)
+async def unset_daily_channel(interaction: discord.Interaction):
+    """Stop daily problems for this guild"""
+    has_permission = await check_permission(interaction)
+    if has_permission == False:
+        return
+
+    if bot.guild_config.remove_channel(interaction.guild.id):
+        scheduler.sync(daily_schedules())
+        message = "✅ Đã tắt bài toán hàng ngày cho server này"
+    else:
+        message = "ℹ️ Server này chưa cấu hình channel nhận bài toán hàng ngày"
+    await interaction.response.send_message(message, ephemeral=True)
+
+
+async def post_problem_thread(
+    channel: discord.TextChannel,
+    problem: Dict,
+    reason: str,
+    content: Optional[List[str]] = None,
+    day: Optional[date] = None,
+) -> discord.Thread:
+    """Create a public thread for the problem and post the full content in it, in order"""
+    day = day or local_today()
+    thread_name = f"🧪 **LeetCode - {day.strftime('%d/%m')} - {problem['title']} - {problem['difficulty']}**"
+
+    if content is None:
+        content = format_daily_challenge(problem, day=day)
+    # Tạo thread trực tiếp trong channel: 1 API call thay vì gửi message rồi tạo thread từ nó.
+    # Hai lệnh trùng nhau (cùng channel, cùng tên thread) được hàng đợi gộp thành một thread
+    thread, sends = await outbound.create_thread(
+        channel, thread_name, content, auto_archive_duration=60, reason=reason
+    )
+    # Hàng đợi giữ đúng thứ tự message trong thread. Message của thread gộp dùng
+    # chung future: shield để timeout của lệnh này không huỷ chúng của lệnh kia
+    await asyncio.gather(*(asyncio.shield(send) for send in sends))
+    return thread
+
+
+@metrics.timed("crawl_problem")
 async def crawl_problem(problem_id):
     try:
-        url = get_url_from_data(leetcode_data, problem_id)
+        url = problem_url(problem_id)
 
-        problem = bot.leetcode.add_problem_by_url(url)
+        problem = await bot.leetcode.add_problem_by_url_async(url)
         if not problem:
             print("❌ Không thể crawl bài toán từ URL này!")
             return
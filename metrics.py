@@ -0,0 +1,244 @@
+import asyncio
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds: 0.1ms .. ~150s, each 25% wider than the last
+BUCKETS: List[float] = [0.0001 * 1.25**i for i in range(64)]
+
+_NOOP = nullcontext()
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _label_key(name: str, labels: Dict[str, str]) -> LabelKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Fixed log-spaced buckets: O(1) observe, percentiles accurate to one bucket width"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100), interpolating inside the bucket"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                fraction = (rank - seen) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            seen += bucket_count
+        return self.max
+
+
+class Metrics:
+    """
+    Per-stage latency histograms, counters and gauges for the bot's hot paths
+
+    Every entry point checks `enabled` first, so when metrics are off a timed
+    call costs one attribute lookup.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[LabelKey, float] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        return cls(enabled=os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no"))
+
+    # ---- recording ----
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def _timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timer(self, stage: str):
+        """Context manager timing a block, a shared no-op when disabled"""
+        if not self.enabled:
+            return _NOOP
+        return self._timer(stage)
+
+    def timed(self, stage: str):
+        """Decorator timing every call of a sync or async function"""
+
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.observe(stage, time.perf_counter() - start)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def register_gauge(self, name: str, collect: Callable[[], Dict[str, float]]):
+        """Register a callback returning current values, read only when a snapshot is taken"""
+        self._gauges[name] = collect
+
+    # ---- reading ----
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "p50": histogram.percentile(50),
+                    "p95": histogram.percentile(95),
+                    "p99": histogram.percentile(99),
+                    "max": histogram.max,
+                    "total": histogram.total,
+                }
+                for stage, histogram in self._histograms.items()
+            }
+            counters = dict(self._counters)
+
+        gauges = {}
+        for name, collect in self._gauges.items():
+            try:
+                gauges[name] = collect()
+            except Exception as e:
+                logger.error(f"Gauge {name} failed: {e}")
+        return {
+            "uptime": time.time() - self.started,
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = {
+                stage: (list(h.counts), h.count, h.total) for stage, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+
+        if histograms:
+            lines.append("# TYPE leetcode_bot_stage_seconds histogram")
+        for stage, (counts, count, total) in sorted(histograms.items()):
+            labels = (("stage", stage),)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                if bucket_count:
+                    le = 'le="%.6g"' % bound
+                    lines.append(
+                        f"leetcode_bot_stage_seconds_bucket{_format_labels(labels, le)} {cumulative}"
+                    )
+            le = 'le="+Inf"'
+            lines.append(
+                f"leetcode_bot_stage_seconds_bucket{_format_labels(labels, le)} {count}"
+            )
+            lines.append(f"leetcode_bot_stage_seconds_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"leetcode_bot_stage_seconds_count{_format_labels(labels)} {count}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE leetcode_bot_{name} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"leetcode_bot_{name}{_format_labels(labels)} {value:g}")
+
+        for name, values in sorted(self.snapshot()["gauges"].items()):
+            for key, value in sorted(values.items()):
+                lines.append(f"# TYPE leetcode_bot_{name}_{key} gauge")
+                lines.append(f"leetcode_bot_{name}_{key} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    async def start_http_server(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics in Prometheus format on a local port"""
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render_prometheus(), content_type="text/plain")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+        return runner
+
+
+metrics = Metrics.from_env()
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from leetcode_integration import LeetCodeIntegration
+from renderer import DISCORD_MESSAGE_LIMIT
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class DailyPrefetcher:
+    """Crawl and render upcoming daily problems ahead of the scheduled post"""
+
+    def __init__(
+        self,
+        leetcode: LeetCodeIntegration,
+        url_resolver: Callable[[int], Optional[str]],
+        count: int = 3,
+        max_retries: int = 5,
+        retry_delay: float = 30,
+        chunk_limit: int = DISCORD_MESSAGE_LIMIT,
+    ):
+        self.leetcode = leetcode
+        self.url_resolver = url_resolver
+        self.count = count
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.chunk_limit = chunk_limit
+        # problem_id -> (parsed problem, rendered Discord messages)
+        self._ready: Dict[int, Tuple[Dict, List[str]]] = {}
+        self._lock = asyncio.Lock()
+
+    def get(self, problem_id: int) -> Optional[Tuple[Dict, List[str]]]:
+        """Local lookup of a prefetched problem, None if it is not ready"""
+        return self._ready.get(int(problem_id))
+
+    async def prefetch(self) -> int:
+        """Prefetch the next `count` problems after the cursor, return how many are ready"""
+        async with self._lock:
+            upcoming = self.leetcode.peek_upcoming_problems(self.count)
+            if not upcoming:
+                return 0
+
+            # Drop problems the cursor has already moved past
+            for problem_id in list(self._ready):
+                if problem_id < upcoming[0]:
+                    del self._ready[problem_id]
+
+            for problem_id in upcoming:
+                if problem_id not in self._ready:
+                    await self._prefetch_one(problem_id)
+
+            return sum(1 for problem_id in upcoming if problem_id in self._ready)
+
+    async def _prefetch_one(self, problem_id: int) -> bool:
+        """Crawl one problem, retrying with exponential backoff"""
+        url = self.url_resolver(problem_id)
+        if not url:
+            logger.error(f"No URL found for problem {problem_id}")
+            return False
+
+        for attempt in range(self.max_retries):
+            problem = await self.leetcode.add_problem_by_url_async(url)
+            if problem:
+                chunks = self.leetcode.render_problem(problem, self.chunk_limit)
+                self._ready[problem_id] = (problem, chunks)
+                logger.info(f"Prefetched problem {problem_id}: {problem['title']}")
+                return True
+
+            if attempt + 1 < self.max_retries:
+                delay = self.retry_delay * 2**attempt
+                logger.warning(
+                    f"Prefetch of problem {problem_id} failed (attempt {attempt + 1}), retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+
+        logger.error(f"Giving up prefetching problem {problem_id} for now")
+        return False
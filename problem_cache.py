@@ -0,0 +1,198 @@
+import sys
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+
+class ProblemRecord(Mapping):
+    """
+    Compact, read-only view of a parsed problem
+
+    Behaves like the problem dict (`record["title"]`, `record.get(...)`), but
+    uses slots, interns the small repeated strings (difficulty, topics) and
+    keeps the full `markdown` compressed until someone asks for it.
+    """
+
+    FIELDS = (
+        "id",
+        "slug",
+        "title",
+        "difficulty",
+        "description",
+        "examples",
+        "constraints",
+        "follow_up",
+        "topics",
+        "hints",
+        "time_complexity",
+        "space_complexity",
+        "url",
+    )
+    __slots__ = FIELDS + ("_markdown", "_size")
+
+    def __init__(self, problem: Dict):
+        for field in self.FIELDS:
+            object.__setattr__(self, field, problem.get(field))
+
+        difficulty = self.difficulty
+        if isinstance(difficulty, str):
+            object.__setattr__(self, "difficulty", sys.intern(difficulty))
+        object.__setattr__(
+            self, "topics", tuple(sys.intern(topic) for topic in self.topics or ())
+        )
+        object.__setattr__(
+            self, "examples", tuple(dict(example) for example in self.examples or ())
+        )
+        object.__setattr__(self, "constraints", tuple(self.constraints or ()))
+        object.__setattr__(self, "hints", tuple(self.hints or ()))
+
+        markdown = problem.get("markdown")
+        object.__setattr__(
+            self,
+            "_markdown",
+            zlib.compress(markdown.encode("utf-8")) if markdown is not None else None,
+        )
+        object.__setattr__(self, "_size", self._estimate_size())
+
+    @classmethod
+    def from_dict(cls, problem: Dict) -> "ProblemRecord":
+        return problem if isinstance(problem, cls) else cls(problem)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProblemRecord is read-only")
+
+    @property
+    def markdown(self) -> Optional[str]:
+        """Full problem markdown, inflated on demand"""
+        if self._markdown is None:
+            return None
+        return zlib.decompress(self._markdown).decode("utf-8")
+
+    @property
+    def size(self) -> int:
+        """Approximate number of bytes held by this record"""
+        return self._size
+
+    def _estimate_size(self) -> int:
+        size = sys.getsizeof(self) + len(self._markdown or b"")
+        for field in ("id", "slug", "title", "description", "follow_up", "url"):
+            value = getattr(self, field)
+            if value is not None:
+                size += sys.getsizeof(value)
+        for example in self.examples:
+            size += sys.getsizeof(example)
+            size += sum(sys.getsizeof(value) for value in example.values())
+        for values in (self.examples, self.constraints, self.topics, self.hints):
+            size += sys.getsizeof(values)
+        size += sum(sys.getsizeof(value) for value in self.constraints)
+        size += sum(sys.getsizeof(value) for value in self.hints)
+        return size
+
+    def __getitem__(self, key: str):
+        if key == "markdown":
+            if self._markdown is None:
+                raise KeyError(key)
+            return self.markdown
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self._markdown is not None:
+            yield "markdown"
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (self._markdown is not None)
+
+    def to_dict(self) -> Dict:
+        """Plain dict in the crawler's format, e.g. for JSON serialization"""
+        problem = {field: getattr(self, field) for field in self.FIELDS}
+        for field in ("examples", "constraints", "topics", "hints"):
+            problem[field] = list(problem[field])
+        if self._markdown is not None:
+            problem["markdown"] = self.markdown
+        return problem
+
+    def __repr__(self) -> str:
+        return f"ProblemRecord(id={self.id!r}, title={self.title!r})"
+
+
+class ProblemCache:
+    """LRU cache of ProblemRecords bounded by entry count and approximate bytes"""
+
+    def __init__(self, max_items: int = 256, max_bytes: int = 8 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._records: "OrderedDict[str, ProblemRecord]" = OrderedDict()
+        self._slugs: Dict[str, str] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, problem_id, default=None) -> Optional[ProblemRecord]:
+        problem_id = str(problem_id)
+        record = self._records.get(problem_id)
+        if record is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._records.move_to_end(problem_id)
+        return record
+
+    def get_by_slug(self, slug: str) -> Optional[ProblemRecord]:
+        problem_id = self._slugs.get(slug)
+        if problem_id is None:
+            self.misses += 1
+            return None
+        return self.get(problem_id)
+
+    def put(self, problem: Dict) -> ProblemRecord:
+        """Store a problem (dict or record) and return its compact record"""
+        record = ProblemRecord.from_dict(problem)
+        problem_id = str(record.id)
+
+        old = self._records.pop(problem_id, None)
+        if old is not None:
+            self._forget(old)
+        self._records[problem_id] = record
+        self.bytes += record.size
+        if record.slug:
+            self._slugs[record.slug] = problem_id
+
+        # Luôn giữ lại ít nhất bản ghi vừa thêm
+        while len(self._records) > 1 and (
+            len(self._records) > self.max_items or self.bytes > self.max_bytes
+        ):
+            _, evicted = self._records.popitem(last=False)
+            self._forget(evicted)
+            self.evictions += 1
+        return record
+
+    def _forget(self, record: ProblemRecord):
+        self.bytes -= record.size
+        if self._slugs.get(record.slug) == str(record.id):
+            del self._slugs[record.slug]
+
+    def __setitem__(self, problem_id, problem: Dict):
+        self.put(problem)
+
+    def __contains__(self, problem_id) -> bool:
+        return str(problem_id) in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for sizing the cache in a long-running process"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._records),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
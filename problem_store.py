@@ -0,0 +1,180 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 7 * 24 * 3600  # 1 week
+
+
+class ProblemStore:
+    """Persistent problem cache in SQLite, keyed by problem id and slug"""
+
+    def __init__(self, db_file: str = "problems.db", ttl: float = DEFAULT_TTL):
+        self.db_file = db_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        # Autocommit mode: every upsert is its own tiny transaction
+        self._conn = sqlite3.connect(
+            db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS problems (
+                id TEXT PRIMARY KEY,
+                slug TEXT UNIQUE,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rendered (
+                problem_id TEXT NOT NULL,
+                template_version INTEGER NOT NULL,
+                chunk_limit INTEGER NOT NULL,
+                chunks TEXT NOT NULL,
+                PRIMARY KEY (problem_id, template_version, chunk_limit)
+            )
+            """
+        )
+
+    def is_stale(self, fetched_at: float) -> bool:
+        """Check whether a record fetched at `fetched_at` is older than the TTL"""
+        return self.ttl is not None and time.time() - fetched_at > self.ttl
+
+    def _fetch_one(self, column: str, value: str, allow_stale: bool) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT data, fetched_at FROM problems WHERE {column} = ?", (value,)
+            ).fetchone()
+        if not row:
+            return None
+
+        data, fetched_at = row
+        if not allow_stale and self.is_stale(fetched_at):
+            return None
+        return json.loads(data)
+
+    def get(self, problem_id, allow_stale: bool = False) -> Optional[Dict]:
+        """Get a problem by id, None if missing or stale"""
+        return self._fetch_one("id", str(problem_id), allow_stale)
+
+    def get_by_slug(self, slug: str, allow_stale: bool = False) -> Optional[Dict]:
+        """Get a problem by title slug, None if missing or stale"""
+        return self._fetch_one("slug", slug, allow_stale)
+
+    def upsert(self, problem: Dict, fetched_at: Optional[float] = None):
+        """Insert or replace a single problem row, dropping its stale renders"""
+        with self._lock:
+            self._upsert(problem, fetched_at)
+
+    def _upsert(self, problem: Dict, fetched_at: Optional[float]):
+        data = json.dumps(problem, ensure_ascii=False, separators=(",", ":"))
+        self._conn.execute(
+            "DELETE FROM rendered WHERE problem_id = ?", (str(problem["id"]),)
+        )
+        self._conn.execute(
+            """
+            INSERT INTO problems (id, slug, data, fetched_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                slug = excluded.slug,
+                data = excluded.data,
+                fetched_at = excluded.fetched_at
+            """,
+            (
+                str(problem["id"]),
+                problem.get("slug"),
+                data,
+                fetched_at if fetched_at is not None else time.time(),
+            ),
+        )
+
+    def upsert_many(self, problems: Iterable[Dict], fetched_at: Optional[float] = None):
+        """Upsert several problems in a single transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for problem in problems:
+                    self._upsert(problem, fetched_at)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def touch(self, slugs: Iterable[str], fetched_at: Optional[float] = None) -> int:
+        """Mark problems (by title slug) as fresh without rewriting them, return how many were found"""
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            cursor = self._conn.executemany(
+                "UPDATE problems SET fetched_at = ? WHERE slug = ?",
+                [(fetched_at, slug) for slug in slugs],
+            )
+            self._conn.execute("COMMIT")
+        return cursor.rowcount
+
+    def get_rendered(
+        self, problem_id, template_version: int, chunk_limit: int
+    ) -> Optional[List[str]]:
+        """Get cached Discord chunks of a problem for one template version"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT chunks FROM rendered
+                WHERE problem_id = ? AND template_version = ? AND chunk_limit = ?
+                """,
+                (str(problem_id), template_version, chunk_limit),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_rendered(
+        self, problem_id, template_version: int, chunk_limit: int, chunks: List[str]
+    ):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rendered VALUES (?, ?, ?, ?)",
+                (
+                    str(problem_id),
+                    template_version,
+                    chunk_limit,
+                    json.dumps(chunks, ensure_ascii=False),
+                ),
+            )
+
+    def ids(self) -> Iterator[str]:
+        """Iterate over stored problem ids"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM problems").fetchall()
+        return (row[0] for row in rows)
+
+    def slugs(self) -> Iterator[str]:
+        """Iterate over stored title slugs, stale ones included"""
+        with self._lock:
+            rows = self._conn.execute("SELECT slug FROM problems WHERE slug IS NOT NULL").fetchall()
+        return (row[0] for row in rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM problems").fetchone()[0]
+
+    def __contains__(self, problem_id) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM problems WHERE id = ?", (str(problem_id),)
+            ).fetchone()
+        return row is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
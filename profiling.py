@@ -0,0 +1,254 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+
+import discord
+
+from metrics import metrics
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sampling")
+
+
+class SamplingProfiler:
+    """Sample the stack of one thread at a fixed interval from a helper thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self, limit: int = 40) -> str:
+        """Top functions by self and inclusive samples, then the collapsed stacks"""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = [frame.rsplit(":", 1)[0] for frame in stack.split(";")]
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        out = io.StringIO()
+        total = max(self.samples, 1)
+        out.write(f"{self.samples} samples every {self.interval * 1000:.0f}ms\n\n")
+        for title, counter in (("Self", own), ("Inclusive", inclusive)):
+            out.write(f"{title}:\n")
+            for frame, count in counter.most_common(limit):
+                out.write(f"{count / total:7.1%}  {count:6d}  {frame}\n")
+            out.write("\n")
+        # Định dạng collapsed stack, dùng được với flamegraph.pl / speedscope
+        out.write("Collapsed stacks:\n")
+        for stack, count in self.stacks.most_common():
+            out.write(f"{stack} {count}\n")
+        return out.getvalue()
+
+
+class ProfileCapture:
+    """One profiled run: profiler output plus the stage timings recorded meanwhile"""
+
+    def __init__(self, name: str, mode: str):
+        self.name = name
+        self.mode = mode
+        self.path: Optional[str] = None
+        self.wall = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[SamplingProfiler] = None
+        self._stages_before: Dict = {}
+
+    def start(self):
+        self._stages_before = metrics.snapshot()["stages"] if metrics.enabled else {}
+        self._started = time.perf_counter()
+        if self.mode == "sampling":
+            self._sampler = SamplingProfiler(threading.get_ident())
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.wall = time.perf_counter() - self._started
+
+    def _stage_deltas(self) -> str:
+        """Wall time per stage during the run, this is where awaited HTTP/Discord waits show up"""
+        if not metrics.enabled:
+            return "Stage timings unavailable (METRICS_ENABLED=0)\n"
+        lines = []
+        for stage, after in sorted(metrics.snapshot()["stages"].items()):
+            before = self._stages_before.get(stage, {"count": 0, "total": 0.0})
+            count = after["count"] - before["count"]
+            if count:
+                total = after["total"] - before["total"]
+                lines.append(f"{stage:<24}{count:>6}  {total * 1000:>10.1f}ms")
+        return "Stage wall time during the run:\n" + "\n".join(lines or ["(none)"]) + "\n"
+
+    def write(self, directory: str) -> str:
+        """Write the text summary (and the raw .prof for cProfile), return the summary path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(directory, f"{stamp}-{self.name.strip('/')}-{self.mode}")
+
+        out = io.StringIO()
+        out.write(f"Profile of {self.name} ({self.mode}), wall time {self.wall * 1000:.1f}ms\n\n")
+        out.write(self._stage_deltas())
+        out.write("\n")
+        if self._profile is not None:
+            self._profile.dump_stats(base + ".prof")
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(40)
+            stats.sort_stats("tottime").print_stats(25)
+        elif self._sampler is not None:
+            out.write(self._sampler.report())
+
+        self.path = base + ".txt"
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        return self.path
+
+
+class ProfilerSwitch:
+    """
+    Admin toggle that profiles the next N command runs and/or the next daily run
+
+    Only one run is profiled at a time; runs starting while another one is
+    being profiled execute normally and don't use up the budget.
+    """
+
+    def __init__(self, directory: str = "profiles"):
+        self.directory = directory
+        self.mode = "cprofile"
+        self.remaining_commands = 0
+        self.daily = False
+        self.requested_by: Optional[discord.abc.User] = None
+        self._active = False
+
+    def arm(
+        self,
+        commands: int,
+        daily: bool,
+        mode: str = "cprofile",
+        requested_by: Optional[discord.abc.User] = None,
+    ):
+        self.remaining_commands = max(0, commands)
+        self.daily = daily
+        self.mode = mode if mode in MODES else "cprofile"
+        self.requested_by = requested_by
+
+    def disarm(self):
+        self.remaining_commands = 0
+        self.daily = False
+
+    @property
+    def armed(self) -> bool:
+        return self.remaining_commands > 0 or self.daily
+
+    @contextmanager
+    def _capture(self, name: str) -> Iterator[ProfileCapture]:
+        capture = ProfileCapture(name, self.mode)
+        self._active = True
+        capture.start()
+        try:
+            yield capture
+        finally:
+            capture.stop()
+            self._active = False
+            try:
+                capture.write(self.directory)
+                logger.info(f"Profile of {name} written to {capture.path}")
+            except Exception as e:
+                logger.error(f"Writing profile of {name} failed: {e}")
+
+    def command(self, name: str):
+        """Decorator for slash command callbacks, profiling them while the switch is armed"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+                if self.remaining_commands <= 0 or self._active:
+                    return await func(interaction, *args, **kwargs)
+
+                self.remaining_commands -= 1
+                with self._capture(name) as capture:
+                    result = await func(interaction, *args, **kwargs)
+                await self._send_to_interaction(interaction, capture)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    async def run_daily(self, run: Callable[[], Awaitable[None]]):
+        """Run the daily job, profiled once if the switch asks for it"""
+        if not self.daily or self._active:
+            return await run()
+
+        self.daily = False
+        with self._capture("daily") as capture:
+            await run()
+        await self._send_to_requester(capture)
+
+    async def _send_to_interaction(self, interaction: discord.Interaction, capture: ProfileCapture):
+        if capture.path is None:
+            return
+        message = f"🔬 Profile {capture.name} ({capture.wall * 1000:.0f}ms)"
+        try:
+            file = discord.File(capture.path)
+            if interaction.response.is_done():
+                await interaction.followup.send(message, file=file, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, file=file, ephemeral=True)
+        except Exception as e:
+            logger.error(f"Sending profile failed, it is still at {capture.path}: {e}")
+
+    async def _send_to_requester(self, capture: ProfileCapture):
+        # Daily chạy ngoài interaction nên gửi DM cho admin đã bật profile
+        if capture.path is None or self.requested_by is None:
+            return
+        try:
+            await self.requested_by.send(
+                f"🔬 Profile daily ({capture.wall * 1000:.0f}ms)",
+                file=discord.File(capture.path),
+            )
+        except Exception as e:
+            logger.error(f"Sending daily profile failed, it is still at {capture.path}: {e}")
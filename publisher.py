@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import discord
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class DailyPublisher:
+    """Fan one already-rendered post out to many channels with bounded parallelism"""
+
+    def __init__(
+        self,
+        client: discord.Client,
+        max_parallel: int = 5,
+        channel_timeout: float = 120,
+    ):
+        self.client = client
+        self.max_parallel = max_parallel
+        self.channel_timeout = channel_timeout
+
+    async def _resolve_channel(self, channel_id: int) -> discord.TextChannel:
+        channel = self.client.get_channel(channel_id)
+        if channel is None:
+            channel = await self.client.fetch_channel(channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            raise ValueError(f"Channel {channel_id} is not a text channel")
+        return channel
+
+    async def publish(
+        self,
+        channel_ids: Iterable[int],
+        post: Callable[[discord.TextChannel], Awaitable[None]],
+    ) -> Dict[int, Optional[Exception]]:
+        """
+        Run `post` on every channel concurrently, at most `max_parallel` at a time
+
+        Each channel is isolated: an error or timeout in one guild is logged and
+        returned for that channel only, the others carry on.
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def publish_one(channel_id: int) -> Optional[Exception]:
+            async with semaphore:
+                try:
+                    channel = await self._resolve_channel(channel_id)
+                    # discord.py waits out per-route 429s itself, the timeout bounds that wait
+                    await asyncio.wait_for(post(channel), self.channel_timeout)
+                    return None
+                except Exception as e:
+                    logger.error(f"Publishing to channel {channel_id} failed: {e!r}")
+                    return e
+
+        channel_ids = list(dict.fromkeys(channel_ids))
+        results = await asyncio.gather(*(publish_one(c) for c in channel_ids))
+
+        failed = sum(1 for error in results if error is not None)
+        logger.info(f"Published to {len(channel_ids) - failed}/{len(channel_ids)} channels")
+        return dict(zip(channel_ids, results))
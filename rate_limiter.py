@@ -0,0 +1,129 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket plus concurrency cap, shared by sync and async callers"""
+
+    def __init__(self, rate: float = 2.0, burst: int = 5, max_concurrency: int = 4):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        self._sync_slots = threading.BoundedSemaphore(max_concurrency)
+        # asyncio.Semaphore is bound to one event loop, keep one per loop
+        self._async_slots = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(
+            rate=float(os.getenv("LEETCODE_RATE_LIMIT", 2.0)),
+            burst=int(os.getenv("LEETCODE_RATE_BURST", 5)),
+            max_concurrency=int(os.getenv("LEETCODE_MAX_CONCURRENCY", 4)),
+        )
+
+    def _reserve(self) -> float:
+        """Take one token, return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            # Tokens may go negative: each caller reserves its own future slot
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Stop every caller for `seconds`, used when the server says Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        """Block the current thread until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the `max_concurrency` request slots"""
+        with self._sync_slots:
+            yield
+
+    @asynccontextmanager
+    async def async_slot(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_slots.get(loop)
+        if semaphore is None:
+            semaphore = self._async_slots[loop] = asyncio.Semaphore(
+                self.max_concurrency
+            )
+        async with semaphore:
+            yield
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring Retry-After"""
+
+    def __init__(
+        self, max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 60.0
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.getenv("LEETCODE_MAX_RETRIES", 4)),
+            base_delay=float(os.getenv("LEETCODE_RETRY_BASE_DELAY", 1.0)),
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if retry_after is not None:
+            # Small jitter so throttled callers don't all come back at once
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+# Shared by every crawler instance in the process
+shared_rate_limiter = RateLimiter.from_env()
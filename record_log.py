@@ -0,0 +1,390 @@
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from problem_store import DEFAULT_TTL
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LCRL\x01"
+
+# Record header: crc32 of key+payload, kind, key length, fetched_at, payload length
+RECORD_HEADER = struct.Struct("<IBHdI")
+
+KIND_PROBLEM = 1
+KIND_RENDERED = 2
+# Làm mới fetched_at của các bài: key là các problem id nối bằng \0, payload rỗng
+KIND_TOUCH = 3
+
+# Preset deflate dictionary: field names and boilerplate shared by every problem,
+# so even small records compress well. Changing it requires a new MAGIC version.
+ZDICT = "".join(
+    [
+        '{"id":"","slug":"","title":"","difficulty":"Easy","Medium","Hard",',
+        '"description":"","examples":[{"title":"Example 1","input":"","output":"",',
+        '"explanation":""}],"constraints":["1 <= nums.length <= 10<sup>5</sup>",',
+        '"-10<sup>4</sup> <= nums[i] <= 10<sup>4</sup>"],"follow_up":"",',
+        '"topics":["Array","String","Hash Table","Dynamic Programming","Math",',
+        '"Sorting","Greedy","Depth-First Search","Binary Search","Tree",',
+        '"Breadth-First Search","Two Pointers"],"hints":[],"time_complexity":"",',
+        '"space_complexity":"","url":"https://leetcode.com/problems/",',
+        '"markdown":"**Example 1:**\\n\\n```\\nInput: nums = [\\nOutput: ',
+        "\\nExplanation: \\n```\\n\\n**Constraints:**\\n\\n* `",
+        "Given an integer array nums, return the  Return true if  You may assume that ",
+    ]
+).encode("utf-8")
+
+# Compact once dead records take more than half of a log bigger than this
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class _Entry:
+    __slots__ = ("offset", "length", "fetched_at")
+
+    def __init__(self, offset: int, length: int, fetched_at: float):
+        self.offset = offset
+        self.length = length
+        self.fetched_at = fetched_at
+
+
+class ProblemLogStore:
+    """
+    Append-only, zlib-compressed problem store with an in-memory offset index
+
+    Drop-in alternative to ProblemStore for bulk catalogs: every write is one
+    append, every read one positioned read of a single compressed record.
+    Superseded records are reclaimed by a background compaction.
+
+    Several processes (the bot, bulk_crawl.py, catalog_sync.py) can share one
+    log: appends and compaction hold an exclusive flock on `<log>.lock`, reads
+    a shared one, and each operation first indexes records other processes
+    appended and reopens the log if another process compacted it.
+    """
+
+    def __init__(self, log_file: str = "problems.log", ttl: float = DEFAULT_TTL):
+        self.log_file = log_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._compacting = False
+
+        # problem id -> latest record, slug -> problem id
+        self._problems: Dict[str, _Entry] = {}
+        self._slugs: Dict[str, str] = {}
+        # (problem id, template version, chunk limit) -> latest rendered record
+        self._rendered: Dict[Tuple[str, int, int], _Entry] = {}
+        self._live_bytes = 0
+
+        # Khoá trên file riêng: compaction thay inode của log, khoá trên log sẽ mất tác dụng
+        self._lock_fd = os.open(log_file + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = -1
+        self._end = 0
+        with self._locked(exclusive=True):
+            logger.info(
+                f"Loaded {len(self._problems)} problems from {self.log_file} ({self._end} bytes)"
+            )
+
+    # ---- record format ----
+
+    @staticmethod
+    def _encode(kind: int, key: str, fetched_at: float, value) -> bytes:
+        key_bytes = key.encode("utf-8")
+        compressor = zlib.compressobj(9, zdict=ZDICT)
+        payload = compressor.compress(
+            json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        payload += compressor.flush()
+        crc = zlib.crc32(payload, zlib.crc32(key_bytes))
+        header = RECORD_HEADER.pack(crc, kind, len(key_bytes), fetched_at, len(payload))
+        return header + key_bytes + payload
+
+    @staticmethod
+    def _scan(fd: int, start: int, end: int) -> Iterator[Tuple[int, int, int, str, float]]:
+        """Yield (offset, length, kind, key, fetched_at) for every complete record in [start, end)"""
+        offset = start
+        while offset + RECORD_HEADER.size <= end:
+            header = os.pread(fd, RECORD_HEADER.size, offset)
+            crc, kind, key_len, fetched_at, payload_len = RECORD_HEADER.unpack(header)
+            length = RECORD_HEADER.size + key_len + payload_len
+            if offset + length > end:
+                return
+            key = os.pread(fd, key_len, offset + RECORD_HEADER.size).decode("utf-8")
+            yield offset, length, kind, key, fetched_at
+            offset += length
+
+    def _read(self, entry: _Entry):
+        data = os.pread(self._fd, entry.length, entry.offset)
+        crc, _, key_len, _, _ = RECORD_HEADER.unpack_from(data)
+        key = data[RECORD_HEADER.size : RECORD_HEADER.size + key_len]
+        payload = data[RECORD_HEADER.size + key_len :]
+        if zlib.crc32(payload, zlib.crc32(key)) != crc:
+            raise ValueError(f"Corrupt record at offset {entry.offset} in {self.log_file}")
+        decompressor = zlib.decompressobj(zdict=ZDICT)
+        return json.loads(decompressor.decompress(payload) + decompressor.flush())
+
+    # ---- index ----
+
+    def _index_record(self, offset: int, length: int, kind: int, key: str, fetched_at: float):
+        entry = _Entry(offset, length, fetched_at)
+        if kind == KIND_PROBLEM:
+            problem_id, slug = key.split("\0", 1)
+            old = self._problems.get(problem_id)
+            if old is not None:
+                self._live_bytes -= old.length
+            self._problems[problem_id] = entry
+            if slug:
+                self._slugs[slug] = problem_id
+            # A new version of the problem invalidates its renders
+            self._drop_rendered(problem_id)
+        elif kind == KIND_TOUCH:
+            # Không giữ lại bản ghi này: compaction ghi fetched_at thẳng vào header bài
+            for problem_id in key.split("\0"):
+                problem = self._problems.get(problem_id)
+                if problem is not None and fetched_at > problem.fetched_at:
+                    problem.fetched_at = fetched_at
+            return
+        elif kind == KIND_RENDERED:
+            problem_id, version, limit = key.split("\0")
+            rendered_key = (problem_id, int(version), int(limit))
+            old = self._rendered.get(rendered_key)
+            if old is not None:
+                self._live_bytes -= old.length
+            self._rendered[rendered_key] = entry
+        else:
+            return
+        self._live_bytes += length
+
+    def _drop_rendered(self, problem_id: str):
+        for key in [key for key in self._rendered if key[0] == problem_id]:
+            self._live_bytes -= self._rendered.pop(key).length
+
+    def _index_tail(self, size: int, exclusive: bool):
+        """Index the records between the indexed end and `size`"""
+        for offset, length, kind, key, fetched_at in self._scan(self._fd, self._end, size):
+            self._index_record(offset, length, kind, key, fetched_at)
+            self._end = offset + length
+
+        if self._end != size and exclusive:
+            # Bản ghi cuối bị ghi dở (crash giữa chừng): cắt bỏ phần thừa.
+            # Chỉ làm khi giữ khoá ghi, không thì có thể là bản ghi process khác đang ghi
+            logger.warning(f"Truncating {size - self._end} trailing bytes of {self.log_file}")
+            os.ftruncate(self._fd, self._end)
+
+    def _open_log(self):
+        """(Re)open the log file and index it from scratch"""
+        if self._fd >= 0:
+            os.close(self._fd)
+        # O_APPEND: mỗi bản ghi là một write ở cuối file, kể cả khi nhiều process cùng ghi
+        self._fd = os.open(self.log_file, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._problems, self._slugs, self._rendered = {}, {}, {}
+        self._live_bytes = 0
+        self._end = len(MAGIC)
+
+    def _refresh(self, exclusive: bool):
+        """Catch up with what other processes did to the log since the last operation"""
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            stat = None
+        if self._fd < 0 or stat is None or stat.st_ino != os.fstat(self._fd).st_ino:
+            # Lần đầu mở, hoặc process khác đã compact (inode mới)
+            self._open_log()
+            stat = os.fstat(self._fd)
+        elif stat.st_size < self._end:
+            self._open_log()
+
+        if stat.st_size == 0:
+            if not exclusive:
+                return
+            os.write(self._fd, MAGIC)
+            stat = os.fstat(self._fd)
+        elif os.pread(self._fd, len(MAGIC), 0) != MAGIC:
+            raise ValueError(f"{self.log_file} is not a problem record log")
+
+        if stat.st_size > self._end:
+            self._index_tail(stat.st_size, exclusive)
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """Hold the thread lock and the file lock, with the index up to date"""
+        # flock thuộc về file description: giữ thêm thread lock để các thread không đổi chéo khoá của nhau
+        with self._lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._refresh(exclusive)
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _append(self, kind: int, key: str, fetched_at: float, value):
+        record = self._encode(kind, key, fetched_at, value)
+        with self._locked(exclusive=True):
+            offset = self._end
+            os.write(self._fd, record)
+            self._end += len(record)
+            self._index_record(offset, len(record), kind, key, fetched_at)
+            should_compact = self._should_compact()
+        if should_compact:
+            self.compact_in_background()
+
+    # ---- ProblemStore interface ----
+
+    def is_stale(self, fetched_at: float) -> bool:
+        """Check whether a record fetched at `fetched_at` is older than the TTL"""
+        return self.ttl is not None and time.time() - fetched_at > self.ttl
+
+    def _get_entry(self, entry: Optional[_Entry], allow_stale: bool) -> Optional[Dict]:
+        if entry is None or (not allow_stale and self.is_stale(entry.fetched_at)):
+            return None
+        return self._read(entry)
+
+    def get(self, problem_id, allow_stale: bool = False) -> Optional[Dict]:
+        """Get a problem by id, None if missing or stale"""
+        with self._locked():
+            entry = self._problems.get(str(problem_id))
+            return self._get_entry(entry, allow_stale)
+
+    def get_by_slug(self, slug: str, allow_stale: bool = False) -> Optional[Dict]:
+        """Get a problem by title slug, None if missing or stale"""
+        with self._locked():
+            problem_id = self._slugs.get(slug)
+            entry = self._problems.get(problem_id) if problem_id else None
+            return self._get_entry(entry, allow_stale)
+
+    def upsert(self, problem: Dict, fetched_at: Optional[float] = None):
+        """Append a new version of a problem, dropping its stale renders"""
+        key = f"{problem['id']}\0{problem.get('slug') or ''}"
+        self._append(
+            KIND_PROBLEM,
+            key,
+            fetched_at if fetched_at is not None else time.time(),
+            problem,
+        )
+
+    def upsert_many(self, problems: Iterable[Dict], fetched_at: Optional[float] = None):
+        for problem in problems:
+            self.upsert(problem, fetched_at)
+
+    def touch(self, slugs: Iterable[str], fetched_at: Optional[float] = None) -> int:
+        """Mark problems (by title slug) as fresh without rewriting them, return how many were found"""
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        with self._locked():
+            ids = [self._slugs[slug] for slug in slugs if slug in self._slugs]
+
+        # Một bản ghi nhỏ cho cả lô thay vì ghi lại từng bài, key bị giới hạn 64KiB
+        batch: List[str] = []
+        size = 0
+        for problem_id in ids:
+            if batch and size + len(problem_id) + 1 > 0xFFFF:
+                self._append(KIND_TOUCH, "\0".join(batch), fetched_at, None)
+                batch, size = [], 0
+            batch.append(problem_id)
+            size += len(problem_id) + 1
+        if batch:
+            self._append(KIND_TOUCH, "\0".join(batch), fetched_at, None)
+        return len(ids)
+
+    def get_rendered(
+        self, problem_id, template_version: int, chunk_limit: int
+    ) -> Optional[List[str]]:
+        """Get cached Discord chunks of a problem for one template version"""
+        with self._locked():
+            entry = self._rendered.get((str(problem_id), template_version, chunk_limit))
+            return self._read(entry) if entry else None
+
+    def put_rendered(
+        self, problem_id, template_version: int, chunk_limit: int, chunks: List[str]
+    ):
+        key = f"{problem_id}\0{template_version}\0{chunk_limit}"
+        self._append(KIND_RENDERED, key, time.time(), chunks)
+
+    def ids(self) -> Iterator[str]:
+        """Iterate over stored problem ids"""
+        with self._locked():
+            return iter(list(self._problems))
+
+    def slugs(self) -> Iterator[str]:
+        """Iterate over stored title slugs, stale ones included"""
+        with self._locked():
+            return iter(list(self._slugs))
+
+    def __len__(self) -> int:
+        with self._locked():
+            return len(self._problems)
+
+    def __contains__(self, problem_id) -> bool:
+        with self._locked():
+            return str(problem_id) in self._problems
+
+    # ---- compaction ----
+
+    def _should_compact(self) -> bool:
+        dead = self._end - len(MAGIC) - self._live_bytes
+        return (
+            not self._compacting
+            and self._end > COMPACT_MIN_BYTES
+            and dead > self._live_bytes
+        )
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Start compacting in a daemon thread, None if one is already running"""
+        with self._lock:
+            if self._compacting:
+                return None
+            self._compacting = True
+        thread = threading.Thread(target=self._compact_safely, daemon=True)
+        thread.start()
+        return thread
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Compaction of {self.log_file} failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self):
+        """Rewrite the log keeping only the latest record of every key"""
+        # Giữ khoá ghi suốt quá trình: process khác không được ghi vào inode sắp bị thay
+        with self._locked(exclusive=True):
+            before = self._end
+            live = sorted(
+                [(entry.offset, entry.length, entry.fetched_at) for entry in self._problems.values()]
+                + [(entry.offset, entry.length, None) for entry in self._rendered.values()]
+            )
+
+            tmp_file = self.log_file + ".compact"
+            with open(tmp_file, "wb") as out:
+                out.write(MAGIC)
+                for offset, length, fetched_at in live:
+                    record = os.pread(self._fd, length, offset)
+                    if fetched_at is not None:
+                        # Mang fetched_at mới nhất (kể cả từ touch) vào header; crc không phủ header
+                        crc, kind, key_len, _, payload_len = RECORD_HEADER.unpack_from(record)
+                        header = RECORD_HEADER.pack(crc, kind, key_len, fetched_at, payload_len)
+                        record = header + record[RECORD_HEADER.size :]
+                    out.write(record)
+                out.flush()
+                os.fsync(out.fileno())
+
+            os.replace(tmp_file, self.log_file)
+            self._open_log()
+            self._refresh(exclusive=True)
+
+        logger.info(f"Compacted {self.log_file}: {before} -> {self._end} bytes")
+
+    def close(self):
+        with self._lock:
+            os.close(self._fd)
+            os.close(self._lock_fd)
@@ -0,0 +1,109 @@
+from typing import Iterable, List
+
+# Tăng mỗi khi thay đổi cách render để cache cũ tự hết hiệu lực
+TEMPLATE_VERSION = 2
+
+DISCORD_MESSAGE_LIMIT = 2000
+FENCE = "```"
+
+
+def _close_fence(piece: str) -> str:
+    return piece + ("" if piece.endswith("\n") else "\n") + FENCE + "\n"
+
+
+# Chỗ cần chừa cho _close_fence
+CLOSE_RESERVE = len(FENCE) + 2
+
+
+def _split_long_section(section: str, limit: int) -> List[str]:
+    """Split one oversized section on line boundaries, closing and reopening code fences"""
+    pieces: List[str] = []
+    current = ""
+    # Dòng mở code block đang mở (None nếu ở ngoài) và vị trí nội dung của nó trong current
+    opener = None
+    body_start = 0
+
+    def flush():
+        nonlocal current, body_start
+        if opener is None:
+            if current:
+                pieces.append(current)
+            current = ""
+            return
+        head, body = current[: body_start - len(opener)], current[body_start:]
+        # Không gửi một code block rỗng: dời dòng mở fence sang piece sau
+        if body.strip():
+            pieces.append(_close_fence(current))
+        elif head.strip():
+            pieces.append(head)
+        current = opener
+        body_start = len(current)
+
+    for line in section.splitlines(keepends=True):
+        is_fence = line.lstrip().startswith(FENCE)
+
+        if is_fence and opener is not None:
+            # Fence đóng không vừa thì đóng bằng fence ngắn đã chừa chỗ sẵn
+            if len(current) + len(line) > limit:
+                pieces.append(_close_fence(current))
+                current = ""
+            else:
+                current += line
+            opener = None
+            continue
+
+        if is_fence:
+            # Chừa chỗ cho fence đóng ngay từ dòng mở fence
+            if current and len(current) + len(line) + CLOSE_RESERVE > limit:
+                flush()
+            current += line
+            opener = line.strip() + "\n"
+            body_start = len(current)
+            continue
+
+        reserve = CLOSE_RESERVE if opener is not None else 0
+        if current != (opener or "") and len(current) + len(line) + reserve > limit:
+            flush()
+
+        # A single line longer than the limit is cut hard
+        while len(current) + len(line) + reserve > limit:
+            cut = max(1, limit - len(current) - reserve)
+            piece = current + line[:cut]
+            pieces.append(_close_fence(piece) if opener is not None else piece)
+            current = opener or ""
+            body_start = len(current)
+            line = line[cut:]
+
+        current += line
+
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_sections(sections: Iterable[str], limit: int = DISCORD_MESSAGE_LIMIT) -> List[str]:
+    """
+    Pack rendered sections into as few messages of at most `limit` characters as possible
+
+    Messages are only split between sections; a section that doesn't fit in one
+    message on its own is split between lines, never inside a code fence.
+    """
+    chunks: List[str] = []
+    current = ""
+
+    for section in sections:
+        if len(current) + len(section) <= limit:
+            current += section
+            continue
+
+        if current:
+            chunks.append(current)
+        if len(section) <= limit:
+            current = section
+        else:
+            *full, current = _split_long_section(section, limit)
+            chunks.extend(full)
+
+    if current:
+        chunks.append(current)
+    return [chunk.rstrip() for chunk in chunks if chunk.strip()]
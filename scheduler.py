@@ -0,0 +1,295 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from datetime import time as dtime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Ngủ tối đa chừng này rồi tính lại, phòng khi đồng hồ hệ thống bị chỉnh
+MAX_SLEEP = 300.0
+
+_OFFSET_RE = re.compile(r"^(?:UTC|GMT)?\s*([+-]?)(\d{1,2})(?::?(\d{2}))?$", re.IGNORECASE)
+
+
+def parse_timezone(value: Optional[str]) -> tzinfo:
+    """
+    Timezone from a UTC offset ("+7", "-5:30", "UTC+7") or an IANA name ("Asia/Ho_Chi_Minh")
+
+    Empty means the machine's local timezone, which is what the bot used before.
+    """
+    if not value or not str(value).strip():
+        return datetime.now().astimezone().tzinfo
+    value = str(value).strip()
+    match = _OFFSET_RE.match(value)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        if offset > timedelta(hours=14):
+            raise ValueError(f"Invalid UTC offset: {value}")
+        return timezone(-offset if sign == "-" else offset)
+
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone: {value}") from e
+
+
+def parse_time(value: Optional[str], default: str = "07:00") -> dtime:
+    return datetime.strptime((value or default).strip(), "%H:%M").time()
+
+
+def next_occurrence(at: dtime, tz: tzinfo, after: float) -> float:
+    """First `at` (local time in `tz`) strictly after the `after` timestamp"""
+    day = datetime.fromtimestamp(after, tz).date()
+    candidate = datetime.combine(day, at, tzinfo=tz).timestamp()
+    while candidate <= after:
+        day += timedelta(days=1)
+        candidate = datetime.combine(day, at, tzinfo=tz).timestamp()
+    return candidate
+
+
+def previous_occurrence(at: dtime, tz: tzinfo, now: float) -> float:
+    """Latest `at` (local time in `tz`) at or before `now`"""
+    day = datetime.fromtimestamp(now, tz).date()
+    candidate = datetime.combine(day, at, tzinfo=tz).timestamp()
+    while candidate > now:
+        day -= timedelta(days=1)
+        candidate = datetime.combine(day, at, tzinfo=tz).timestamp()
+    return candidate
+
+
+def _local_date(timestamp: float, tz: tzinfo) -> str:
+    return datetime.fromtimestamp(timestamp, tz).date().isoformat()
+
+
+class Due(NamedTuple):
+    """One job run: which schedule, the occurrence it is for and that occurrence's local date"""
+
+    key: str
+    scheduled_for: float
+    day: str
+    payload: Any
+
+
+class _Schedule:
+    __slots__ = ("key", "at", "tz", "payload", "generation")
+
+    def __init__(self, key: str, at: dtime, tz: tzinfo, payload: Any, generation: int):
+        self.key = key
+        self.at = at
+        self.tz = tz
+        self.payload = payload
+        self.generation = generation
+
+    def due(self, scheduled_for: float) -> Due:
+        return Due(self.key, scheduled_for, _local_date(scheduled_for, self.tz), self.payload)
+
+
+class ScheduleStore:
+    """Last run time of every schedule, so runs missed while offline can be caught up"""
+
+    def __init__(self, db_file: str = "bot_state.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schedule_runs (
+                job_key TEXT PRIMARY KEY,
+                last_run REAL NOT NULL
+            )
+            """
+        )
+
+    def last_runs(self) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute("SELECT job_key, last_run FROM schedule_runs").fetchall()
+        return dict(rows)
+
+    def set_last_runs(self, runs: Iterable[Tuple[str, float]]):
+        """Save (job key, timestamp) rows in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO schedule_runs VALUES (?, ?)", list(runs))
+            self._conn.execute("COMMIT")
+
+    def remove(self, keys: Iterable[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM schedule_runs WHERE job_key = ?", [(k,) for k in keys])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DailyScheduler:
+    """
+    Daily jobs at a local time of day, each in its own timezone, on one timer
+
+    Next runs sit in a min-heap and a single task sleeps until the earliest
+    one, so thousands of schedules cost one coroutine. Updated or removed
+    schedules leave stale heap entries that are skipped by generation.
+
+    Jobs due at the same moment are handed to `callback` together as a list of
+    `Due`, in a task of its own so a slow run never delays the timer. A run is
+    recorded in the store once its callback returns; on start, a schedule whose
+    last recorded run is older than its latest occurrence is run right away.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[List[Due]], Awaitable[None]],
+        store: ScheduleStore,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.callback = callback
+        self.store = store
+        self.clock = clock
+        self._schedules: Dict[str, _Schedule] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._generations = itertools.count()
+        self._last_runs: Dict[str, float] = store.last_runs()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    # ---- schedules ----
+
+    def set(self, key: str, at: dtime, tz: tzinfo, payload: Any = None):
+        """Add or update a schedule"""
+        current = self._schedules.get(key)
+        if current is not None and (current.at, current.tz) == (at, tz):
+            current.payload = payload
+            return
+
+        schedule = _Schedule(key, at, tz, payload, next(self._generations))
+        self._schedules[key] = schedule
+        now = self.clock()
+
+        missed = previous_occurrence(at, tz, now)
+        last_run = self._last_runs.get(key)
+        if last_run is None:
+            # Lịch mới: coi như lần gần nhất đã chạy, không đăng bù ngay khi vừa cấu hình
+            last_run = self._last_runs[key] = missed
+            self.store.set_last_runs([(key, missed)])
+
+        if last_run < missed:
+            logger.info(f"Schedule {key} missed its run at {datetime.fromtimestamp(missed, tz)}, catching up")
+            self._push(schedule, missed)
+            return
+
+        when = next_occurrence(at, tz, now)
+        # Đổi giờ sau khi hôm nay đã chạy: để sang ngày mai, mỗi ngày chỉ chạy một lần
+        if _local_date(last_run, tz) == _local_date(when, tz):
+            when = next_occurrence(at, tz, when)
+        self._push(schedule, when)
+
+    def remove(self, key: str):
+        if self._schedules.pop(key, None) is not None:
+            self._last_runs.pop(key, None)
+            self.store.remove([key])
+
+    def sync(self, schedules: Dict[str, Tuple[dtime, tzinfo, Any]]):
+        """Make the schedules exactly `schedules` (key -> (time, timezone, payload))"""
+        for key in list(self._schedules):
+            if key not in schedules:
+                self.remove(key)
+        for key, (at, tz, payload) in schedules.items():
+            self.set(key, at, tz, payload)
+
+    def next_run(self) -> Optional[float]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, schedule: _Schedule, when: float):
+        heapq.heappush(self._heap, (when, next(self._seq), schedule.key, schedule.generation))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _drop_stale(self):
+        while self._heap:
+            _, _, key, generation = self._heap[0]
+            schedule = self._schedules.get(key)
+            if schedule is not None and schedule.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now: float) -> List[Due]:
+        """Take every job due at `now` and queue each one's next occurrence"""
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            when, _, key, _ = heapq.heappop(self._heap)
+            schedule = self._schedules[key]
+            due.append(schedule.due(when))
+            self._push(schedule, next_occurrence(schedule.at, schedule.tz, max(when, now)))
+
+    # ---- timer ----
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the timer and cancel runs in progress, waiting for them to record their run"""
+        tasks = list(self._running)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            due = self.pop_due(self.clock())
+            if due:
+                task = asyncio.ensure_future(self._fire(due))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                continue
+
+            next_run = self.next_run()
+            timeout = MAX_SLEEP if next_run is None else min(MAX_SLEEP, max(0.0, next_run - self.clock()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, due: List[Due]):
+        try:
+            await self.callback(due)
+        except Exception as e:
+            logger.error(f"Scheduled run of {len(due)} job(s) failed: {e}")
+        finally:
+            # Ghi lại lần chạy kể cả khi lỗi hay bị huỷ, tránh đăng bù lặp lại mãi một bài hỏng
+            runs = [(d.key, max(d.scheduled_for, self.clock())) for d in due if d.key in self._schedules]
+            for key, ran_at in runs:
+                self._last_runs[key] = ran_at
+            try:
+                self.store.set_last_runs(runs)
+            except Exception as e:
+                logger.error(f"Saving schedule runs failed: {e}")
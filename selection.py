@@ -0,0 +1,225 @@
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from title_search import normalize
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits of `mask`, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def topic_key(topic: str) -> str:
+    """Topic names and slugs ("Dynamic Programming", "dynamic-programming") share one key"""
+    return normalize(topic)
+
+
+class ProblemSelector:
+    """
+    Bitset indexes over the problem catalog for filtered problem picks
+
+    Bit `i` of every mask stands for problem id `i`, so a query like
+    Medium ∧ Graph ∧ ¬posted is a handful of big-int AND/NOT operations.
+    """
+
+    def __init__(self):
+        self.all = 0
+        self.paid = 0
+        self.posted = 0
+        self.by_difficulty: Dict[str, int] = {}
+        self.by_topic: Dict[str, int] = {}
+        self.topic_names: Dict[str, str] = {}
+        self._slugs: Dict[int, str] = {}
+
+    @classmethod
+    def build(cls, questions: Iterable[Dict], posted: Iterable[int] = ()) -> "ProblemSelector":
+        """Build the indexes from questionList entries (frontendQuestionId, topicTags, ...)"""
+        selector = cls()
+        by_difficulty: Dict[str, List[int]] = {}
+        by_topic: Dict[str, List[int]] = {}
+        ids, paid = [], []
+
+        for question in questions:
+            try:
+                problem_id = int(question["frontendQuestionId"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            ids.append(problem_id)
+            selector._slugs[problem_id] = question.get("titleSlug")
+            if question.get("paidOnly"):
+                paid.append(problem_id)
+            by_difficulty.setdefault(question.get("difficulty"), []).append(problem_id)
+            for tag in question.get("topicTags") or ():
+                key = topic_key(tag["name"])
+                selector.topic_names.setdefault(key, tag["name"])
+                by_topic.setdefault(key, []).append(problem_id)
+
+        selector.all = cls.mask_of(ids)
+        selector.paid = cls.mask_of(paid)
+        selector.posted = cls.mask_of(posted)
+        selector.by_difficulty = {
+            difficulty: cls.mask_of(members) for difficulty, members in by_difficulty.items()
+        }
+        selector.by_topic = {key: cls.mask_of(members) for key, members in by_topic.items()}
+        return selector
+
+    @staticmethod
+    def mask_of(problem_ids: Iterable[int]) -> int:
+        # Ghép bit qua bytearray rồi đổi sang int một lần, nhanh hơn OR từng bit
+        problem_ids = list(problem_ids)
+        if not problem_ids:
+            return 0
+        bits = bytearray(max(problem_ids) // 8 + 1)
+        for problem_id in problem_ids:
+            bits[problem_id >> 3] |= 1 << (problem_id & 7)
+        return int.from_bytes(bits, "little")
+
+    def __len__(self) -> int:
+        return self.all.bit_count()
+
+    def slug(self, problem_id: int) -> Optional[str]:
+        return self._slugs.get(int(problem_id))
+
+    def topics(self) -> List[str]:
+        """Display names of every known topic"""
+        return sorted(self.topic_names.values())
+
+    def mark_posted(self, problem_id: int):
+        self.posted |= 1 << int(problem_id)
+
+    def query(
+        self,
+        difficulty: Optional[str] = None,
+        topics: Sequence[str] = (),
+        exclude_posted: bool = True,
+        include_paid: bool = False,
+    ) -> int:
+        """Mask of the problems matching every given filter"""
+        mask = self.all
+        if difficulty:
+            mask &= self.by_difficulty.get(difficulty.capitalize(), 0)
+        for topic in topics:
+            mask &= self.by_topic.get(topic_key(topic), 0)
+        if exclude_posted:
+            mask &= ~self.posted
+        if not include_paid:
+            mask &= ~self.paid
+        return mask
+
+    def count(self, **filters) -> int:
+        return self.query(**filters).bit_count()
+
+    def next_after(self, problem_id: int, count: int = 1, **filters) -> List[int]:
+        """The first `count` matching ids after `problem_id`, wrapping around to the start"""
+        mask = self.query(**filters)
+        after = mask >> (problem_id + 1) << (problem_id + 1)
+        picked = []
+        for source in (after, mask & ~after):
+            for bit in iter_bits(source):
+                if len(picked) == count:
+                    return picked
+                picked.append(bit)
+        return picked
+
+    def pick_random(self, rng: Optional[random.Random] = None, **filters) -> Optional[int]:
+        """A uniformly random matching id, None if nothing matches"""
+        mask = self.query(**filters)
+        total = mask.bit_count()
+        if not total:
+            return None
+
+        # Bỏ qua từng nửa dưới cho tới khi còn bit thứ k cần tìm
+        k = (rng or random).randrange(total)
+        shift = 0
+        width = mask.bit_length()
+        while width > 64:
+            half = width // 2
+            low = mask & ((1 << half) - 1)
+            low_count = low.bit_count()
+            if k < low_count:
+                mask, width = low, half
+            else:
+                k -= low_count
+                mask >>= half
+                shift += half
+                width -= half
+        for bit in iter_bits(mask):
+            if k == 0:
+                return bit + shift
+            k -= 1
+        return None
+
+
+class PostedHistory:
+    """Problems already posted as daily challenges, persisted in SQLite"""
+
+    def __init__(self, db_file: str = "bot_state.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS posted_problems (
+                problem_id INTEGER PRIMARY KEY,
+                posted_at REAL NOT NULL
+            )
+            """
+        )
+        # Ngày (theo giờ địa phương của lịch) -> bài đã chọn, để mọi channel cùng ngày nhận cùng một bài
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS daily_picks (
+                day TEXT PRIMARY KEY,
+                problem_id INTEGER NOT NULL
+            )
+            """
+        )
+
+    def add(self, problem_id: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posted_problems VALUES (?, ?)",
+                (int(problem_id), time.time()),
+            )
+
+    def ids(self) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT problem_id FROM posted_problems").fetchall()
+        return [row[0] for row in rows]
+
+    def __contains__(self, problem_id) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM posted_problems WHERE problem_id = ?", (int(problem_id),)
+            ).fetchone()
+        return row is not None
+
+    def pick_for(self, day: str) -> Optional[int]:
+        """Problem already chosen for a day (ISO date), None if that day has none yet"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT problem_id FROM daily_picks WHERE day = ?", (day,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_pick(self, day: str, problem_id: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO daily_picks VALUES (?, ?)", (day, int(problem_id))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
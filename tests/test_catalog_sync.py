@@ -0,0 +1,95 @@
+import pytest
+
+from catalog_sync import CatalogSync, SyncStateStore, content_hash, listing_hash
+from problem_store import ProblemStore
+from record_log import ProblemLogStore
+
+
+def question(number: int, **extra) -> dict:
+    return {
+        "frontendQuestionId": str(number),
+        "title": f"Problem {number}",
+        "titleSlug": f"problem-{number}",
+        "difficulty": "Easy",
+        "paidOnly": False,
+        "topicTags": [{"name": "Array", "slug": "array"}],
+        **extra,
+    }
+
+
+def problem(number: int, **extra) -> dict:
+    return {
+        "id": str(number),
+        "slug": f"problem-{number}",
+        "title": f"Problem {number}",
+        "difficulty": "Easy",
+        "topics": ["Array"],
+        **extra,
+    }
+
+
+@pytest.fixture(params=["problems.db", "problems.log"])
+def sync(request, tmp_path):
+    path = str(tmp_path / request.param)
+    store = ProblemStore(path) if path.endswith(".db") else ProblemLogStore(path)
+    state = SyncStateStore(str(tmp_path / "bot_state.db"))
+    yield CatalogSync(None, store, state, csv_file=str(tmp_path / "leetcode_data.csv"))
+    store.close()
+    state.close()
+
+
+def slugs(questions):
+    return [q["titleSlug"] for q in questions]
+
+
+def test_new_problems_are_refetched(sync):
+    changed, unchanged, fresh = sync.plan([question(1), question(2)])
+    assert slugs(changed) == ["problem-1", "problem-2"]
+    assert unchanged == [] and fresh == []
+
+
+def test_known_hash_of_stored_problem_is_fresh(sync):
+    sync.store.upsert(problem(1))
+    sync.state.update([("problem-1", listing_hash(question(1)), content_hash(problem(1)))])
+
+    changed, unchanged, fresh = sync.plan([question(1)])
+    assert changed == [] and unchanged == []
+    assert fresh == ["problem-1"]
+
+
+def test_known_hash_missing_from_store_is_refetched(sync):
+    # Hash đã ghi nhưng store bị xóa hoặc đổi file: phải crawl lại
+    sync.state.update([("problem-1", listing_hash(question(1)), "old")])
+
+    changed, unchanged, fresh = sync.plan([question(1)])
+    assert slugs(changed) == ["problem-1"]
+    assert fresh == []
+
+
+def test_changed_listing_is_refetched(sync):
+    sync.store.upsert(problem(1))
+    sync.state.update([("problem-1", listing_hash(question(1)), None)])
+
+    changed, _, fresh = sync.plan([question(1, difficulty="Hard")])
+    assert slugs(changed) == ["problem-1"]
+    assert fresh == []
+
+
+def test_paid_problems_only_record_their_hash(sync):
+    paid = question(1, paidOnly=True)
+    changed, unchanged, fresh = sync.plan([paid])
+    assert changed == [] and fresh == []
+    assert unchanged == [("problem-1", listing_hash(paid), None)]
+
+    sync.state.update(unchanged)
+    assert sync.plan([paid]) == ([], [], [])
+
+
+def test_seeds_hash_of_stored_problem_matching_listing(sync):
+    sync.store.upsert(problem(1))
+    sync.store.upsert(problem(2, title="Old title"))
+
+    changed, unchanged, fresh = sync.plan([question(1), question(2)])
+    assert slugs(changed) == ["problem-2"]
+    assert unchanged == [("problem-1", listing_hash(question(1)), content_hash(problem(1)))]
+    assert fresh == ["problem-1"]
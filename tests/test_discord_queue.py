@@ -0,0 +1,151 @@
+import asyncio
+import random
+
+import discord
+import pytest
+
+from discord_queue import OutboundQueue
+
+
+class FakeThread:
+    def __init__(self, thread_id: int, name: str):
+        self.id = thread_id
+        self.name = name
+        self.messages = []
+
+    async def send(self, content, **kwargs):
+        # Độ trễ ngẫu nhiên: thứ tự chỉ đúng nếu hàng đợi giữ thứ tự
+        await asyncio.sleep(random.random() / 500)
+        self.messages.append(content)
+        return content
+
+
+class FakeChannel(FakeThread):
+    def __init__(self, channel_id: int = 1):
+        super().__init__(channel_id, "general")
+        self.threads = []
+        self.rate_limits = 0
+
+    async def create_thread(self, name, **kwargs):
+        await asyncio.sleep(0.001)
+        if self.rate_limits:
+            self.rate_limits -= 1
+            raise discord.RateLimited(0.01)
+        thread = FakeThread(100 + len(self.threads), name)
+        self.threads.append(thread)
+        return thread
+
+
+def fast_queue(**kwargs) -> OutboundQueue:
+    return OutboundQueue(
+        route_rate=1000, route_burst=100, global_rate=1000, global_burst=100, **kwargs
+    )
+
+
+def test_messages_arrive_in_order():
+    async def scenario():
+        queue = fast_queue()
+        channel = FakeChannel()
+        futures = [queue.send(channel, f"m{i}", silent=True) for i in range(30)]
+        results = await asyncio.gather(*futures)
+        return channel.messages, results
+
+    messages, results = asyncio.run(scenario())
+    expected = [f"m{i}" for i in range(30)]
+    assert messages == expected
+    assert results == expected
+
+
+def test_back_to_back_messages_are_merged_within_the_limit():
+    async def scenario():
+        queue = fast_queue(message_limit=10)
+        channel = FakeChannel()
+        futures = [queue.send(channel, text) for text in ["a", "bb", "ccc", "dddd", "e"]]
+        results = await asyncio.gather(*futures)
+        return channel.messages, results
+
+    messages, results = asyncio.run(scenario())
+    # Gộp khi còn vừa giới hạn, mỗi caller nhận message chứa nội dung của mình
+    assert messages == ["a\nbb\nccc", "dddd\ne"]
+    assert results == ["a\nbb\nccc"] * 3 + ["dddd\ne"] * 2
+    assert all(len(message) <= 10 for message in messages)
+
+
+def test_messages_with_options_are_not_merged():
+    async def scenario():
+        queue = fast_queue()
+        channel = FakeChannel()
+        await asyncio.gather(*(queue.send(channel, text, silent=True) for text in "abc"))
+        return channel.messages
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_duplicate_threads_are_created_once():
+    async def scenario():
+        queue = fast_queue()
+        channel = FakeChannel()
+        first = queue.create_thread(channel, "daily", ["hello", "world"])
+        second = queue.create_thread(channel, "daily", ["hello", "world"])
+        other = queue.create_thread(channel, "other", ["x"])
+        (thread_a, sends_a), (thread_b, sends_b), (thread_c, sends_c) = await asyncio.gather(
+            first, second, other
+        )
+        await asyncio.gather(*sends_a, *sends_b, *sends_c)
+
+        # Thread đã tạo xong thì lệnh sau tạo thread mới
+        thread_d, sends_d = await queue.create_thread(channel, "daily", ["again"])
+        await asyncio.gather(*sends_d)
+        return channel, (thread_a, thread_b, thread_c, thread_d)
+
+    channel, (a, b, c, d) = asyncio.run(scenario())
+    assert a is b
+    assert a.messages == ["hello\nworld"]
+    assert c is not a and c.messages == ["x"]
+    assert d is not a and d.messages == ["again"]
+    assert [thread.name for thread in channel.threads] == ["daily", "other", "daily"]
+
+
+def test_rate_limited_call_is_retried():
+    async def scenario():
+        queue = fast_queue(max_retries=3)
+        channel = FakeChannel()
+        channel.rate_limits = 2
+        thread, _ = await queue.create_thread(channel, "daily")
+        return channel, thread
+
+    channel, thread = asyncio.run(scenario())
+    assert channel.threads == [thread]
+
+
+def test_gives_up_after_max_retries():
+    async def scenario():
+        queue = fast_queue(max_retries=1)
+        channel = FakeChannel()
+        channel.rate_limits = 5
+        with pytest.raises(discord.RateLimited):
+            await queue.create_thread(channel, "daily")
+        return channel
+
+    assert asyncio.run(scenario()).threads == []
+
+
+def test_close_cancels_queued_calls():
+    async def scenario():
+        queue = fast_queue()
+        channel = FakeChannel()
+        slow = asyncio.Event()
+
+        async def blocked():
+            await slow.wait()
+
+        running = queue.submit(("messages", channel.id), blocked)
+        queued = queue.send(channel, "never")
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return running, queued, channel.messages, queue
+
+    running, queued, messages, queue = asyncio.run(scenario())
+    assert running.cancelled() and queued.cancelled()
+    assert messages == []
+    assert not queue._workers
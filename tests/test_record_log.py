@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+
+import pytest
+
+from record_log import MAGIC, ProblemLogStore
+
+
+def problem(problem_id: int, **extra) -> dict:
+    return {
+        "id": str(problem_id),
+        "slug": f"problem-{problem_id}",
+        "title": f"Problem {problem_id}",
+        "difficulty": "Easy",
+        **extra,
+    }
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / "problems.log")
+
+
+def test_append_and_reload(log_file):
+    store = ProblemLogStore(log_file)
+    store.upsert(problem(1))
+    store.upsert(problem(2))
+    store.upsert(problem(1, title="Renamed"))
+    store.put_rendered(2, 1, 2000, ["chunk"])
+    store.close()
+
+    store = ProblemLogStore(log_file)
+    assert sorted(store.ids()) == ["1", "2"]
+    assert store.get(1)["title"] == "Renamed"
+    assert store.get_by_slug("problem-2")["id"] == "2"
+    assert store.get_rendered(2, 1, 2000) == ["chunk"]
+    store.close()
+
+
+def test_new_version_drops_renders(log_file):
+    store = ProblemLogStore(log_file)
+    store.upsert(problem(1))
+    store.put_rendered(1, 1, 2000, ["old"])
+    store.upsert(problem(1, title="New"))
+    assert store.get_rendered(1, 1, 2000) is None
+    store.close()
+
+
+def test_stale_and_touch(log_file):
+    store = ProblemLogStore(log_file)
+    store.upsert(problem(1), fetched_at=0)
+    assert store.get(1) is None
+    assert store.get(1, allow_stale=True)["id"] == "1"
+
+    assert store.touch(["problem-1", "missing"]) == 1
+    assert store.get(1)["id"] == "1"
+    store.close()
+
+
+def test_truncates_partial_tail(log_file):
+    store = ProblemLogStore(log_file)
+    store.upsert(problem(1))
+    store.close()
+    size = os.path.getsize(log_file)
+    with open(log_file, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    store = ProblemLogStore(log_file)
+    assert os.path.getsize(log_file) == size
+    assert store.get(1)["id"] == "1"
+    store.upsert(problem(2))
+    assert sorted(ProblemLogStore(log_file).ids()) == ["1", "2"]
+    store.close()
+
+
+def test_rejects_foreign_file(log_file):
+    with open(log_file, "wb") as f:
+        f.write(b"not a log")
+    with pytest.raises(ValueError):
+        ProblemLogStore(log_file)
+
+
+def test_compact_keeps_latest_records(log_file):
+    store = ProblemLogStore(log_file)
+    for version in range(5):
+        store.upsert(problem(1, title=f"v{version}"))
+    store.upsert(problem(2), fetched_at=0)
+    store.touch(["problem-2"])
+    before = os.path.getsize(log_file)
+
+    store.compact()
+    assert os.path.getsize(log_file) < before
+    assert store.get(1)["title"] == "v4"
+    store.close()
+
+    # fetched_at của touch được ghi vào header nên vẫn còn sau khi mở lại
+    store = ProblemLogStore(log_file)
+    assert store.get(1)["title"] == "v4"
+    assert store.get(2)["id"] == "2"
+    store.close()
+
+
+def test_two_stores_see_each_others_writes(log_file):
+    first = ProblemLogStore(log_file)
+    second = ProblemLogStore(log_file)
+    first.upsert(problem(1))
+    second.upsert(problem(2))
+
+    assert first.get(2)["id"] == "2"
+    assert second.get(1)["id"] == "1"
+    assert sorted(first.ids()) == ["1", "2"]
+
+    first.close()
+    second.close()
+    reopened = ProblemLogStore(log_file)
+    assert sorted(reopened.ids()) == ["1", "2"]
+    assert reopened.get(1)["id"] == "1"
+    reopened.close()
+
+
+def test_writes_after_foreign_compaction_are_kept(log_file):
+    first = ProblemLogStore(log_file)
+    second = ProblemLogStore(log_file)
+    first.upsert(problem(1))
+    first.upsert(problem(1, title="v2"))
+    second.upsert(problem(2))
+
+    first.compact()
+    # second vẫn giữ fd của inode cũ, phải nhận ra log đã bị thay
+    second.upsert(problem(3))
+    assert second.get(1)["title"] == "v2"
+    assert first.get(3)["id"] == "3"
+
+    first.close()
+    second.close()
+    reopened = ProblemLogStore(log_file)
+    assert sorted(reopened.ids()) == ["1", "2", "3"]
+    reopened.close()
+
+
+def _write_many(log_file: str, start: int, count: int):
+    store = ProblemLogStore(log_file)
+    for problem_id in range(start, start + count):
+        store.upsert(problem(problem_id, description="x" * (problem_id % 50)))
+        if problem_id % 20 == 0:
+            store.compact()
+    store.close()
+
+
+def test_concurrent_writer_processes(log_file):
+    ProblemLogStore(log_file).close()
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_write_many, args=(log_file, start, 60))
+        for start in (1000, 2000, 3000)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    store = ProblemLogStore(log_file)
+    expected = {str(i) for start in (1000, 2000, 3000) for i in range(start, start + 60)}
+    assert set(store.ids()) == expected
+    for problem_id in expected:
+        assert store.get(problem_id)["id"] == problem_id
+    with open(log_file, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    store.close()
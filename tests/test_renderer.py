@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from benchmarks.chunk_check import LIMITS, chunk_problems, random_section
+from renderer import FENCE, chunk_sections
+
+
+def test_short_sections_share_one_message():
+    sections = ["## Title\n\n", "Description\n\n", "Constraints\n"]
+    assert chunk_sections(sections, 100) == ["## Title\n\nDescription\n\nConstraints"]
+
+
+def test_splits_between_sections():
+    sections = ["a" * 40 + "\n", "b" * 40 + "\n", "c" * 40 + "\n"]
+    chunks = chunk_sections(sections, 90)
+    assert chunks == ["a" * 40 + "\n" + "b" * 40, "c" * 40]
+
+
+def test_long_code_block_is_closed_and_reopened():
+    lines = [f"line {i:02d}" for i in range(30)]
+    section = "Example:\n" + FENCE + "python\n" + "\n".join(lines) + "\n" + FENCE + "\n"
+    chunks = chunk_sections([section], 80)
+
+    assert len(chunks) > 1
+    assert chunk_problems(chunks, 80) == []
+    for chunk in chunks[1:]:
+        # Code block nối tiếp giữ nguyên ngôn ngữ
+        assert chunk.startswith(FENCE + "python\n")
+    body = [line for chunk in chunks for line in chunk.splitlines() if line.startswith("line")]
+    assert body == lines
+
+
+def test_no_empty_code_block_when_fence_opens_at_the_limit():
+    # Dòng mở fence vừa khít giới hạn: không được gửi một message chỉ có fence
+    text = "x" * 50 + "\n"
+    section = text + FENCE + "\n" + "code\n" * 3 + FENCE + "\n"
+    for limit in range(len(text) + 4, len(text) + 20):
+        chunks = chunk_sections([section, "tail\n"], limit)
+        assert chunk_problems(chunks, limit) == [], (limit, chunks)
+
+
+def test_over_long_line_in_code_block_is_cut():
+    section = FENCE + "\n" + "y" * 300 + "\n" + FENCE + "\n"
+    chunks = chunk_sections([section], 100)
+    assert chunk_problems(chunks, 100) == []
+    assert "".join(line for chunk in chunks for line in chunk.splitlines() if line.startswith("y")) == "y" * 300
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_sections_keep_the_contract(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        limit = rng.choice(LIMITS)
+        sections = [random_section(rng, limit) for _ in range(rng.randint(1, 4))]
+        assert chunk_problems(chunk_sections(sections, limit), limit) == []
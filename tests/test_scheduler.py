@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from scheduler import DailyScheduler, ScheduleStore, parse_time, parse_timezone
+
+TZ = timezone(timedelta(hours=7))
+AT = time(7, 0)
+
+
+def at(day: int, hour: int, minute: int = 0) -> float:
+    return datetime(2026, 3, day, hour, minute, tzinfo=TZ).timestamp()
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "bot_state.db")
+
+
+def scheduler_at(db_file, now: float, callback=None) -> DailyScheduler:
+    async def noop(due):
+        pass
+
+    return DailyScheduler(callback or noop, ScheduleStore(db_file), clock=Clock(now))
+
+
+def test_parse_timezone_and_time():
+    assert parse_timezone("+7") == TZ
+    assert parse_timezone("UTC-5:30") == timezone(-timedelta(hours=5, minutes=30))
+    assert parse_timezone("Asia/Ho_Chi_Minh").key == "Asia/Ho_Chi_Minh"
+    with pytest.raises(ValueError):
+        parse_timezone("+15")
+    with pytest.raises(ValueError):
+        parse_timezone("Mars/Olympus")
+    assert parse_time(None) == AT
+    assert parse_time("21:30") == time(21, 30)
+
+
+def test_new_schedule_waits_for_next_occurrence(db_file):
+    scheduler = scheduler_at(db_file, at(10, 12))
+    scheduler.set("guild:1", AT, TZ, 100)
+
+    assert scheduler.pop_due(at(10, 12)) == []
+    assert scheduler.next_run() == at(11, 7)
+
+
+def test_pop_due_moves_to_next_day(db_file):
+    scheduler = scheduler_at(db_file, at(10, 6))
+    scheduler.set("guild:1", AT, TZ, 100)
+
+    due = scheduler.pop_due(at(10, 7))
+    assert [(d.key, d.scheduled_for, d.day, d.payload) for d in due] == [
+        ("guild:1", at(10, 7), "2026-03-10", 100)
+    ]
+    assert scheduler.next_run() == at(11, 7)
+
+
+def test_missed_run_is_caught_up_after_restart(db_file):
+    scheduler = scheduler_at(db_file, at(8, 6))
+    scheduler.set("guild:1", AT, TZ, 100)
+    scheduler.store.close()
+
+    # Bot tắt từ ngày 8, bật lại trưa ngày 10: chỉ đăng bù một lần, cho ngày 10
+    scheduler = scheduler_at(db_file, at(10, 12))
+    scheduler.set("guild:1", AT, TZ, 100)
+    due = scheduler.pop_due(at(10, 12))
+    assert [(d.scheduled_for, d.day) for d in due] == [(at(10, 7), "2026-03-10")]
+    assert scheduler.pop_due(at(10, 12)) == []
+    assert scheduler.next_run() == at(11, 7)
+
+
+def test_runs_once_per_local_day_when_time_changes(db_file):
+    store = ScheduleStore(db_file)
+    store.set_last_runs([("guild:1", at(10, 7))])
+    store.close()
+
+    # Đã chạy lúc 7h hôm nay, đổi sang 20h thì lần tới là ngày mai
+    scheduler = scheduler_at(db_file, at(10, 8))
+    scheduler.set("guild:1", time(20, 0), TZ, 100)
+    assert scheduler.next_run() == at(11, 20)
+
+
+def test_removed_schedule_is_not_run(db_file):
+    scheduler = scheduler_at(db_file, at(10, 6))
+    scheduler.set("guild:1", AT, TZ, 1)
+    scheduler.set("guild:2", AT, TZ, 2)
+    scheduler.sync({"guild:2": (AT, TZ, 2)})
+
+    assert [d.key for d in scheduler.pop_due(at(10, 7))] == ["guild:2"]
+    assert "guild:1" not in scheduler.store.last_runs()
+
+
+def test_timer_fires_catch_up_and_records_the_run(db_file):
+    store = ScheduleStore(db_file)
+    store.set_last_runs([("guild:1", at(8, 7))])
+    store.close()
+
+    async def scenario():
+        fired = asyncio.Event()
+        runs = []
+
+        async def callback(due):
+            runs.append([d.key for d in due])
+            fired.set()
+
+        scheduler = scheduler_at(db_file, at(10, 12), callback)
+        scheduler.set("guild:1", AT, TZ, 100)
+        scheduler.start()
+        await asyncio.wait_for(fired.wait(), 5)
+        await scheduler.stop()
+        return runs, scheduler
+
+    runs, scheduler = asyncio.run(scenario())
+    assert runs == [["guild:1"]]
+    assert scheduler.store.last_runs()["guild:1"] == at(10, 12)
+
+
+def test_stop_cancels_runs_in_progress(db_file):
+    async def scenario():
+        started = asyncio.Event()
+        cancelled = []
+
+        async def callback(due):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        scheduler = scheduler_at(db_file, at(10, 6), callback)
+        scheduler.set("guild:1", AT, TZ, 100)
+        scheduler.clock.now = at(10, 7)
+        scheduler.start()
+        await asyncio.wait_for(started.wait(), 5)
+        await scheduler.stop()
+        return cancelled, scheduler
+
+    cancelled, scheduler = asyncio.run(scenario())
+    assert cancelled == [True]
+    assert not scheduler._running
+    scheduler.store.close()
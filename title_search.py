@@ -0,0 +1,113 @@
+import heapq
+import re
+from array import array
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Tuple
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse everything that is not a letter or digit to one space"""
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def _grams(text: str) -> set:
+    """Trigrams of the padded text plus a bigram marking each word start"""
+    padded = f" {text} "
+    grams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+    grams.update(" " + word[0] for word in text.split())
+    return grams
+
+
+def _query_grams(query: str) -> set:
+    # Không pad phía sau: từ cuối cùng có thể đang gõ dở
+    padded = f" {query}"
+    grams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+    # Word-start bigrams only help for words too short to have a trigram
+    grams.update(" " + word for word in query.split() if len(word) == 1)
+    return grams
+
+
+class TitleSearchIndex:
+    """N-gram inverted index over problem titles for fuzzy, as-you-type search"""
+
+    def __init__(self):
+        self._ids = array("I")
+        self._titles: List[str] = []
+        self._normalized: List[str] = []
+        self._gram_counts = array("H")
+        self._postings: Dict[str, array] = {}
+        self._by_id: Dict[int, int] = {}
+
+    @classmethod
+    def build(cls, titles: Iterable[Tuple[int, str]]) -> "TitleSearchIndex":
+        """Build the index once from (id, title) pairs"""
+        index = cls()
+        postings = defaultdict(lambda: array("I"))
+
+        for problem_id, title in titles:
+            doc = len(index._titles)
+            normalized = normalize(title)
+            grams = _grams(normalized)
+
+            index._ids.append(problem_id)
+            index._titles.append(title)
+            index._normalized.append(normalized)
+            index._gram_counts.append(min(len(grams), 0xFFFF))
+            index._by_id[problem_id] = doc
+            for gram in grams:
+                postings[gram].append(doc)
+
+        index._postings = dict(postings)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _count_hits(self, grams: set) -> Counter:
+        hits = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings:
+                hits.update(postings)
+        return hits
+
+    def search(self, query: str, limit: int = 25) -> List[Tuple[int, str]]:
+        """Return up to `limit` (id, title) pairs best matching the query"""
+        normalized = normalize(query)
+        if not normalized:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        # Tìm theo ID khi người dùng gõ số
+        if normalized.isdigit():
+            doc = self._by_id.get(int(normalized))
+            if doc is not None:
+                scores[doc] = 10.0
+
+        # Only titles sharing at least one gram with the query are ever touched,
+        # Counter.update counts the posting lists in C
+        query_grams = _query_grams(normalized)
+        hits = self._count_hits(query_grams)
+        if not hits:
+            # Không khớp trigram nào: thử lại với chữ cái đầu của từng từ
+            query_grams = {" " + word[0] for word in normalized.split()}
+            hits = self._count_hits(query_grams)
+
+        # Chỉ chấm điểm chi tiết cho các ứng viên có nhiều gram chung nhất
+        query_size = len(query_grams)
+        for doc, shared in heapq.nlargest(limit * 4, hits.items(), key=itemgetter(1)):
+            # Tỉ lệ gram của query tìm thấy, phạt nhẹ tiêu đề dài
+            score = shared / query_size - 0.002 * (self._gram_counts[doc] - shared)
+            title = self._normalized[doc]
+            if title.startswith(normalized):
+                score += 1.0
+            elif normalized in title:
+                score += 0.5
+            scores[doc] = max(scores.get(doc, 0.0), score)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self._ids[doc], self._titles[doc]) for doc, _ in best]